@@ -1,19 +1,177 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+_env_loaded = False
+
+
+def load_env():
+    """
+    Loads environment variables from the .env file, once per process.
+    Entry points call it; importing this module has no side effects.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
 
 # --- PROJECT PATHS ---
 # This gets the base directory of your project automatically
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = os.path.join(BASE_DIR, "notifications.json")
+CURSORS_PATH = os.path.join(BASE_DIR, "sync_cursors.json")
+
+# --- STORAGE ---
+# "sqlite" = indexed store with upserts (DB_PATH), "json" = legacy single-file store.
+STORAGE_BACKEND = "sqlite"
+DB_PATH = os.path.join(BASE_DIR, "notifications.db")
+# The dashboard reads the store through the API (python -m backend.server). Set this to also keep
+# a JSON copy of the SQLite store at DATA_DIR, for a dashboard served without the API. Every export
+# rewrites the whole file, so it costs time in proportion to the stored history on each write.
+EXPORT_SNAPSHOT = False
 
 # --- APP SETTINGS ---
 # If True, we use fake data. If False, we try to connect to real APIs.
 DEMO_MODE = True 
 
+# --- INTEGRATIONS ---
+# Live sources the aggregator may poll. A source only runs (and its client library is only
+# imported) when it is listed here and its credentials are set; see backend/integrations/__init__.py.
+# The ENABLED_SOURCES env var or --sources (comma-separated) narrows it per run.
+ENABLED_SOURCES = ["slack", "github", "jira", "gmail", "discord", "calendar"]
+
+# --- TENANTS ---
+# Multi-tenant mode (run_aggregator --tenants): one process serves every user with a directory
+# under TENANTS_DIR. A tenant's directory holds its credentials (.env, token.json/credentials.json),
+# optional tenant.json settings (vip_senders, urgent_keywords, critical_terms) and all of its data
+# (notifications.db, notifications.json, sync_cursors.json, dedup_index.db).
+# Fetch workers are shared and handed out fairly: each busy tenant gets an even share of them.
+# A fetch waiting for a free worker counts against its source's timeout, so keep the workers in
+# proportion to the passes (times sources) that may run at once.
+TENANTS_DIR = os.path.join(BASE_DIR, "tenants")
+TENANT_FETCH_WORKERS = 8
+TENANT_MAX_PASSES = 16        # Tenant pipeline passes (normalize -> store) running at once
+
+# --- INGESTION ---
+# Live sources are fetched concurrently. Each source gets its own time budget (seconds),
+# and the whole ingestion pass is capped by a run deadline. Late sources are logged and
+# the run carries on with whatever the other sources returned.
+SOURCE_TIMEOUTS = {
+    "slack": 10,
+    "github": 10,
+    "jira": 10,
+}
+DEFAULT_SOURCE_TIMEOUT = 10
+INGESTION_DEADLINE = 20
+
+# --- DEDUPLICATION ---
+# The same incident reported by several sources (or several times) is folded into one
+# notification with a 'count' and its 'sources', before it is scored.
+# Exact matches compare normalized title+content; near-duplicates need at least
+# DEDUP_MIN_SIMILARITY of their words and word pairs in common (MinHash estimate).
+# Exact matches must also come from the same sender and channel. Texts with fewer than
+# DEDUP_MIN_FEATURES words+pairs (about six words) are too short to compare the other way,
+# so only match exactly: "can you look at this?" from two people is two requests.
+DEDUP_MIN_SIMILARITY = 0.7
+DEDUP_MIN_FEATURES = 12
+DEDUP_WINDOW = 500            # Items collapsed together before they move on to scoring
+DEDUP_MAX_ENTRIES = 10000     # Clusters kept in memory; the least recently seen spill to disk
+DEDUP_TTL = 24 * 3600         # A cluster stops absorbing duplicates this long after its last one
+DEDUP_INDEX_PATH = os.path.join(BASE_DIR, "dedup_index.db")
+DEDUP_SKIP_SOURCES = {"calendar"}  # Same-titled events at different times are not duplicates
+# Sources whose IDs name a tracked object (a PR, a ticket): two of their items with different
+# IDs are never duplicates of each other, however alike their titles
+DEDUP_DISTINCT_ID_SOURCES = {"github", "jira"}
+
+# --- SCORE CACHE ---
+# Scores of unchanged notifications are reused instead of recomputed. Entries are keyed by
+# content plus a hash of the scoring config, so editing the weights, thresholds, keywords or
+# VIPs below invalidates them on its own. Live runs keep the cache in SCORE_CACHE_PATH.
+SCORE_CACHE_SIZE = 50000
+SCORE_CACHE_PATH = os.path.join(BASE_DIR, "score_cache.json")
+
+# --- DAEMON ---
+# Seconds between polls of each source when running with --daemon.
+POLL_INTERVALS = {
+    "slack": 15,
+    "discord": 30,
+    "gmail": 60,
+    "github": 120,
+    "jira": 300,
+    "calendar": 900,
+}
+DEFAULT_POLL_INTERVAL = 300
+
+# Streaming limits: how many fetched pages may wait for processing,
+# and how many notifications are written per storage commit.
+INGESTION_QUEUE_PAGES = 32
+STORE_CHUNK_SIZE = 500
+
+# Pagination: items requested per API page, and the most items one source
+# may deliver in a single run (older history beyond that is skipped).
+PAGE_SIZE = 100
+MAX_ITEMS_PER_SOURCE = 1000
+
+# --- METRICS ---
+# Per-stage timings, item/error counts and HTTP stats of the pipeline (backend/processing/metrics.py).
+# Written as Prometheus text to METRICS_PATH after every pass (point node_exporter's textfile
+# collector at it), and served by python -m backend.server on /metrics and /api/metrics.
+METRICS_PATH = os.path.join(BASE_DIR, "metrics.prom")
+METRICS_PREFIX = "clarity_"
+# Opt-in profiling: PROFILE_STAGES=normalize,score (env) runs those stages under cProfile, or
+# tracemalloc with PROFILE_MODE=memory, and dumps the results here after each pass.
+# Stages: fetch (waiting on the fetch workers), normalize, dedup, score, store.
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+
+# --- LOCAL SERVER ---
+# Webhook receiver and dashboard API (python -m backend.server). Binds to localhost; put a tunnel or
+# reverse proxy in front. Pushed items are stored immediately; the JSON snapshot (if EXPORT_SNAPSHOT) is
+# re-exported at most every WEBHOOK_SNAPSHOT_DELAY seconds so a burst of deliveries costs one export.
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8787
+# The dashboard is served same-origin under /frontend/, so no other site may read the API.
+# To call it from a dashboard served elsewhere, name that one origin (e.g. "http://localhost:8000").
+ALLOWED_ORIGIN = None
+WEBHOOK_SNAPSHOT_DELAY = 2
+# API responses smaller than this are not worth gzipping
+API_GZIP_MIN_BYTES = 1024
+# Live updates (GET /api/events, Server-Sent Events). Each dashboard gets a bounded queue; one that
+# falls more than SSE_QUEUE_SIZE events behind is told to resync through the API instead of
+# holding up the writers. Idle streams get a keepalive comment every SSE_HEARTBEAT seconds.
+SSE_QUEUE_SIZE = 100
+SSE_HEARTBEAT = 15
+SSE_MAX_CLIENTS = 20
+# How often the feed checks the store for writes made by another process (run_aggregator --daemon)
+CHANGE_FEED_INTERVAL = 1.0
+
+# --- HTTP TRANSPORT ---
+# All REST integrations share one keep-alive session.
+# POOL_CONNECTIONS = how many hosts keep a pool, POOL_MAXSIZE = open sockets kept per host.
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 4
+
+# --- RATE LIMITS ---
+# Starting pace per source as (requests per second, burst). Each endpoint gets its own bucket,
+# and the pace is then tuned from the X-RateLimit-* / Retry-After headers the APIs send back.
+RATE_LIMITS = {
+    "slack": (0.8, 5),      # Tier 3 methods (conversations.history): ~50/min
+    "github": (0.5, 10),    # Search API: 30/min
+    "jira": (10, 20),
+    "discord": (1, 5),      # 5 per 5s per route
+    "gmail": (1, 2),        # 250 quota units/s; a 50-message metadata batch costs 250
+}
+DEFAULT_RATE_LIMIT = (5, 10)
+RATE_LIMIT_MAX_RETRIES = 3   # Retries of a throttled (429) request before giving up
+RATE_LIMIT_MAX_WAIT = 30     # Seconds; fail fast rather than wait longer for a slot
+
+# --- SCORING CONFIG ---
+# The thresholds, weights, keywords and VIPs below are the defaults. A JSON file at SCORING_CONFIG_PATH
+# (or SCORING_CONFIG in the env: a path, or the JSON itself) overrides any of them, e.g.
+#   {"weights": {"vip_sender": 35}, "thresholds": {"high": 55}, "urgent_keywords": ["urgent", "outage"]}
+# A --daemon reloads the file when it changes, and re-scores only the stored notifications the change affects.
+SCORING_CONFIG_PATH = os.path.join(BASE_DIR, "scoring.json")
+
 # --- PRIORITY THRESHOLDS ---
 # The engine calculates a score (0-100). These numbers decide the label.
 PRIORITY_THRESHOLDS = {
@@ -30,15 +188,24 @@ SCORING_WEIGHTS = {
     "is_direct_message": 30, # Points if it's a DM (Slack/Discord)
     "is_mention": 25,       # Points if you are @mentioned
     "vip_sender": 25,       # Points if it's from your boss
+    "critical_term": 30,    # Flat bonus if any critical term appears
     "recency_bonus": 10     # Max points for being new
 }
+# The recency bonus is given per hour of age (or, for upcoming events, time until start):
+# the full bonus in the first hour, fading to nothing after RECENCY_WINDOW_HOURS.
+RECENCY_WINDOW_HOURS = 24
+# Stored scores include the bonus, so it is brought up to date every RECENCY_REFRESH_INTERVAL
+# seconds by the daemon (and after each one-shot run): only notifications near now are re-scored.
+RECENCY_REFRESH_INTERVAL = 600
 
 # --- KEYWORDS ---
 # Words that trigger higher priority
 URGENT_KEYWORDS = ["urgent", "asap", "deadline", "immediate", "error", "fail", "alert", "bug"]
 
+# Incident vocabulary that earns the 'critical_term' bonus.
+# Keywords match at the start of a word, so "fail" also catches "failed" but "error" skips "terror".
+CRITICAL_TERMS = ["urgent", "down", "crash", "error", "fail", "alert", "critical", "sev-1"]
+
 # --- VIP SENDERS ---
 # Emails or Usernames that are always important (Simulated for Demo)
 VIP_SENDERS = ["sarah.chen@company.com", "boss@company.com", "ceo@company.com"]
-
-print("✅ Configuration loaded.")
\ No newline at end of file
@@ -0,0 +1,168 @@
+import logging
+import signal
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.config import POLL_INTERVALS, DEFAULT_POLL_INTERVAL, RECENCY_REFRESH_INTERVAL
+from backend.processing.scoring_config import ScoringConfigWatcher
+
+class AggregatorDaemon:
+    """
+    Resident mode for the pipeline (python -m backend.run_aggregator --daemon).
+    One NotificationAggregator stays warm for the life of the process: API clients and
+    OAuth sessions, HTTP pools, the scoring engine and the database connection are set up
+    once. Each source is then polled on its own interval from POLL_INTERVALS.
+
+    Every source gets its own pass, so a slow Jira poll never holds up Slack. Overlapping
+    runs are coalesced: a source still busy with its previous pass is not started again.
+    It runs once, right after that pass ends, however many ticks it missed.
+
+    The scoring config file is checked every tick. A change is loaded and compiled on a
+    background thread and swapped into the engines, then, once the passes that were still
+    scoring with the old config have finished, only the stored notifications it affects are re-scored.
+    Every 'recency_interval' seconds, stored notifications near now are re-scored on the same thread,
+    so recency bonuses given earlier fade instead of keeping items urgent.
+    """
+
+    def __init__(self, aggregator, intervals=None, default_interval=DEFAULT_POLL_INTERVAL, tick=1.0, max_passes=None,
+                 scoring=None, recency_interval=RECENCY_REFRESH_INTERVAL):
+        self.aggregator = aggregator
+        intervals = POLL_INTERVALS if intervals is None else intervals
+        if aggregator.demo_mode:
+            # The mock stream covers every source in one go
+            self.intervals = {"demo": min(intervals.values(), default=default_interval)}
+        else:
+            # A multi-tenant aggregator names its fetchers 'tenant/source'; the interval is the source's
+            self.intervals = {name: intervals.get(name.rpartition("/")[2], default_interval) for name in aggregator.fetchers}
+        if not self.intervals:
+            raise ValueError("No sources configured: set credentials in .env (see ENABLED_SOURCES) or use DEMO_MODE=true")
+        self.tick = tick
+
+        self.next_due = {name: 0.0 for name in self.intervals}  # Everything runs on the first tick
+        self.running = set()
+        self.finished = Counter()  # Passes completed per name
+        self.cycles = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)  # Notified whenever a pass finishes
+        self._stop = threading.Event()
+        # Tells when the scoring config changed; reloads and re-scores run one at a time off the polling loop
+        self.scoring = ScoringConfigWatcher() if scoring is None else scoring
+        self._reloads = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self._reloading = False
+        self.recency_interval = recency_interval
+        self._next_refresh = time.monotonic() + recency_interval
+        self._refreshing = False
+        # One thread per polled name, unless 'max_passes' caps it (many tenants); a queued pass
+        # counts as running, so it is not dispatched twice
+        self._passes = ThreadPoolExecutor(max_workers=min(len(self.intervals), max_passes or len(self.intervals)),
+                                          thread_name_prefix="pass")
+
+    def run_forever(self):
+        """Polls until SIGINT/SIGTERM (or stop()), then finishes in-flight passes and cleans up."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self._on_signal)
+            signal.signal(signal.SIGTERM, self._on_signal)
+
+        schedule = ", ".join(f"{name} every {seconds}s" for name, seconds in self.intervals.items())
+        logging.info(f"🛰️  Daemon started: {schedule}")
+        # The config may have changed while nothing was running
+        self._reloads.submit(self._rescore)
+
+        while not self._stop.is_set():
+            self._dispatch(time.monotonic())
+            self._check_scoring()
+            self._check_recency(time.monotonic())
+            self._stop.wait(self.tick)
+
+        self._shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def _on_signal(self, signum, frame):
+        logging.info(f"🛑 Received {signal.Signals(signum).name}, shutting down after the current passes")
+        self.stop()
+
+    def _dispatch(self, now):
+        with self._lock:
+            # A busy source is left due, so it runs once as soon as its current pass finishes
+            due = [name for name, at in self.next_due.items() if at <= now and name not in self.running]
+            if not due:
+                return
+            for name in due:
+                self.next_due[name] = now + self.intervals[name]
+            self.running.update(due)
+        for name in due:
+            self._passes.submit(self._cycle, [name])
+
+    def _cycle(self, sources):
+        try:
+            self.aggregator.run(sources=None if self.aggregator.demo_mode else sources)
+        except Exception as e:
+            logging.error(f"Pipeline pass for {', '.join(sources)} failed: {e}")
+        finally:
+            with self._lock:
+                self.running.difference_update(sources)
+                self.finished.update(sources)
+                self.cycles += 1
+                self._idle.notify_all()
+
+    def _check_scoring(self):
+        # While a reload runs the file is not checked; an edit made meanwhile is seen right after it
+        if self._reloading or not self.scoring.changed():
+            return
+        self._reloading = True
+        self._reloads.submit(self._reload_scoring)
+
+    def _check_recency(self, now):
+        if self._refreshing or now < self._next_refresh:
+            return
+        self._next_refresh = now + self.recency_interval
+        self._refreshing = True
+        self._reloads.submit(self._refresh_recency)
+
+    def _refresh_recency(self):
+        try:
+            self.aggregator.refresh_recency()
+        except Exception as e:
+            logging.error(f"Refreshing recency bonuses failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def _reload_scoring(self):
+        try:
+            try:
+                config = self.scoring.load()
+            except (OSError, ValueError) as e:
+                logging.error(f"⚠️  Scoring config not reloaded, keeping the current one: {e}")
+                return
+            self.aggregator.reload_scoring(config)
+            self._wait_for_passes()
+            self._rescore()
+        finally:
+            self._reloading = False
+
+    def _wait_for_passes(self):
+        """Waits for the passes running now (which may have scored with the old config) to finish."""
+        with self._idle:
+            started = {name: self.finished[name] for name in self.running}
+            while any(self.finished[name] == count for name, count in started.items()):
+                self._idle.wait()
+
+    def _rescore(self):
+        try:
+            self.aggregator.rescore_stored()
+        except Exception as e:
+            logging.error(f"Re-scoring stored notifications failed: {e}")
+
+    def _shutdown(self):
+        with self._lock:
+            in_flight = sorted(self.running)
+        if in_flight:
+            logging.info(f"⏳ Waiting for running passes: {', '.join(in_flight)}")
+        self._passes.shutdown(wait=True)
+        self._reloads.shutdown(wait=True)
+        self.aggregator.close()
+        logging.info(f"👋 Daemon stopped after {self.cycles} passes.")
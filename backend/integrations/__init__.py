@@ -0,0 +1,70 @@
+"""
+Live integrations by name.
+
+Each entry says where the client class lives and what it needs to run (environment
+variables, or one of a set of credential files). Nothing here imports a client: the SDKs
+behind them (slack_sdk, the Google API client, requests) take a good part of a second to
+load, so a source's module is only imported once it is enabled and configured.
+"""
+import hashlib
+import importlib
+import os
+from collections import namedtuple
+
+Integration = namedtuple("Integration", "module attr env files")
+
+INTEGRATIONS = {
+    "slack": Integration("backend.integrations.slack_integration", "SlackIntegration",
+                         env=("SLACK_BOT_TOKEN", "SLACK_CHANNEL_ID"), files=()),
+    "github": Integration("backend.integrations.github_client", "GitHubClient",
+                          env=("GITHUB_TOKEN",), files=()),
+    "jira": Integration("backend.integrations.jira_client", "JiraClient",
+                        env=("JIRA_DOMAIN", "JIRA_EMAIL", "JIRA_API_TOKEN"), files=()),
+    "discord": Integration("backend.integrations.discord_integration", "DiscordIntegration",
+                           env=("DISCORD_BOT_TOKEN", "DISCORD_CHANNEL_ID"), files=()),
+    # Google clients log in with a saved token.json, or run the OAuth flow from credentials.json
+    "gmail": Integration("backend.integrations.gmail_integration", "GmailIntegration",
+                         env=(), files=("token.json", "credentials.json")),
+    "calendar": Integration("backend.integrations.calendar_integration", "CalendarIntegration",
+                            env=(), files=("token.json", "credentials.json")),
+}
+
+
+# Every variable that holds a credential; a tenant's environment never inherits these from the process
+CREDENTIAL_VARS = frozenset(var for integration in INTEGRATIONS.values() for var in integration.env)
+
+
+def missing(name, env=None, directory=""):
+    """
+    What a source still needs before it can run: unset variables or the absent credential files.
+    'env' and 'directory' are where a tenant keeps them (default: the process environment and cwd).
+    """
+    env = os.environ if env is None else env
+    integration = INTEGRATIONS[name]
+    needs = [var for var in integration.env if not env.get(var)]
+    if integration.files and not any(os.path.exists(os.path.join(directory, path)) for path in integration.files):
+        needs.append(" or ".join(integration.files))
+    return needs
+
+
+def configured(name, env=None, directory=""):
+    return not missing(name, env, directory)
+
+
+def credential_scope(name, env=None, directory=""):
+    """
+    Short hash identifying the account a source is called as (its credentials, or the directory
+    holding its token file). API quotas belong to that account, so tenants sharing one share a bucket.
+    """
+    env = os.environ if env is None else env
+    integration = INTEGRATIONS[name]
+    identity = [env.get(var) or "" for var in integration.env]
+    if integration.files:
+        identity.append(os.path.abspath(directory))
+    return hashlib.blake2b("\x1f".join(identity).encode(), digest_size=4).hexdigest()
+
+
+def load(name):
+    """The client class for a source, importing its module (and SDK) on first use."""
+    integration = INTEGRATIONS[name]
+    return getattr(importlib.import_module(integration.module), integration.attr)
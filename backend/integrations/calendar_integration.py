@@ -8,16 +8,16 @@ from googleapiclient.discovery import build
 class CalendarIntegration:
     """
     Connects to Google Calendar to fetch upcoming events.
-    Requires: credentials.json
+    Requires: credentials.json (in the root directory, or a tenant's 'credentials_dir')
     """
     
     SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 
-    def __init__(self):
+    def __init__(self, credentials_dir=""):
         self.creds = None
         self.service = None
-        self.token_path = 'token.json'
-        self.creds_path = 'credentials.json'
+        self.token_path = os.path.join(credentials_dir, 'token.json')
+        self.creds_path = os.path.join(credentials_dir, 'credentials.json')
         
         self._authenticate()
 
@@ -69,6 +69,7 @@ class CalendarIntegration:
             for event in events:
                 start = event['start'].get('dateTime', event['start'].get('date'))
                 clean_events.append({
+                    "id": event['id'],
                     "title": event.get('summary', 'Busy'),
                     "start": start,
                     "link": event.get('htmlLink', '#'),
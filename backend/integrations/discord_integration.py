@@ -1,43 +1,86 @@
 import os
-import requests
+from backend.integrations.http_transport import get_shared_transport
 
 class DiscordIntegration:
     """
     Connects to Discord API to fetch messages from a specific channel.
-    Requires: DISCORD_BOT_TOKEN and DISCORD_CHANNEL_ID in .env
+    Requires: DISCORD_BOT_TOKEN and DISCORD_CHANNEL_ID in .env (or in 'env', a tenant's environment)
     """
     
-    def __init__(self):
-        self.token = os.getenv("DISCORD_BOT_TOKEN")
-        self.channel_id = os.getenv("DISCORD_CHANNEL_ID")
-        self.base_url = "https://discord.com/api/v10"
+    def __init__(self, timeout=None, transport=None, env=None):
+        env = os.environ if env is None else env
+        self.token = env.get("DISCORD_BOT_TOKEN")
+        self.channel_id = env.get("DISCORD_CHANNEL_ID")
+        self.base_url = env.get("DISCORD_API_URL", "https://discord.com/api/v10")
+        self.timeout = timeout
+        self.transport = transport or get_shared_transport()
+        # Highest message snowflake seen by the last fetch; pass it back as 'after' next time
+        self.sync_cursor = None
 
         if not self.token:
             print("⚠️ DISCORD_BOT_TOKEN not found in .env")
 
-    def fetch_messages(self, limit=10):
+    def fetch_messages(self, limit=10, after=None):
         """
         Fetches recent messages from the configured channel via REST API.
+        If 'after' (a message snowflake) is given, only newer messages are returned.
         """
+        return [msg for page in self.iter_pages(after=after, max_items=limit) for msg in page]
+
+    def iter_pages(self, after=None, page_size=100, max_items=1000):
+        """
+        Yields pages of channel messages until the channel is exhausted or 'max_items' have been yielded.
+        Without a cursor we walk back through history with 'before' (newest page first).
+        With 'after' we walk forward from the cursor, oldest page first, so a budget cut
+        leaves the newest messages for the next run instead of skipping them.
+        """
+        self.sync_cursor = after
         if not self.token or not self.channel_id:
-            return []
+            return
 
         headers = {
             "Authorization": f"Bot {self.token}",
             "Content-Type": "application/json"
         }
 
-        try:
-            # REST API call to get channel messages
-            url = f"{self.base_url}/channels/{self.channel_id}/messages?limit={limit}"
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
+        # Discord caps 'limit' at 100
+        page_size = min(page_size, 100)
+        url = f"{self.base_url}/channels/{self.channel_id}/messages"
+        anchor = ("after", after) if after else ("before", None)
+        remaining = max_items
+
+        while remaining > 0:
+            params = {"limit": min(page_size, remaining)}
+            if anchor[1]:
+                params[anchor[0]] = anchor[1]
+
+            try:
+                # REST API call to get channel messages
+                response = self.transport.get(url, rate_key=("discord", "channel_messages"), headers=headers,
+                                              params=params, timeout=self.timeout)
+            except Exception as e:
+                print(f"❌ Discord Connection Error: {e}")
+                return
+
+            if response.status_code != 200:
                 print(f"❌ Discord Error {response.status_code}: {response.text}")
-                return []
-                
-        except Exception as e:
-            print(f"❌ Discord Connection Error: {e}")
-            return []
\ No newline at end of file
+                return
+
+            messages = response.json()
+            if not messages:
+                return
+
+            # Snowflakes are numeric strings; compare them as integers
+            newest = max((m['id'] for m in messages), key=int)
+            oldest = min((m['id'] for m in messages), key=int)
+            if self.sync_cursor is None or int(newest) > int(self.sync_cursor):
+                self.sync_cursor = newest
+
+            remaining -= len(messages)
+            yield messages
+
+            if len(messages) < params["limit"]:
+                return
+            anchor = (anchor[0], newest if anchor[0] == "after" else oldest)
+
+        print(f"⚠️ Discord: stopped after {max_items} messages.")
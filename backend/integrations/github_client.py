@@ -1,71 +1,158 @@
 import os
-import requests
 from datetime import datetime
+from backend.integrations.http_transport import get_shared_transport
+from backend.processing.normalizer import NotificationNormalizer
 
 class GitHubClient:
     """
     Real integration with GitHub API.
     Fetches Pull Requests where the user is requested for review or assigned.
+    Settings come from 'env' (a tenant's environment), by default the process environment.
     """
     
-    def __init__(self):
-        self.token = os.getenv("GITHUB_TOKEN")
-        self.base_url = "https://api.github.com"
+    def __init__(self, timeout=None, transport=None, env=None):
+        env = os.environ if env is None else env
+        self.token = env.get("GITHUB_TOKEN")
+        # GITHUB_API_URL lets us point at GitHub Enterprise (or a local stub)
+        self.base_url = env.get("GITHUB_API_URL", "https://api.github.com")
+        # With a shared (bot) token, GITHUB_USER names whose reviews/assignments to fetch instead of '@me'
+        self.user = env.get("GITHUB_USER") or "@me"
+        self.timeout = timeout
+        self.transport = transport or get_shared_transport()
+        # Latest 'updated_at' seen by the last fetch; pass it back as 'since' next time
+        self.sync_cursor = None
+        # Raw items the last fetch found closed or merged (not yielded); the aggregator removes them
+        self.resolved = []
         self.headers = {
             "Authorization": f"token {self.token}",
             "Accept": "application/vnd.github.v3+json"
         }
 
-    def fetch_data(self):
+    def fetch_data(self, since=None):
         """
         Main entry point used by the aggregator.
-        Returns a list of standardized notification dictionaries.
+        Returns a list of standardized notifications.
+        If 'since' (ISO timestamp) is given, only issues/PRs updated at or after it are returned.
         """
+        normalizer = NotificationNormalizer()
+        return [n for page in self.iter_pages(since) for n in normalizer.normalize_batch(page, "github")]
+
+    def iter_pages(self, since=None, page_size=100, max_items=1000):
+        """
+        Yields pages of raw items (see raw_item), following the 'next' Link header
+        of each search until it runs out or 'max_items' items have been yielded.
+        The pipeline's normalizer maps them with the "github" spec.
+
+        Each search walks the oldest updates first, and the budget is shared out between them.
+        A search the budget cut short holds the cursor at the last item it delivered, so the
+        next run picks up where it stopped instead of skipping what it did not get to.
+
+        With a cursor, closed and merged items are listed too: they go to 'resolved' instead of
+        being yielded, so the ones stored while they were open can be dropped.
+        """
+        self.sync_cursor = since
+        self.resolved = []
         if not self.token:
             print("⚠️ GitHub Token missing. Skipping.")
-            return []
-
-        notifications = []
-        
-        # 1. Get PRs where I am requested for review
-        notifications.extend(self._get_review_requests())
-        
-        # 2. Get Issues/PRs assigned to me
-        notifications.extend(self._get_assignments())
-        
-        return notifications
-
-    def _get_review_requests(self):
-        # Query: type:pr state:open review-requested:@me
-        params = {'q': 'type:pr state:open review-requested:@me'}
-        return self._execute_search(params, "Review Required", "high")
-
-    def _get_assignments(self):
-        # Query: assignee:@me state:open
-        params = {'q': 'assignee:@me state:open'}
-        return self._execute_search(params, "Assigned to You", "normal")
-
-    def _execute_search(self, params, prefix, default_priority):
-        results = []
-        try:
-            response = requests.get(f"{self.base_url}/search/issues", headers=self.headers, params=params)
-            if response.status_code == 200:
-                items = response.json().get('items', [])
-                for item in items:
-                    results.append({
-                        "id": str(item['id']),
-                        "source": "github",
-                        "type": "pr",
-                        "title": f"{prefix}: {item['title']}",
-                        "content": f"Repo: {item['repository_url'].split('/')[-1]}",
-                        "sender": {"name": item['user']['login'], "email": ""},
-                        "timestamp": item['created_at'], # ISO format
-                        "priority": default_priority,
-                        "url": item['html_url']
-                    })
-            else:
+            return
+
+        # A first sync only needs what is open; later ones must also see what closed since
+        state = "" if since else " state:open"
+        searches = [
+            # 1. Get PRs where I am requested for review
+            (f'type:pr review-requested:{self.user}{state}', "Review Required", "high"),
+            # 2. Get Issues/PRs assigned to me
+            (f'assignee:{self.user}{state}', "Assigned to You", "normal"),
+        ]
+
+        remaining = max_items
+        newest, resume_points = since, []
+        for i, (query, prefix, default_priority) in enumerate(searches):
+            # An even share of what is left, so a busy first search cannot starve the second
+            budget = remaining // (len(searches) - i)
+            params = {'q': self._with_since(query, since), 'sort': 'updated', 'order': 'asc', 'per_page': page_size}
+            result = yield from self._search_pages(params, prefix, default_priority, budget)
+            if result is None:
+                # A failed search may leave a gap behind the pages we did get; fetch them again next time
+                self.sync_cursor = since
+                return
+            unused, complete, last = result
+            remaining -= budget - unused
+            if last and (newest is None or last > newest):
+                newest = last
+            if not complete:
+                resume_points.append(last or since)
+
+        if not resume_points:
+            self.sync_cursor = newest
+        elif None not in resume_points:
+            self.sync_cursor = min(resume_points)
+
+    def _with_since(self, query, since):
+        # '>=' keeps items updated in the same second as the cursor; re-fetching one is harmless
+        return f"{query} updated:>={since}" if since else query
+
+    def _search_pages(self, params, prefix, default_priority, max_items):
+        """
+        Yields result pages of one search. Returns (unused budget, whether the search ran to the end,
+        latest 'updated_at' delivered), or None if a request failed.
+        """
+        url = f"{self.base_url}/search/issues"
+        last = None
+        while url:
+            if max_items <= 0:
+                print(f"⚠️ GitHub: item budget reached; the rest of '{prefix}' is fetched next run.")
+                return max_items, False, last
+            try:
+                response = self.transport.get(url, rate_key=("github", "search"), headers=self.headers,
+                                              params=params, timeout=self.timeout)
+            except Exception as e:
+                print(f"❌ Error connecting to GitHub: {e}")
+                return None
+
+            if response.status_code != 200:
                 print(f"❌ GitHub Error {response.status_code}: {response.text}")
-        except Exception as e:
-            print(f"❌ Error connecting to GitHub: {e}")
-        
-        return results
\ No newline at end of file
+                return None
+
+            items = response.json().get('items', [])
+            taken = items[:max_items]
+            results = []
+            for item in taken:
+                if item.get('state') == 'closed':
+                    self.resolved.append(self.raw_item(item, prefix, default_priority))
+                else:
+                    results.append(self.raw_item(item, prefix, default_priority))
+
+                # ISO-8601 'Z' timestamps sort correctly as strings
+                updated_at = item.get('updated_at')
+                if updated_at and (last is None or updated_at > last):
+                    last = updated_at
+
+            max_items -= len(taken)
+            if results:
+                yield results
+            if len(items) > len(taken):
+                print(f"⚠️ GitHub: item budget reached; the rest of '{prefix}' is fetched next run.")
+                return max_items, False, last
+
+            # The 'next' link already carries the query and page number
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+        return max_items, True, last
+
+    @staticmethod
+    def raw_item(item, prefix, default_priority):
+        """
+        A search/issues item (or the equivalent webhook object), annotated with why it is in
+        our list ('reason') and its starting priority, for the normalizer's "github" spec.
+        """
+        return dict(item, reason=prefix, priority=default_priority)
+
+    @staticmethod
+    def to_notification(item, prefix, default_priority):
+        """
+        Maps one item straight to a notification. The ID is 'owner/repo#number',
+        which the search API and webhooks agree on.
+        """
+        return NotificationNormalizer().normalize(GitHubClient.raw_item(item, prefix, default_priority), "github")
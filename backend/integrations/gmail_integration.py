@@ -3,6 +3,9 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from backend.integrations.rate_limiter import RateLimitExceeded, get_shared_scheduler
 
 class GmailIntegration:
     """
@@ -12,16 +15,27 @@ class GmailIntegration:
     
     SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
-    def __init__(self):
+    # Gmail takes up to 100 calls per batch request, but recommends 50 to stay clear of rate limits
+    BATCH_SIZE = 50
+
+    def __init__(self, service=None, scheduler=None, credentials_dir=""):
         self.creds = None
-        self.service = None
+        self.scheduler = scheduler or get_shared_scheduler()
+        # An already-built API client (e.g. one pointed at a local fake) skips the OAuth flow
+        self.service = service
         
         # We look for token.json (saved login) or credentials.json (new login)
-        # Note: We look in the root directory for these files
-        self.token_path = 'token.json'
-        self.creds_path = 'credentials.json'
+        # Note: We look in the root directory (or a tenant's 'credentials_dir') for these files
+        self.token_path = os.path.join(credentials_dir, 'token.json')
+        self.creds_path = os.path.join(credentials_dir, 'credentials.json')
+
+        # Mailbox historyId at the last fetch; pass it back as 'history_id' next time
+        self.sync_cursor = None
+        # Emails the last fetch saw read, archived or deleted since the cursor; the aggregator removes them
+        self.resolved = []
         
-        self._authenticate()
+        if not self.service:
+            self._authenticate()
 
     def _authenticate(self):
         """Standard Google Authentication Flow"""
@@ -50,46 +64,192 @@ class GmailIntegration:
         except Exception as e:
             print(f"❌ Gmail Auth Error: {e}")
 
-    def fetch_emails(self, limit=5):
+    def fetch_emails(self, limit=5, history_id=None):
         """
         Fetches the latest unread emails.
+        If 'history_id' is given, only unread messages added since that mailbox state are returned.
+        """
+        return [email for page in self.iter_pages(history_id=history_id, max_items=limit) for email in page]
+
+    def iter_pages(self, history_id=None, page_size=100, max_items=1000):
+        """
+        Yields pages of unread emails, following 'nextPageToken' until the listing is exhausted
+        or 'max_items' emails have been yielded. Only IDs are listed up front; message details
+        are fetched one page at a time, in batch requests.
+        With a 'history_id', emails read, archived or deleted since then are listed in 'resolved',
+        and the oldest additions come first, so a sync cut short by 'max_items' leaves the cursor
+        at the last email it delivered rather than skipping the rest.
         """
+        self.sync_cursor = history_id
+        self.resolved = []
         if not self.service:
-            return []
+            return
 
         try:
-            # Get list of messages (IDs only)
-            results = self.service.users().messages().list(
-                userId='me', 
-                labelIds=['INBOX', 'UNREAD'], 
-                maxResults=limit
-            ).execute()
-            
-            messages = results.get('messages', [])
-            email_data = []
-
-            # Fetch full details for each message
-            for msg in messages:
-                txt = self.service.users().messages().get(
-                    userId='me', 
-                    id=msg['id'], 
-                    format='full'
-                ).execute()
-                
-                # Extract headers
-                headers = txt['payload']['headers']
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), "No Subject")
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), "Unknown")
-                
-                email_data.append({
-                    "id": msg['id'],
-                    "subject": subject,
-                    "from": sender,
-                    "snippet": txt.get('snippet', '')
-                })
-                
-            return email_data
+            # Take the mailbox position *before* listing, so nothing slips in between the two calls
+            latest_history_id = self._execute(self.service.users().getProfile(userId='me'), "profile").get('historyId')
+
+            listed = self._added_since_pages(history_id, page_size, max_items) if history_id else None
+            pages, resume_id = listed or (self._unread_pages(page_size, max_items), None)
+
+            for messages in pages:
+                yield self._fetch_details(messages)
+
+            # A history walk the budget cut short resumes after the last email it delivered
+            self.sync_cursor = resume_id or latest_history_id or history_id
 
         except Exception as e:
             print(f"❌ Gmail Fetch Error: {e}")
-            return []
\ No newline at end of file
+            self.sync_cursor = history_id
+
+    def _unread_pages(self, page_size, max_items):
+        """Lists unread inbox message IDs page by page, newest first."""
+        remaining = max_items
+        page_token = None
+        while remaining > 0:
+            params = {'userId': 'me', 'labelIds': ['INBOX', 'UNREAD'], 'maxResults': min(page_size, remaining)}
+            if page_token:
+                params['pageToken'] = page_token
+            # Get list of messages (IDs only)
+            results = self._execute(self.service.users().messages().list(**params), "messages.list")
+
+            messages = results.get('messages', [])[:remaining]
+            if messages:
+                remaining -= len(messages)
+                yield messages
+
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
+
+        print(f"⚠️ Gmail: stopped after {max_items} emails.")
+
+    def _fetch_details(self, messages):
+        """
+        Fetches Subject, From and the snippet for each message, BATCH_SIZE calls per HTTP request.
+        format='metadata' asks only for the two headers, so message bodies never come over the wire.
+        """
+        details = {}
+
+        for start in range(0, len(messages), self.BATCH_SIZE):
+            chunk = [msg['id'] for msg in messages[start:start + self.BATCH_SIZE]]
+
+            def send():
+                # Only the calls that have not succeeded yet go out (retries after a 429)
+                throttled, errors = [], []
+
+                def collect(request_id, response, exception):
+                    if exception is None:
+                        details[request_id] = response
+                    elif isinstance(exception, HttpError) and exception.resp.status == 429:
+                        throttled.append(exception)
+                    else:
+                        errors.append(exception)
+
+                batch = self.service.new_batch_http_request(callback=collect)
+                for message_id in chunk:
+                    if message_id not in details:
+                        batch.add(self.service.users().messages().get(
+                            userId='me',
+                            id=message_id,
+                            format='metadata',
+                            metadataHeaders=['Subject', 'From']
+                        ), request_id=message_id)
+                batch.execute()
+
+                if errors:
+                    # Same as a failed single get: the page is dropped and the cursor is not advanced
+                    raise errors[0]
+                return None, (429 if throttled else 200), (throttled[0].resp if throttled else {})
+
+            self.scheduler.call("gmail", "messages.batch_get", send)
+            if any(message_id not in details for message_id in chunk):
+                raise RateLimitExceeded("Gmail kept throttling the message batch")
+
+        email_data = []
+        for msg in messages:
+            txt = details[msg['id']]
+
+            # Extract headers
+            headers = txt['payload']['headers']
+            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), "No Subject")
+            sender = next((h['value'] for h in headers if h['name'] == 'From'), "Unknown")
+            
+            email_data.append({
+                "id": msg['id'],
+                "subject": subject,
+                "from": sender,
+                "snippet": txt.get('snippet', '')
+            })
+
+        return email_data
+
+    def _added_since_pages(self, history_id, page_size, max_items):
+        """
+        Uses the History API to list unread inbox messages added after 'history_id', and to collect
+        the ones that stopped being unread inbox messages into 'resolved'.
+        Returns None when Gmail no longer has that history (404), so the caller falls back to a full list.
+        Otherwise returns the IDs (oldest 'max_items' only) split into pages of 'page_size', and the
+        history ID to resume from if some were left out (None if none were).
+        """
+        added, resolved = {}, {}
+        page_token = None
+        while True:
+            # No 'labelId' filter: a message that was read no longer carries UNREAD, and we want to see it
+            params = {
+                'userId': 'me',
+                'startHistoryId': history_id,
+                'historyTypes': ['messageAdded', 'labelRemoved', 'messageDeleted']
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            try:
+                response = self._execute(self.service.users().history().list(**params), "history.list")
+            except HttpError as e:
+                if e.resp.status == 404:
+                    return None
+                raise
+
+            # Records are only IDs, so walking the whole history is cheap
+            for record in response.get('history', []):
+                for entry in record.get('messagesAdded', []):
+                    msg = entry['message']
+                    labels = msg.get('labelIds', [])
+                    if 'INBOX' in labels and 'UNREAD' in labels:
+                        # The record's ID is the mailbox state right after this message arrived
+                        added[msg['id']] = ({"id": msg['id']}, record.get('id'))
+                gone = [entry['message']['id'] for entry in record.get('labelsRemoved', [])
+                        if {'INBOX', 'UNREAD'} & set(entry.get('labelIds', []))]
+                gone += [entry['message']['id'] for entry in record.get('messagesDeleted', [])]
+                for message_id in gone:
+                    added.pop(message_id, None)
+                    resolved[message_id] = {"id": message_id}
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        self.resolved = list(resolved.values())
+        # History is oldest-first; keep the oldest 'max_items' messages and resume after the last of them
+        oldest = list(added.values())[:max(max_items, 0)]
+        resume_id = None
+        if len(oldest) < len(added):
+            resume_id = oldest[-1][1] if oldest else history_id
+            print(f"⚠️ Gmail: stopped after {max_items} emails; {len(added) - len(oldest)} newer ones are fetched next run.")
+        messages = [message for message, _ in oldest]
+        return [messages[i:i + page_size] for i in range(0, len(messages), page_size)], resume_id
+
+    def _execute(self, request, endpoint):
+        """Executes one API request through the shared rate-limit scheduler, retrying 429s."""
+        def send():
+            try:
+                return request.execute(), 200, {}
+            except HttpError as e:
+                if e.resp.status != 429:
+                    raise
+                return e, 429, e.resp
+
+        result = self.scheduler.call("gmail", endpoint, send)
+        if isinstance(result, HttpError):
+            raise result
+        return result
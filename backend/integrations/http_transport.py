@@ -0,0 +1,122 @@
+import threading
+from collections import Counter
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE
+from backend.integrations.rate_limiter import ScopedScheduler, get_shared_scheduler
+
+class HttpTransport:
+    """
+    Shared HTTP layer for the REST integrations (GitHub, Jira, Discord).
+    Keeps one keep-alive connection pool per host so TCP/TLS handshakes are paid
+    once and reused across requests, sources and pipeline runs.
+    """
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, scheduler=None):
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+
+        self.scheduler = scheduler or get_shared_scheduler()
+
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.bytes_received = 0
+        self.bytes_by_source = Counter()
+
+    def get(self, url, rate_key=None, **kwargs):
+        """
+        Drop-in replacement for requests.get() that goes through the pooled session.
+        With rate_key=(source, endpoint) the request is paced by the rate-limit scheduler
+        and retried while the API answers 429.
+        """
+        if rate_key is None:
+            return self._send(url, **kwargs)
+
+        def send():
+            response = self._send(url, source=rate_key[0], **kwargs)
+            return response, response.status_code, response.headers
+
+        return self.scheduler.call(*rate_key, send)
+
+    def _send(self, url, source=None, **kwargs):
+        response = self.session.get(url, **kwargs)
+        with self._lock:
+            self.request_count += 1
+            self.bytes_received += len(response.content)
+            if source is not None:
+                self.bytes_by_source[source] += len(response.content)
+        return response
+
+    def stats(self):
+        """
+        Connection-reuse counters per host.
+        'reused' is the number of requests that did not need a new connection.
+        """
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "reused": pool.num_requests - pool.num_connections
+            }
+
+        return {
+            "requests": self.request_count,
+            "bytes_received": self.bytes_received,
+            "bytes_by_source": dict(self.bytes_by_source),
+            "connections_opened": sum(h["connections_opened"] for h in hosts.values()),
+            "hosts": hosts
+        }
+
+    def close(self):
+        self.session.close()
+
+    def scoped(self, scopes):
+        """A tenant's view: the same pools and counters, with rate limits kept per account (ScopedScheduler)."""
+        return ScopedTransport(self, scopes)
+
+
+class ScopedTransport(HttpTransport):
+    """HttpTransport.scoped(): requests go out over the shared transport's pools."""
+
+    def __init__(self, transport, scopes):
+        self.shared = transport
+        self.scheduler = ScopedScheduler(transport.scheduler, scopes)
+
+    def _send(self, url, source=None, **kwargs):
+        return self.shared._send(url, source=source, **kwargs)
+
+    def stats(self):
+        return self.shared.stats()
+
+    def close(self):
+        # The pools belong to the shared transport, which outlives any one tenant
+        pass
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+def get_shared_transport(pool_maxsize=HTTP_POOL_MAXSIZE):
+    """
+    Returns the process-wide transport, creating it on first use.
+    A long-lived aggregator keeps reusing the same pools across runs.
+    'pool_maxsize' only applies to the first call (a multi-tenant process sizes it to its workers).
+    """
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport(pool_maxsize=pool_maxsize)
+        return _shared_transport
@@ -1,69 +1,136 @@
+import math
 import os
-import requests
 from requests.auth import HTTPBasicAuth
-from datetime import datetime
+from datetime import datetime, timezone
+from backend.integrations.http_transport import get_shared_transport
+from backend.processing.normalizer import NotificationNormalizer
 
 class JiraClient:
     """
     Real integration with Atlassian Jira API.
     Fetches unresolved tickets assigned to the user.
+    Settings come from 'env' (a tenant's environment), by default the process environment.
     """
     
-    def __init__(self):
-        self.domain = os.getenv("JIRA_DOMAIN")  # e.g., "yourcompany" (for yourcompany.atlassian.net)
-        self.email = os.getenv("JIRA_EMAIL")
-        self.token = os.getenv("JIRA_API_TOKEN")
+    def __init__(self, timeout=None, transport=None, env=None):
+        env = os.environ if env is None else env
+        self.domain = env.get("JIRA_DOMAIN")  # e.g., "yourcompany" (for yourcompany.atlassian.net)
+        self.email = env.get("JIRA_EMAIL")
+        self.token = env.get("JIRA_API_TOKEN")
         self.base_url = f"https://{self.domain}.atlassian.net/rest/api/3" if self.domain else None
+        # JIRA_API_URL overrides the cloud URL (self-hosted Jira or a local stub)
+        self.base_url = env.get("JIRA_API_URL", self.base_url)
+        # With a shared service account, JIRA_ACCOUNT_ID names whose tickets to fetch instead of currentUser()
+        self.assignee = f'"{env["JIRA_ACCOUNT_ID"]}"' if env.get("JIRA_ACCOUNT_ID") else "currentUser()"
+        self.timeout = timeout
+        self.transport = transport or get_shared_transport()
+        # Latest 'updated' timestamp seen by the last fetch; pass it back as 'since' next time
+        self.sync_cursor = None
+        # Raw issues the last fetch found resolved (not yielded); the aggregator removes them
+        self.resolved = []
 
-    def fetch_data(self):
+    def fetch_data(self, since=None):
         """
         Main entry point. Returns standardized notifications.
+        If 'since' (Jira ISO timestamp) is given, only tickets updated since then are returned.
         """
+        normalizer = NotificationNormalizer()
+        return [n for page in self.iter_pages(since) for n in normalizer.normalize_batch(page, "jira")]
+
+    def iter_pages(self, since=None, page_size=100, max_items=1000):
+        """
+        Yields pages of raw issues (see raw_item), walking the search with 'startAt'
+        until 'total' is reached or 'max_items' issues have been yielded.
+        The pipeline's normalizer maps them with the "jira" spec.
+        Issues come oldest update first, so when the budget cuts the walk short the cursor
+        stops at the last issue delivered and the next run picks up from there.
+
+        With a cursor, resolved tickets are listed too: they go to 'resolved' instead of being
+        yielded, so the ones stored while they were open can be dropped.
+        """
+        self.sync_cursor = since
+        self.resolved = []
         if not self.token or not self.domain or not self.email:
             print("⚠️ Jira credentials missing. Skipping.")
-            return []
-
-        notifications = []
-        
-        # JQL: assigned to me AND not done order by priority
-        jql = "assignee = currentUser() AND statusCategory != Done ORDER BY priority DESC"
-        
-        try:
-            response = requests.get(
-                f"{self.base_url}/search",
-                headers={"Accept": "application/json"},
-                params={'jql': jql, 'maxResults': 10},
-                auth=HTTPBasicAuth(self.email, self.token)
-            )
-            
-            if response.status_code == 200:
-                issues = response.json().get('issues', [])
-                for issue in issues:
-                    fields = issue['fields']
-                    priority_name = fields['priority']['name'].lower()
-                    
-                    # Map Jira priority to our system
-                    our_priority = "normal"
-                    if priority_name in ['highest', 'high', 'critical']:
-                        our_priority = "urgent"
-                    elif priority_name in ['medium']:
-                        our_priority = "high"
-
-                    notifications.append({
-                        "id": issue['id'],
-                        "source": "jira",
-                        "type": "ticket",
-                        "title": f"{issue['key']}: {fields['summary']}",
-                        "content": f"Status: {fields['status']['name']}",
-                        "sender": {"name": "Jira", "email": ""},
-                        "timestamp": fields['created'], # usually ISO format
-                        "priority": our_priority,
-                        "url": f"https://{self.domain}.atlassian.net/browse/{issue['key']}"
-                    })
-            else:
+            return
+
+        # JQL: assigned to me, oldest update first. A first sync only needs what is not done;
+        # later ones must also see what was resolved since.
+        jql_filter = f"assignee = {self.assignee}"
+        if since:
+            jql_filter += f" AND updated >= {self._relative_minutes(since)}"
+        else:
+            jql_filter += " AND statusCategory != Done"
+        jql = f"{jql_filter} ORDER BY updated ASC"
+
+        start_at = 0
+        remaining = max_items
+        while remaining > 0:
+            try:
+                response = self.transport.get(
+                    f"{self.base_url}/search",
+                    rate_key=("jira", "search"),
+                    headers={"Accept": "application/json"},
+                    params={'jql': jql, 'startAt': start_at, 'maxResults': min(page_size, remaining)},
+                    auth=HTTPBasicAuth(self.email, self.token),
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                print(f"❌ Error connecting to Jira: {e}")
+                # The pages we did get may be followed by a gap; redo the whole window next time
+                self.sync_cursor = since
+                return
+
+            if response.status_code != 200:
                 print(f"❌ Jira Error {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ Error connecting to Jira: {e}")
-            
-        return notifications
\ No newline at end of file
+                self.sync_cursor = since
+                return
+
+            body = response.json()
+            issues = body.get('issues', [])[:remaining]
+            if not issues:
+                return
+
+            page = []
+            for issue in issues:
+                (self.resolved if self.is_resolved(issue) else page).append(self.raw_item(issue))
+                updated = issue['fields'].get('updated')
+                if updated and (self.sync_cursor is None or self._parse(updated) > self._parse(self.sync_cursor)):
+                    self.sync_cursor = updated
+            remaining -= len(issues)
+            if page:
+                yield page
+
+            start_at += len(issues)
+            if start_at >= body.get('total', 0):
+                return
+
+        print(f"⚠️ Jira: stopped after {max_items} tickets; the rest are fetched next run.")
+
+    @staticmethod
+    def is_resolved(issue):
+        """Whether the issue's status is in the 'Done' category (resolved, closed, ...)."""
+        status = (issue.get('fields') or {}).get('status') or {}
+        return (status.get('statusCategory') or {}).get('key') == "done"
+
+    def raw_item(self, issue):
+        """A Jira issue (search result or webhook payload), annotated with the site its links point at."""
+        return dict(issue, site=f"{self.domain}.atlassian.net")
+
+    def to_notification(self, issue):
+        """Maps one issue straight to a notification (see the normalizer's "jira" spec)."""
+        return NotificationNormalizer().normalize(self.raw_item(issue), "jira")
+
+    def _parse(self, timestamp):
+        # Jira returns e.g. "2026-01-20T10:00:00.000+0000"
+        return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+    def _relative_minutes(self, since):
+        """
+        JQL date literals are read in the user's profile timezone, so we express the
+        cursor as a relative offset ("-42m") which the server resolves against its own clock.
+        One extra minute covers JQL's minute granularity.
+        """
+        elapsed = datetime.now(timezone.utc) - self._parse(since)
+        minutes = max(1, math.ceil(elapsed.total_seconds() / 60) + 1)
+        return f'"-{minutes}m"'
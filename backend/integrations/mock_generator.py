@@ -1,20 +1,78 @@
+import itertools
+import math
 import random
 import uuid
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from backend.processing.timestamps import to_epoch
+
+# Shape of the synthetic load produced by MockGenerator.stream(); override any key per generator
+LOAD_PROFILE = {
+    # Share of the stream per source
+    "sources": {"slack": 0.35, "gmail": 0.18, "discord": 0.14, "github": 0.14, "jira": 0.12, "calendar": 0.07},
+    # Words per title / body: log-normal (mu, sigma) of the word count, so most messages are a
+    # line or two and a few are pasted logs or long email threads
+    "title_words": (1.7, 0.35),
+    "content_words": (2.8, 0.9),
+    "max_content_words": 400,
+    # Share of items that re-report a recent incident (from the same or another source);
+    # 'near_duplicate_share' of those are reworded slightly instead of repeated verbatim
+    "duplicate_rate": 0.15,
+    "near_duplicate_share": 0.5,
+    "duplicate_window": 1000,   # How many recent incidents a duplicate may repeat
+    "incident_rate": 0.05,      # Items carrying incident vocabulary ("down", "error", ...)
+    "vip_rate": 0.03,           # Items from a VIP sender
+    # Timestamps: the stream covers the last 'span_hours' oldest first, but each item may be
+    # delivered up to 'skew_seconds' out of order; calendar events lie up to 'event_hours' ahead
+    "span_hours": 72,
+    "skew_seconds": 600,
+    "event_hours": 100,
+}
+
+# Everyday work vocabulary, most frequent first (drawn with Zipf-like weights)
+WORDS = (
+    "the to and a of for on in is we this it with please can you be that will are from at update "
+    "team meeting review today tomorrow week release build deploy service api customer report "
+    "draft notes question thanks follow up sync plan design doc branch merge test staging ticket "
+    "sprint board feedback schedule invoice account access request change config dashboard "
+    "metrics migration database cache queue worker job pipeline version patch fix feature issue "
+    "client project roadmap budget hiring onboarding security policy quarter goals status "
+    "standup retro demo launch backlog estimate scope owner handoff checklist approval contract"
+).split()
+INCIDENT_WORDS = ["urgent", "asap", "down", "error", "failed", "crash", "alert", "critical", "sev-1", "outage"]
+VIP_SENDERS = ["sarah.chen@company.com", "boss@company.com", "ceo@company.com"]
+CHANNELS = ["#eng", "#ops", "#general", "#support", "#random", "#releases"]
+REPOS = ["acme/api", "acme/web", "acme/infra", "acme/mobile"]
+JIRA_PRIORITIES = ["Highest", "High", "Medium", "Low", "Lowest"]
+
 
 class MockGenerator:
     """
     Generates data with specific KEYWORDS to trigger the Priority Engine.
+
+    generate() is the hand-made demo mix for the dashboard; stream() is a scalable load shaped
+    by LOAD_PROFILE, for benchmarks and profiling. Both are reproducible for a given 'seed'
+    (and 'now', which every timestamp is relative to).
     """
+
+    def __init__(self, seed=None, now=None, **profile):
+        self.rng = random.Random(seed)
+        self.now = now or datetime.now()
+        unknown = set(profile) - set(LOAD_PROFILE)
+        if unknown:
+            raise ValueError(f"Unknown load profile keys: {', '.join(sorted(unknown))}")
+        self.profile = {**LOAD_PROFILE, **profile}
+
     def generate(self, count=60):
         data = []
-        
+
         # === 1. FORCE URGENT ITEMS (Red Box) ===
         # We create 6 specific items guaranteed to be 'urgent'
         for _ in range(6):
             data.append(self._create_item("slack", "urgent", "CRITICAL: Production DB Down", "Database connection failed. Immediate action required."))
             data.append(self._create_item("jira", "urgent", "URGENT: Checkout 500 Error", "Users cannot pay. Sev-1 Incident."))
-            
+
         # === 2. FORCE IMPORTANT ITEMS (Blue Box) ===
         # We create 6 specific items guaranteed to be 'high'
         for _ in range(6):
@@ -28,46 +86,124 @@ class MockGenerator:
         sources = ['discord', 'slack', 'gmail', 'github', 'jira']
         # Calculate remaining slots to fill
         remaining = count - len(data)
-        
+
         for _ in range(max(0, remaining)):
-            source = random.choice(sources)
+            source = self.rng.choice(sources)
             data.append(self._create_item(source, "normal", "Generic Update", "Just a normal message to fill the stream."))
 
-        data.sort(key=lambda x: x['timestamp'], reverse=True)
+        data.sort(key=lambda x: to_epoch(x['timestamp']), reverse=True)
         return data
 
+    def stream(self, count):
+        """
+        Yields 'count' raw items as the integrations deliver them (Slack messages, Gmail
+        snippets, GitHub search items, ...), tagged with their 'source'. Items are built one
+        at a time, so a stream of millions costs no more memory than a short one.
+        """
+        profile, rng = self.profile, self.rng
+        sources, weights = zip(*profile["sources"].items())
+        source_cdf = list(itertools.accumulate(weights))
+        word_cdf = list(itertools.accumulate(1 / (rank + 8) for rank in range(1, len(WORDS) + 1)))
+        recent = deque(maxlen=profile["duplicate_window"])
+        now = self.now.timestamp()
+        start = now - profile["span_hours"] * 3600
+        step = profile["span_hours"] * 3600 / max(count, 1)
+
+        for n in range(count):
+            source = rng.choices(sources, cum_weights=source_cdf)[0]
+            if recent and rng.random() < profile["duplicate_rate"]:
+                title, content = rng.choice(recent)
+                if rng.random() < profile["near_duplicate_share"]:
+                    content = self._reword(content, word_cdf)
+            else:
+                title = self._text(profile["title_words"], word_cdf, 12).capitalize()
+                content = self._text(profile["content_words"], word_cdf, profile["max_content_words"])
+                if rng.random() < profile["incident_rate"]:
+                    title = f"{rng.choice(INCIDENT_WORDS).upper()}: {title}"
+                recent.append((title, content))
+
+            if source == "calendar":
+                epoch = now + rng.uniform(0.25, profile["event_hours"]) * 3600
+            else:
+                epoch = min(now, start + n * step + rng.uniform(-profile["skew_seconds"], profile["skew_seconds"]))
+            sender = rng.choice(VIP_SENDERS) if rng.random() < profile["vip_rate"] else f"user{rng.randint(1, 500)}"
+            item = self._raw(source, n, title, content, sender, epoch)
+            item["source"] = source
+            yield item
+
+    def _text(self, shape, word_cdf, limit):
+        mu, sigma = shape
+        length = max(1, min(limit, int(math.exp(self.rng.gauss(mu, sigma)))))
+        return " ".join(self.rng.choices(WORDS, cum_weights=word_cdf, k=length))
+
+    def _reword(self, content, word_cdf):
+        # Swap one word: a near-duplicate that an exact comparison would miss
+        words = content.split()
+        words[self.rng.randrange(len(words))] = self.rng.choices(WORDS, cum_weights=word_cdf)[0]
+        return " ".join(words)
+
+    def _raw(self, source, n, title, content, sender, epoch):
+        """One item in the shape the source's integration hands to the normalizer."""
+        rng = self.rng
+        if source == "slack":
+            return {"type": "message", "ts": f"{epoch:.6f}", "channel": "C0BENCH", "channel_name": rng.choice(CHANNELS),
+                    "user": sender, "text": f"{title}\n{content}"}
+        if source == "gmail":
+            return {"id": f"18d{n:010x}", "subject": title, "snippet": content[:200], "from": sender}
+        if source == "discord":
+            return {"id": str(1200000000000000000 + n), "content": f"{title} {content}", "channel": rng.choice(CHANNELS),
+                    "author": sender, "timestamp": datetime.fromtimestamp(epoch, timezone.utc).isoformat()}
+        if source == "calendar":
+            return {"id": f"evt{n}", "title": title, "start": datetime.fromtimestamp(epoch).isoformat(),
+                    "link": f"https://calendar.google.com/event?eid={n}", "creator": sender}
+        moment = datetime.fromtimestamp(epoch, timezone.utc)
+        if source == "github":
+            repo = rng.choice(REPOS)
+            return {"id": 3000000 + n, "number": n, "title": title, "body": content,
+                    "repository_url": f"https://api.github.com/repos/{repo}", "user": {"login": sender},
+                    "created_at": moment.strftime("%Y-%m-%dT%H:%M:%SZ"), "html_url": f"https://github.com/{repo}/pull/{n}",
+                    "reason": rng.choice(["Review Required", "Assigned"]), "priority": "high"}
+        return {"id": str(20000 + n), "key": f"OPS-{n}", "site": "acme.atlassian.net", "fields": {
+            "summary": title, "description": content, "status": {"name": rng.choice(["To Do", "In Progress"])},
+            "priority": {"name": rng.choice(JIRA_PRIORITIES)},
+            "created": moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}+0000"}}
+
     def _create_item(self, source, priority, title, content):
         # Maps sources to nice sender names
         senders = {
-            "slack": "DevOps Bot", "gmail": "AWS Billing", 
-            "discord": "Community Mgr", "github": "Dependabot", 
+            "slack": "DevOps Bot", "gmail": "AWS Billing",
+            "discord": "Community Mgr", "github": "Dependabot",
             "jira": "Jira System"
         }
-        
+
         return {
-            "id": str(uuid.uuid4()),
+            "id": self._uuid(),
             "source": source,
             "type": "message",
             "title": title,
             "content": content,
             "sender": {"name": senders.get(source, "System"), "email": ""},
             "timestamp": self._random_past_time(),
-            "priority": priority, 
+            "priority": priority,
             # Force high score if priority is high/urgent so the backend doesn't downgrade it
             "priority_score": 95 if priority == "urgent" else (80 if priority == "high" else 20)
         }
 
     def _random_past_time(self):
-        minutes_back = random.randint(1, 2800)
-        past_time = datetime.now() - timedelta(minutes=minutes_back)
+        minutes_back = self.rng.randint(1, 2800)
+        past_time = self.now - timedelta(minutes=minutes_back)
         return past_time.isoformat()
 
     def _create_calendar_event(self):
         titles = ["Team Standup", "Client Call", "Deep Work", "Project Review"]
-        future_time = (datetime.now() + timedelta(hours=random.randint(1, 100))).isoformat()
+        future_time = (self.now + timedelta(hours=self.rng.randint(1, 100))).isoformat()
         return {
-            "id": str(uuid.uuid4()), "source": "calendar", "type": "event",
-            "title": random.choice(titles), "content": "Zoom Link",
+            "id": self._uuid(), "source": "calendar", "type": "event",
+            "title": self.rng.choice(titles), "content": "Zoom Link",
             "sender": {"name": "Google Calendar", "email": ""},
             "timestamp": future_time, "priority": "normal", "priority_score": 50
-        }
\ No newline at end of file
+        }
+
+    def _uuid(self):
+        # Drawn from the seeded generator, so a seed reproduces the IDs too
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
@@ -0,0 +1,201 @@
+import random
+import threading
+import time
+from collections import defaultdict
+
+from backend.config import (
+    RATE_LIMITS,
+    DEFAULT_RATE_LIMIT,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_MAX_WAIT
+)
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than the scheduler's max_wait."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket: 'rate' tokens per second, at most 'capacity' banked.
+    reserve() hands out a token immediately and returns how long the caller must wait
+    before using it, so concurrent callers are spread out instead of all retrying at once.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        self._refill(now)
+        self.tokens -= 1
+        # Negative tokens are a debt that is paid back at 'rate'
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def block(self, until):
+        self.blocked_until = max(self.blocked_until, until)
+
+    def learn(self, remaining, reset_after, now):
+        """
+        Adopts the server's view of the quota: 'remaining' calls over the next 'reset_after' seconds.
+        """
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0:
+            self.block(now + reset_after)
+        elif reset_after > 0:
+            self.rate = remaining / reset_after
+
+
+class RateLimitScheduler:
+    """
+    Central pacing for every integration.
+    Keeps one token bucket per (source, endpoint), seeded from RATE_LIMITS and then tuned
+    from rate-limit response headers (X-RateLimit-*, Retry-After). Throttled responses
+    (429, or GitHub's 403 with no calls remaining) are retried with jittered backoff.
+    Time spent waiting for a slot and time spent on the wire are tracked per source.
+    """
+
+    def __init__(self, limits=None, default_limit=None, max_retries=None, max_wait=None):
+        self.limits = RATE_LIMITS if limits is None else limits
+        self.default_limit = default_limit or DEFAULT_RATE_LIMIT
+        self.max_retries = RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        self.max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self.buckets = {}
+        self.metrics = defaultdict(lambda: {
+            "requests": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0, "fetch_seconds": 0.0
+        })
+        self._lock = threading.Lock()
+
+    def _bucket(self, source, endpoint):
+        key = (source, endpoint)
+        if key not in self.buckets:
+            rate, capacity = self.limits.get(source, self.default_limit)
+            self.buckets[key] = TokenBucket(rate, capacity)
+        return self.buckets[key]
+
+    def acquire(self, source, endpoint):
+        """Blocks until the (source, endpoint) bucket allows another request."""
+        with self._lock:
+            wait = self._bucket(source, endpoint).reserve(time.monotonic())
+            if wait > self.max_wait:
+                # Hand the token back; we are not going to use it
+                self.buckets[(source, endpoint)].tokens += 1
+                raise RateLimitExceeded(f"{source} {endpoint}: next slot is {wait:.0f}s away")
+            self.metrics[source]["wait_seconds"] += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, source, endpoint, status, headers, elapsed, attempt=0):
+        """
+        Feeds one response back into the scheduler. Returns True if it was throttled and should be retried.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        now = time.monotonic()
+        remaining = _number(headers.get("x-ratelimit-remaining"))
+        throttled = status == 429 or (status == 403 and remaining == 0)
+
+        with self._lock:
+            bucket = self._bucket(source, endpoint)
+            stats = self.metrics[source]
+            stats["requests"] += 1
+            stats["fetch_seconds"] += elapsed
+            if attempt:
+                stats["retries"] += 1
+
+            reset_after = _reset_after(headers)
+            if remaining is not None and reset_after is not None:
+                bucket.learn(remaining, reset_after, now)
+
+            if throttled:
+                stats["throttled"] += 1
+                retry_after = _number(headers.get("retry-after"))
+                if retry_after is None:
+                    retry_after = reset_after if reset_after is not None else self.backoff(attempt)
+                # A little jitter so threads sharing the bucket don't all come back at the same instant
+                bucket.block(now + retry_after + random.uniform(0, 0.1 * retry_after + 0.05))
+
+        return throttled
+
+    def backoff(self, attempt, base=0.5, cap=30.0):
+        """Full-jitter exponential backoff for throttled responses that carry no hint."""
+        return random.uniform(0, min(cap, base * 2 ** attempt))
+
+    def call(self, source, endpoint, send):
+        """
+        Runs send() under the (source, endpoint) limit and retries it while it is throttled.
+        send() performs one request and returns (result, status, headers).
+        The last result is returned as-is once retries run out.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(source, endpoint)
+            started = time.monotonic()
+            result, status, headers = send()
+            if not self.record(source, endpoint, status, headers, time.monotonic() - started, attempt):
+                break
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {source: dict(values) for source, values in self.metrics.items()}
+
+
+class ScopedScheduler:
+    """
+    One tenant's view of a shared scheduler. Quotas belong to the account a request is made
+    as, so each source's endpoints get buckets of their own under 'scopes[source]' (see
+    integrations.credential_scope); tenants calling as the same account share them.
+    Stats stay per source, summed over every tenant.
+    """
+
+    def __init__(self, scheduler, scopes):
+        self.scheduler = scheduler
+        self.scopes = scopes
+
+    def call(self, source, endpoint, send):
+        scope = self.scopes.get(source)
+        return self.scheduler.call(source, f"{scope}/{endpoint}" if scope else endpoint, send)
+
+    def stats(self):
+        return self.scheduler.stats()
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_after(headers):
+    """Seconds until the quota window resets, from whichever header style the server uses."""
+    # Discord: relative seconds
+    reset_after = _number(headers.get("x-ratelimit-reset-after"))
+    if reset_after is not None:
+        return reset_after
+    # GitHub: epoch seconds
+    reset = _number(headers.get("x-ratelimit-reset"))
+    if reset is not None:
+        return max(0.0, reset - time.time())
+    return None
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+def get_shared_scheduler():
+    """
+    Returns the process-wide scheduler, so every client draws from the same buckets.
+    """
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RateLimitScheduler()
+        return _shared_scheduler
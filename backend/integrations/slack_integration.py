@@ -1,52 +1,155 @@
 import os
+from collections import deque
+
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from backend.integrations.rate_limiter import RateLimitExceeded, get_shared_scheduler
+
 class SlackIntegration:
     """
     Connects to Slack API to fetch recent messages.
-    Requires: SLACK_BOT_TOKEN in .env
+    Requires: SLACK_BOT_TOKEN in .env (or in 'env', a tenant's environment)
     """
     
-    def __init__(self):
+    def __init__(self, timeout=30, scheduler=None, env=None):
+        env = os.environ if env is None else env
+        self.scheduler = scheduler or get_shared_scheduler()
         # We look for the token in environment variables
-        self.token = os.getenv("SLACK_BOT_TOKEN")
+        self.token = env.get("SLACK_BOT_TOKEN")
+        self.channel_id = env.get("SLACK_CHANNEL_ID")
         if not self.token:
             print("⚠️ SLACK_BOT_TOKEN not found in .env")
             self.client = None
         else:
-            self.client = WebClient(token=self.token)
+            # SLACK_API_URL is only set when pointing at a local stub
+            self.client = WebClient(
+                token=self.token,
+                base_url=env.get("SLACK_API_URL", WebClient.BASE_URL),
+                timeout=int(timeout)
+            )
 
-    def fetch_messages(self, channel_id=None, limit=10):
+        # Newest message 'ts' delivered by the last fetch; pass it back as 'oldest' next time
+        self.sync_cursor = None
+
+    def fetch_messages(self, channel_id=None, limit=10, oldest=None):
         """
         Fetches last 'limit' messages from a channel.
+        If 'oldest' (a message ts) is given, only messages newer than it are returned.
+        """
+        return [msg for page in self.iter_pages(channel_id, oldest=oldest, max_items=limit) for msg in page]
+
+    def iter_pages(self, channel_id=None, oldest=None, page_size=100, max_items=1000):
         """
+        Yields pages of messages, following response_metadata.next_cursor until the channel
+        history is exhausted or 'max_items' messages have been yielded.
+        Without 'oldest' (a first sync) the newest messages come first, and older history
+        past 'max_items' is skipped.
+        If 'oldest' (a message ts) is given, only messages newer than it are returned, oldest
+        first: a sync the budget cut short moves the cursor only as far as what it delivered,
+        so the next run picks up the rest instead of skipping it.
+        """
+        self.sync_cursor = oldest
         if not self.client:
-            return []
+            return
 
         # If no channel provided, try to use a default or find general
         if not channel_id:
-            channel_id = os.getenv("SLACK_CHANNEL_ID")
+            channel_id = self.channel_id
 
         if not channel_id:
             print("⚠️ SLACK_CHANNEL_ID not set. Cannot fetch.")
-            return []
+            return
+
+        if oldest:
+            yield from self._pages_since(channel_id, oldest, page_size, max_items)
+            return
+
+        params = {"channel": channel_id}
+        remaining = max_items
+        while remaining > 0:
+            try:
+                response = self._call("conversations.history", limit=min(page_size, remaining), **params)
+            except (SlackApiError, RateLimitExceeded) as e:
+                print(f"❌ Slack API Error: {e.response['error'] if isinstance(e, SlackApiError) else e}")
+                # A gap may be left behind the pages we did get; fetch them again next time
+                self.sync_cursor = oldest
+                return
+
+            messages = self._tag(response["messages"][:remaining], channel_id)
+            if messages:
+                newest = max(messages, key=lambda m: float(m.get("ts", 0)))
+                if self.sync_cursor is None or float(newest.get("ts", 0)) > float(self.sync_cursor):
+                    self.sync_cursor = newest.get("ts", self.sync_cursor)
+                remaining -= len(messages)
+                yield messages
+
+            next_cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not response.get("has_more") or not next_cursor:
+                return
+            params["cursor"] = next_cursor
+
+        print(f"⚠️ Slack: stopped after {max_items} messages; older history was skipped.")
+
+    def _pages_since(self, channel_id, oldest, page_size, max_items):
+        """
+        Messages newer than 'oldest', oldest first, at most 'max_items' of them.
+        Slack only lists newest first, so the window is walked to its start keeping the oldest
+        'max_items' seen (never more than those plus one page in memory), then they are yielded.
+        """
+        # 'oldest' is inclusive only with inclusive=True, so the boundary message is skipped
+        params = {"channel": channel_id, "oldest": oldest}
+        kept = deque(maxlen=max(max_items, 0))
+        skipped = 0
+        while True:
+            try:
+                response = self._call("conversations.history", limit=page_size, **params)
+            except (SlackApiError, RateLimitExceeded) as e:
+                print(f"❌ Slack API Error: {e.response['error'] if isinstance(e, SlackApiError) else e}")
+                return
 
-        try:
-            response = self.client.conversations_history(
-                channel=channel_id,
-                limit=limit
-            )
-            
-            messages = []
             for msg in response["messages"]:
-                # We add 'channel_name' manually so the normalizer can see it
-                # (In a full app, we'd fetch info for the channel ID)
-                msg['channel_name'] = "Slack Channel"
-                messages.append(msg)
-                
-            return messages
-
-        except SlackApiError as e:
-            print(f"❌ Slack API Error: {e.response['error']}")
-            return []
\ No newline at end of file
+                # Newest first: once full, every message added pushes out a newer one
+                skipped += len(kept) == kept.maxlen
+                kept.append(msg)
+
+            next_cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not response.get("has_more") or not next_cursor:
+                break
+            params["cursor"] = next_cursor
+
+        messages = sorted(kept, key=lambda m: float(m.get("ts", 0)))
+        for start in range(0, len(messages), page_size):
+            page = self._tag(messages[start:start + page_size], channel_id)
+            self.sync_cursor = page[-1].get("ts", self.sync_cursor)
+            yield page
+
+        if skipped:
+            print(f"⚠️ Slack: stopped after {max_items} messages; {skipped} newer ones are fetched next run.")
+
+    def _tag(self, messages, channel_id):
+        for msg in messages:
+            # We add 'channel_name' manually so the normalizer can see it
+            # (In a full app, we'd fetch info for the channel ID)
+            msg['channel_name'] = "Slack Channel"
+            msg['channel'] = channel_id
+        return messages
+
+    def _call(self, method, **params):
+        """
+        Calls a Web API method through the shared rate-limit scheduler.
+        'ratelimited' (HTTP 429) answers are retried after their Retry-After; other errors raise.
+        """
+        def send():
+            try:
+                response = self.client.api_call(method, http_verb="GET", params=params)
+                return response, response.status_code, response.headers
+            except SlackApiError as e:
+                if e.response.status_code != 429:
+                    raise
+                return e, 429, e.response.headers
+
+        result = self.scheduler.call("slack", method, send)
+        if isinstance(result, SlackApiError):
+            raise result
+        return result
@@ -0,0 +1,294 @@
+"""
+The notification data model shared by the normalizer, the engine and storage.
+
+A Notification keeps its fields in __slots__ instead of a per-item dict. Values that repeat
+across items are shared rather than copied: 'source', 'type' and 'priority' are enum members
+(str subclasses, so they compare, hash and serialize exactly like the plain strings), senders
+come from one table of immutable Sender objects, and tags become interned tuples.
+
+It still reads and writes like the dict it replaces (note["title"], note.get("sender", {}),
+note["priority"] = "high", "count" in note), so dicts and Notifications can be passed to the
+same code. Keys outside the model are kept in a small 'extra' dict. An unset field is simply
+an absent key, so to_dict()/to_json() produce the same documents as before.
+"""
+import json
+import operator
+import sys
+from collections.abc import Mapping, MutableMapping
+from enum import Enum
+
+
+class Label(str, Enum):
+    """A string enum whose members behave like their plain value everywhere, including as dict keys."""
+
+    __hash__ = str.__hash__
+    __format__ = str.__format__
+
+    def __str__(self):
+        return self.value
+
+    @classmethod
+    def of(cls, value):
+        """The member for 'value', or the interned string if it is not a known one."""
+        member = cls._value2member_map_.get(value)
+        if member is not None:
+            return member
+        return sys.intern(value) if type(value) is str else value
+
+
+class Source(Label):
+    SLACK = "slack"
+    GMAIL = "gmail"
+    DISCORD = "discord"
+    CALENDAR = "calendar"
+    GITHUB = "github"
+    JIRA = "jira"
+
+
+class NotificationType(Label):
+    MESSAGE = "message"
+    DM = "dm"
+    MENTION = "mention"
+    EMAIL = "email"
+    EVENT = "event"
+    PR = "pr"
+    TICKET = "ticket"
+
+
+class Priority(Label):
+    URGENT = "urgent"
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class Sender:
+    """
+    An immutable (name, email) pair. Sender.of() hands out one shared instance per pair,
+    so a thousand notifications from the same bot hold one sender between them.
+    """
+
+    __slots__ = ("name", "email")
+
+    # Shared instances by (name, email). Cleared when it grows past TABLE_SIZE: senders
+    # already handed out stay valid, new ones just stop being shared with them.
+    TABLE_SIZE = 100_000
+    _table = {}
+
+    def __init__(self, name="Unknown", email=""):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "email", email)
+
+    @classmethod
+    def of(cls, value):
+        if isinstance(value, Sender):
+            return value
+        value = value or {}
+        key = (value.get("name"), value.get("email"))
+        sender = cls._table.get(key)
+        if sender is None:
+            if len(cls._table) >= cls.TABLE_SIZE:
+                cls._table.clear()
+            sender = cls._table.setdefault(key, cls(*key))
+        return sender
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Sender is shared between notifications and cannot be changed")
+
+    def __reduce__(self):
+        # Unpickled senders (e.g. from a worker process) rejoin the shared table
+        return Sender.of, (self.to_dict(),)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in ("name", "email") else default
+
+    def __getitem__(self, key):
+        if key not in ("name", "email"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if isinstance(other, Sender):
+            return (self.name, self.email) == (other.name, other.email)
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.name, self.email))
+
+    def __repr__(self):
+        return f"Sender({self.name!r}, {self.email!r})"
+
+    def to_dict(self):
+        return {"name": self.name, "email": self.email}
+
+
+def _tags(value):
+    return tuple(sys.intern(tag) if type(tag) is str else tag for tag in value) if value else ()
+
+
+def _interned(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _label(enum):
+    """Label.of() for one enum, as a plain dict lookup (it runs for every notification loaded)."""
+    members = dict(enum._value2member_map_)
+    return lambda value: members.get(value) or _interned(value)
+
+
+def _sources(value):
+    return [Source.of(source) for source in value]
+
+
+FIELDS = (
+    "id", "source", "type", "title", "content", "sender", "timestamp", "timestamp_epoch", "priority", "is_read",
+    "channel", "url", "tags", "priority_score", "priority_reasons", "source_priority", "count", "sources",
+)
+_FIELD_SET = frozenset(FIELDS)
+_ALL_FIELDS = operator.attrgetter(*FIELDS)
+# How each field is stored; anything not listed is kept as given
+_COERCE = {
+    "source": _label(Source),
+    "type": _label(NotificationType),
+    "priority": _label(Priority),
+    "source_priority": _label(Priority),
+    "sender": Sender.of,
+    "tags": _tags,
+    "channel": _interned,
+    "sources": _sources,
+}
+# Marks an unset field (an absent key); every slot always holds a value, which keeps reads cheap
+_MISSING = type("Missing", (), {"__repr__": lambda self: "<missing>"})()
+
+
+class Notification(MutableMapping):
+    """One notification. See the module docstring for how it relates to the dicts it replaces."""
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, fields=None, **kwargs):
+        fields = {**fields, **kwargs} if fields and kwargs else (fields or kwargs)
+        for key in _FIELD_SET.difference(fields):
+            setattr(self, key, _MISSING)
+        self.extra = None
+        # __setitem__ inlined: this runs for every field of every notification read from the store
+        for key, value in fields.items():
+            if key in _FIELD_SET:
+                coerce = _COERCE.get(key)
+                setattr(self, key, coerce(value) if coerce is not None and value is not None else value)
+            else:
+                self[key] = value
+
+    @classmethod
+    def of(cls, item):
+        """'item' itself if it already is a Notification, else a Notification built from the dict."""
+        return item if isinstance(item, Notification) else cls(item)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(json.loads(text))
+
+    def to_dict(self):
+        data = {key: value for key, value in zip(FIELDS, _ALL_FIELDS(self)) if value is not _MISSING}
+        if "sender" in data and data["sender"] is not None:
+            data["sender"] = data["sender"].to_dict()
+        if "tags" in data:
+            data["tags"] = list(data["tags"])
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def copy(self):
+        clone = Notification.__new__(Notification)
+        for key, value in zip(FIELDS, _ALL_FIELDS(self)):
+            setattr(clone, key, value)
+        clone.extra = dict(self.extra) if self.extra else None
+        return clone
+
+    def replace(self, **fields):
+        """A copy with 'fields' changed, leaving this notification as it was."""
+        clone = self.copy()
+        for key, value in fields.items():
+            clone[key] = value
+        return clone
+
+    def __reduce__(self):
+        return Notification, (self.to_dict(),)
+
+    # --- Dict interface ---
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        extra = self.extra
+        return extra.get(key, default) if extra else default
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            coerce = _COERCE.get(key)
+            setattr(self, key, coerce(value) if coerce is not None and value is not None else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET and getattr(self, key) is not _MISSING:
+            setattr(self, key, _MISSING)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return bool(self.extra) and key in self.extra
+
+    def __iter__(self):
+        for key, value in zip(FIELDS, _ALL_FIELDS(self)):
+            if value is not _MISSING:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, Notification):
+            other = other.to_dict()
+        elif not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == dict(other)
+
+    def __repr__(self):
+        return f"Notification({self.to_dict()!r})"
+
+
+def dumps(item):
+    """JSON text of a Notification or a plain dict."""
+    return item.to_json() if isinstance(item, Notification) else json.dumps(item, default=jsonable)
+
+
+def jsonable(value):
+    """json.dumps(default=jsonable): lets Notifications (and their senders) be serialized anywhere a dict is."""
+    if isinstance(value, (Notification, Sender)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
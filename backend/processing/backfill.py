@@ -0,0 +1,201 @@
+"""
+Re-scores stored notification history, e.g. after SCORING_WEIGHTS or URGENT_KEYWORDS change.
+
+rescore_history() re-scores everything. The store is split into rowid ranges. Each worker
+process builds its PriorityEngine (compiled keyword matcher included) once, then reads its
+ranges straight from SQLite, scores them with the batch path and sends back ready-to-write
+rows. The parent only does the bulk upserts, so the work that scales with item count runs in parallel.
+
+rescore_changed() is what runs after a scoring config change: the store remembers the config
+its scores were made with, and only the notifications the difference can affect are re-scored.
+
+refresh_recency() runs periodically: stored scores include a recency bonus that fades with time,
+so the notifications whose bonus may have changed since the last refresh are re-scored.
+
+Usage: python -m backend.processing.backfill [--workers N] [--chunk-size 5000] [--changed]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.processing.pipeline import chunked
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.scoring_config import ScoringConfig, load_scoring_config
+from backend.processing.timestamps import HOUR
+from backend.storage.backends import SQLiteBackend
+
+# Where a store keeps the scoring config its scores were made with (StorageBackend.get_meta)
+SCORING_META_KEY = "scoring_config"
+# ... and the clock time of the last recency refresh
+RECENCY_META_KEY = "recency_refreshed_at"
+
+# Per-process state, set up once by _init_worker
+_engine = None
+_store = None
+
+
+def _init_worker(db_path):
+    global _engine, _store
+    _engine = PriorityEngine()
+    _store = SQLiteBackend(db_path)
+
+
+def _rescore_range(bounds):
+    notes = _store.read_rowid_range(*bounds)
+    return [SQLiteBackend.to_row(note) for note in _engine.process_batch(notes)]
+
+
+def _log_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed else 0
+    percent = 100 * done / total if total else 100
+    logging.info(f"🔁 Re-scored {done:,}/{total:,} ({percent:.0f}%) at {rate:,.0f} items/s")
+
+
+def rescore_history(repository, workers=None, chunk_size=5000, progress=_log_progress):
+    """
+    Re-scores every stored notification and writes the results back in bulk.
+    'progress(done, total, elapsed_seconds)' is called after each chunk is written.
+    Returns the number of notifications re-scored.
+    """
+    backend = repository.backend
+    workers = workers or os.cpu_count() or 1
+    total = repository.count()
+    started = time.monotonic()
+    done = 0
+
+    if not isinstance(backend, SQLiteBackend):
+        # Single-file stores cannot be read in parallel; score in-process instead
+        scored = PriorityEngine().process_batch(repository.load_all())
+        repository.save_all(scored)
+        progress(len(scored), total, time.monotonic() - started)
+        return len(scored)
+
+    chunks = backend.rowid_chunks(chunk_size)
+
+    if workers == 1:
+        _init_worker(backend.path)
+        for bounds in chunks:
+            done += backend.upsert_rows(_rescore_range(bounds))
+            progress(done, total, time.monotonic() - started)
+    else:
+        # Keep a bounded number of chunks in flight so memory stays flat on large stores
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend.path,)) as pool:
+            pending = deque()
+            for bounds in chunks:
+                pending.append(pool.submit(_rescore_range, bounds))
+                if len(pending) >= workers * 2:
+                    done += backend.upsert_rows(pending.popleft().result())
+                    progress(done, total, time.monotonic() - started)
+            while pending:
+                done += backend.upsert_rows(pending.popleft().result())
+                progress(done, total, time.monotonic() - started)
+
+    repository.export_snapshot()
+    # What the workers scored with (each loaded it the same way)
+    backend.set_meta(SCORING_META_KEY, json.dumps(load_scoring_config().to_dict()))
+    return done
+
+
+def rescore_changed(repository, engine, batch_size=1000, log_prefix=""):
+    """
+    Brings the stored scores in line with engine's config. Compared with the config the store was
+    last scored with, only the notifications the change can affect are looked up (through the
+    store's full-text and score/time indexes) and re-scored; those that come out different are
+    written back. Returns (candidates looked at, notifications rewritten).
+    The first time a store is seen, its scores are taken to be the current config's.
+    """
+    backend = repository.backend
+    config = engine.scoring_config
+    stored = backend.get_meta(SCORING_META_KEY)
+    previous = ScoringConfig.from_dict(json.loads(stored), source="the store") if stored else None
+    if previous is not None and previous.version == config.version:
+        return 0, 0
+    change = config.diff(previous) if previous is not None else None
+    candidates = rewritten = 0
+    if change:
+        started = time.monotonic()
+        now = engine.clock()
+        ids = backend.match_ids(
+            keywords=change.keywords, senders=change.senders,
+            reasons=[engine.REASON_PREFIXES[feature] for feature in change.features],
+            score_ranges=change.score_ranges,
+            near=(now, change.recency_hours * HOUR) if change.recency_hours else None)
+        candidates, rewritten = _rescore_ids(repository, engine, ids, batch_size)
+        logging.info(f"🎯 {log_prefix}Scoring config {config.version} ({config.source}): re-scored {candidates:,} "
+                     f"affected notifications of {repository.count():,}, {rewritten:,} changed "
+                     f"in {time.monotonic() - started:.2f}s")
+    backend.set_meta(SCORING_META_KEY, json.dumps(config.to_dict()))
+    return candidates, rewritten
+
+
+def refresh_recency(repository, engine, batch_size=1000, log_prefix=""):
+    """
+    Brings the recency bonus of stored notifications up to date with engine's clock. A bonus
+    is only given within the recency window of the time an item was scored, and everything
+    was scored after the previous refresh, so only timestamps within the window of the time
+    since then can have one to fade (or, for upcoming events, to grow). Those are re-scored and
+    the changed ones written back. Returns (candidates looked at, notifications rewritten).
+    """
+    backend = repository.backend
+    started = time.monotonic()
+    now = engine.clock()
+    window = engine.scoring_config.recency_window_hours * HOUR
+    last = backend.get_meta(RECENCY_META_KEY)
+    if last is None:
+        # No refresh yet: items carrying a bonus may have been scored at any time
+        ids = backend.match_ids(reasons=[engine.RECENCY_REASON], near=(now, window))
+    else:
+        # An hour of margin for a pass that read the clock just before the previous refresh but stored after it
+        since = min(float(last), now) - HOUR
+        ids = backend.match_ids(near=((since + now) / 2, (now - since) / 2 + window))
+    candidates, rewritten = _rescore_ids(repository, engine, ids, batch_size)
+    backend.set_meta(RECENCY_META_KEY, repr(now))
+    if rewritten:
+        logging.info(f"🕰️  {log_prefix}Recency bonus refreshed: re-scored {candidates:,} recent notifications, "
+                     f"{rewritten:,} changed in {time.monotonic() - started:.2f}s")
+    return candidates, rewritten
+
+
+def _rescore_ids(repository, engine, ids, batch_size):
+    """Re-scores the stored notifications with these IDs (None: all of them) and writes back those that changed."""
+    backend = repository.backend
+    candidates = rewritten = 0
+    notes = backend.iter_all(batch_size=batch_size) if ids is None else backend.get_many(sorted(ids))
+    for batch in chunked(notes, batch_size):
+        before = [(n["priority"], n["priority_score"], list(n["priority_reasons"] or ())) for n in batch]
+        changed = [note for note, old in zip(engine.iter_process(batch), before)
+                   if (note["priority"], note["priority_score"], note["priority_reasons"]) != old]
+        candidates += len(batch)
+        if changed:
+            repository.upsert_all(changed, snapshot=False)
+            rewritten += len(changed)
+    if rewritten:
+        repository.export_snapshot()
+    return candidates, rewritten
+
+
+if __name__ == "__main__":
+    from backend.config import load_env, DATA_DIR, DB_PATH, STORAGE_BACKEND
+    from backend.storage.repository import NotificationRepository
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - [%(levelname)s] - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Re-score stored notifications with the current scoring config.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Notifications per work unit")
+    parser.add_argument("--changed", action="store_true",
+                        help="Only re-score what changed since the config the store was last scored with")
+    args = parser.parse_args()
+    load_env()  # SCORING_CONFIG
+
+    repo = NotificationRepository.from_config(DATA_DIR, STORAGE_BACKEND, DB_PATH)
+    if args.changed:
+        candidates, rewritten = rescore_changed(repo, PriorityEngine())
+        logging.info(f"✅ Backfill complete. Re-scored {candidates:,} notifications, {rewritten:,} changed.")
+    else:
+        count = rescore_history(repo, workers=args.workers, chunk_size=args.chunk_size)
+        logging.info(f"✅ Backfill complete. Re-scored {count:,} notifications.")
@@ -0,0 +1,500 @@
+"""
+Cross-source deduplication stage: normalize -> dedup -> score -> store.
+
+The same incident tends to arrive several times: a Slack alert, a Jira ticket and a GitHub
+issue, or one alert repeated every few minutes. Notifications are grouped into clusters;
+the first one seen is the cluster's canonical copy. It keeps its id and carries 'count'
+(how many notifications it stands for) and 'sources', and every later duplicate is folded
+into it instead of being scored, stored and rendered on its own.
+
+Two notifications are duplicates when their normalized title+content is identical and they
+come from the same sender and channel (exact fingerprint), or when their word and word-pair
+sets are at least DEDUP_MIN_SIMILARITY alike (Jaccard, estimated with MinHash and found through
+LSH bands). Items of a DEDUP_DISTINCT_ID_SOURCES source with different IDs are never merged.
+The canonical copy takes the strongest priority features of what is folded into it: DM and
+mention flags, and a VIP sender.
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from backend.config import (
+    DEDUP_DISTINCT_ID_SOURCES,
+    DEDUP_INDEX_PATH,
+    DEDUP_MAX_ENTRIES,
+    DEDUP_MIN_FEATURES,
+    DEDUP_MIN_SIMILARITY,
+    DEDUP_SKIP_SOURCES,
+    DEDUP_TTL,
+    DEDUP_WINDOW,
+)
+from backend.models import Notification
+from backend.processing.pipeline import chunked
+from backend.processing.timestamps import epoch_of
+
+WORD = re.compile(r"\w+")
+
+# MinHash signature of 64 values, split into 16 LSH bands of 4. Two texts become candidates
+# when any band matches: ~99% likely at 0.7 similarity, ~12% at 0.3 (then rejected on the
+# full signature), practically never for unrelated texts.
+PERMUTATIONS = 64
+BANDS = 16
+ROWS = PERMUTATIONS // BANDS
+_seeds = np.random.default_rng(0x5EED)
+_MULTIPLIERS = _seeds.integers(1, 2**63, PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _seeds.integers(0, 2**63, PERMUTATIONS, dtype=np.uint64)
+_BAND_MIX = _seeds.integers(1, 2**63, ROWS, dtype=np.uint64)
+_PAIR_MIX = np.uint64(0x9E3779B1)
+
+WORD_CACHE_SIZE = 100_000
+_word_hashes = {}
+
+# Member ids remembered per cluster (re-polls of remembered members are not counted twice)
+MAX_MEMBERS = 200
+
+
+def words_of(notification):
+    return WORD.findall(f"{notification.get('title', '')} {notification.get('content', '')}".lower())
+
+
+def origin_of(notification):
+    """Who said it and where: the sender's address (or name) and the channel."""
+    sender = notification.get("sender") or {}
+    return f"{(sender.get('email') or sender.get('name') or '').lower()}|{notification.get('channel') or ''}"
+
+
+def fingerprint(words, origin=""):
+    return hashlib.blake2b(f"{origin}\n{' '.join(words)}".encode(), digest_size=12).hexdigest()
+
+
+def word_hashes(words):
+    """crc32 per word, cached: notification wording repeats a lot."""
+    if len(_word_hashes) > WORD_CACHE_SIZE:
+        _word_hashes.clear()
+    hashes = []
+    for word in words:
+        value = _word_hashes.get(word)
+        if value is None:
+            value = _word_hashes[word] = zlib.crc32(word.encode())
+        hashes.append(value)
+    return hashes
+
+
+def minhash_batch(hash_lists):
+    """
+    MinHash signatures (uint32, one row per list) over the words and word pairs of each list
+    of word hashes (at least two words each), all hashed in one vectorized pass: 64
+    multiply-shift permutations over every word and pair hash, then a min per list.
+    """
+    lengths = np.fromiter(map(len, hash_lists), dtype=np.int64, count=len(hash_lists))
+    words = np.fromiter((h for hashes in hash_lists for h in hashes), dtype=np.uint64, count=int(lengths.sum()))
+    ends = np.cumsum(lengths)
+    # Pair hashes from neighbouring words, minus the pairs straddling two lists
+    pairs = np.delete((words[:-1] * _PAIR_MIX + words[1:]) & np.uint64(0xFFFFFFFF), ends[:-1] - 1)
+
+    def permuted_min(hashes, starts):
+        permuted = (np.multiply.outer(_MULTIPLIERS, hashes) + _OFFSETS[:, None]) >> np.uint64(32)
+        return np.minimum.reduceat(permuted, starts, axis=1)
+
+    word_starts = ends - lengths
+    pair_starts = word_starts - np.arange(len(hash_lists))
+    return np.minimum(permuted_min(words, word_starts), permuted_min(pairs, pair_starts)).T.astype(np.uint32)
+
+
+def band_keys(signatures):
+    """One 63-bit key (SQLite-safe) per LSH band, for each row of 'signatures'."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    return ((bands * _BAND_MIX).sum(axis=2) >> np.uint64(1)).tolist()
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return np.count_nonzero(a == b) / PERMUTATIONS
+
+
+class Cluster:
+    """A canonical notification id plus what is known about its duplicates."""
+
+    def __init__(self, id, fingerprint, signature, keys=None, count=1, sources=None, members=None, last_seen=0.0):
+        self.id = id
+        self.fingerprint = fingerprint
+        self.signature = signature
+        self.band_keys = keys or []
+        self.count = count
+        self.sources = sources or []
+        self.members = members or [id]
+        self.last_seen = last_seen
+        # Latest canonical notification, so a later duplicate can be folded in without a store read
+        self.item = None
+
+
+class DedupIndex:
+    """
+    Clusters findable by member id, exact fingerprint and MinHash band.
+
+    At most 'max_entries' clusters stay in memory, least recently seen first out. With a
+    'spill_path' evicted clusters go to a small SQLite file and are pulled back on a hit,
+    and close() saves the in-memory ones there too, so the next run still recognises them.
+    Clusters not seen for 'ttl' seconds no longer absorb duplicates, and a cluster never
+    absorbs a second item of a 'distinct_id_sources' source.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS clusters (
+            id TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            signature BLOB,
+            count INTEGER NOT NULL,
+            sources TEXT NOT NULL,
+            last_seen REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS members (
+            id TEXT PRIMARY KEY,
+            cluster_id TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS bands (
+            band INTEGER NOT NULL,
+            key INTEGER NOT NULL,
+            cluster_id TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_clusters_fingerprint ON clusters(fingerprint);
+        CREATE INDEX IF NOT EXISTS idx_members_cluster ON members(cluster_id);
+        CREATE INDEX IF NOT EXISTS idx_bands_key ON bands(key);
+        CREATE INDEX IF NOT EXISTS idx_bands_cluster ON bands(cluster_id);
+    """
+
+    def __init__(self, spill_path=None, max_entries=DEDUP_MAX_ENTRIES, min_similarity=DEDUP_MIN_SIMILARITY,
+                 min_features=DEDUP_MIN_FEATURES, ttl=DEDUP_TTL, distinct_id_sources=DEDUP_DISTINCT_ID_SOURCES):
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.min_features = min_features
+        self.ttl = ttl
+        self.distinct_id_sources = distinct_id_sources
+        self.clusters = OrderedDict()
+        self.by_member = {}
+        self.by_fingerprint = {}
+        self.by_band = {}
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._spilled = 0
+
+        if spill_path:
+            self._conn = sqlite3.connect(spill_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+            cutoff = time.time() - ttl
+            with self._conn:
+                expired = [(row[0],) for row in self._conn.execute("SELECT id FROM clusters WHERE last_seen < ?",
+                                                                    (cutoff,))]
+                self._conn.executemany("DELETE FROM members WHERE cluster_id = ?", expired)
+                self._conn.executemany("DELETE FROM bands WHERE cluster_id = ?", expired)
+                self._conn.execute("DELETE FROM clusters WHERE last_seen < ?", (cutoff,))
+            self._spilled = self._conn.execute("SELECT COUNT(*) FROM clusters").fetchone()[0]
+
+    def prepare(self, notifications):
+        """
+        (fingerprint, signature, band keys) per notification, hashed as one batch.
+        Texts with too few features get no signature and only match exactly.
+        """
+        words = [words_of(n) for n in notifications]
+        # Features are words plus word pairs: 2n - 1 for n words
+        wanted = [i for i, w in enumerate(words) if len(w) >= 2 and 2 * len(w) - 1 >= self.min_features]
+        prepared = [(fingerprint(w, origin_of(n)), None, None) for w, n in zip(words, notifications)]
+        if wanted:
+            signatures = minhash_batch([word_hashes(words[i]) for i in wanted])
+            for i, signature, keys in zip(wanted, signatures, band_keys(signatures)):
+                prepared[i] = (prepared[i][0], signature, keys)
+        return prepared
+
+    def add(self, notification, prepared=None, now=None):
+        """
+        Files 'notification' under its cluster (a new one if nothing matches) and returns
+        (cluster, changed). 'changed' is False for a folded duplicate that was polled again.
+        Pass its entry from prepare() when adding in bulk.
+        """
+        exact, signature, keys = prepared or self.prepare([notification])[0]
+        now = now or time.time()
+        notification_id = notification["id"]
+        source = notification.get("source")
+
+        with self._lock:
+            cluster = self._find_member(notification_id, now)
+            if cluster is not None:
+                cluster.last_seen = now
+                # The canonical itself may come back with new content; a folded member adds nothing
+                return cluster, cluster.id == notification_id
+
+            cluster = self._find_exact(exact, source, now)
+            if cluster is None and signature is not None:
+                cluster = self._find_near(signature, keys, source, now)
+            if cluster is None:
+                cluster = Cluster(notification_id, exact, signature, keys, sources=[source], last_seen=now)
+                self._insert(cluster)
+                self.counts["clusters"] += 1
+                return cluster, True
+
+            cluster.count += 1
+            cluster.last_seen = now
+            if source not in cluster.sources:
+                cluster.sources.append(source)
+            if len(cluster.members) < MAX_MEMBERS:
+                cluster.members.append(notification_id)
+                self.by_member[notification_id] = cluster.id
+            self.counts["folded"] += 1
+            return cluster, True
+
+    def close(self):
+        """Saves the in-memory clusters to the spill file (if any) and closes it."""
+        with self._lock:
+            if self._conn is None:
+                return
+            while self.clusters:
+                self._evict()
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+            self._spilled = 0
+
+    # --- Lookups (lock held) ---
+
+    def _accepts(self, sources, source):
+        """Whether a cluster holding items from 'sources' may take one from 'source' with another ID."""
+        return source not in self.distinct_id_sources or source not in sources
+
+    def _live(self, cluster, now):
+        if now - cluster.last_seen <= self.ttl:
+            self.clusters.move_to_end(cluster.id)
+            return cluster
+        self._unindex(cluster)
+        return None
+
+    def _find_member(self, notification_id, now):
+        cluster_id = self.by_member.get(notification_id)
+        if cluster_id is not None:
+            return self._live(self.clusters[cluster_id], now)
+        if self._spilled:
+            row = self._conn.execute("SELECT cluster_id FROM members WHERE id = ?", (notification_id,)).fetchone()
+            if row:
+                return self._promote(row[0], now)
+        return None
+
+    def _find_exact(self, exact, source, now):
+        cluster_id = self.by_fingerprint.get(exact)
+        if cluster_id is not None:
+            cluster = self.clusters[cluster_id]
+            return self._live(cluster, now) if self._accepts(cluster.sources, source) else None
+        if self._spilled:
+            rows = self._conn.execute("SELECT id, sources FROM clusters WHERE fingerprint = ? AND last_seen >= ?",
+                                      (exact, now - self.ttl)).fetchall()
+            for cluster_id, sources in rows:
+                if self._accepts(json.loads(sources), source):
+                    return self._promote(cluster_id, now)
+        return None
+
+    def _find_near(self, signature, keys, source, now):
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self.by_band.get((band, key), ()))
+        best, best_score = None, self.min_similarity
+        for cluster_id in candidates:
+            if not self._accepts(self.clusters[cluster_id].sources, source):
+                continue
+            score = similarity(self.clusters[cluster_id].signature, signature)
+            if score >= best_score:
+                best, best_score = cluster_id, score
+        if best is not None:
+            return self._live(self.clusters[best], now)
+
+        if self._spilled:
+            # Keys are 63-bit hashes, so matching on the key alone is as good as (band, key)
+            placeholders = ", ".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT DISTINCT c.id, c.signature, c.sources FROM bands b JOIN clusters c ON c.id = b.cluster_id "
+                f"WHERE b.key IN ({placeholders}) AND c.last_seen >= ?", (*keys, now - self.ttl)).fetchall()
+            for cluster_id, blob, sources in rows:
+                if not self._accepts(json.loads(sources), source):
+                    continue
+                score = similarity(np.frombuffer(blob, dtype=np.uint32), signature)
+                if score >= best_score:
+                    best, best_score = cluster_id, score
+            if best is not None:
+                return self._promote(best, now)
+        return None
+
+    # --- Memory bookkeeping (lock held) ---
+
+    def _insert(self, cluster):
+        self.clusters[cluster.id] = cluster
+        for member in cluster.members:
+            self.by_member[member] = cluster.id
+        self.by_fingerprint[cluster.fingerprint] = cluster.id
+        for band, key in enumerate(cluster.band_keys):
+            self.by_band.setdefault((band, key), set()).add(cluster.id)
+        if len(self.clusters) > self.max_entries:
+            # Evict a tenth at a time, so spilling costs one commit per batch rather than per cluster
+            while len(self.clusters) > self.max_entries * 0.9:
+                self._evict()
+            if self._conn is not None:
+                self._conn.commit()
+
+    def _unindex(self, cluster):
+        self.clusters.pop(cluster.id, None)
+        for member in cluster.members:
+            if self.by_member.get(member) == cluster.id:
+                del self.by_member[member]
+        if self.by_fingerprint.get(cluster.fingerprint) == cluster.id:
+            del self.by_fingerprint[cluster.fingerprint]
+        for band, key in enumerate(cluster.band_keys):
+            ids = self.by_band.get((band, key))
+            if ids is not None:
+                ids.discard(cluster.id)
+                if not ids:
+                    del self.by_band[(band, key)]
+
+    def _evict(self):
+        """Drops the least recently seen cluster from memory, spilling it when there is a spill file."""
+        _, cluster = next(iter(self.clusters.items()))
+        self._unindex(cluster)
+        if self._conn is None:
+            self.counts["dropped"] += 1
+            return
+        # Committed by the caller, once per batch of evictions
+        signature = cluster.signature.tobytes() if cluster.signature is not None else None
+        self._conn.execute("INSERT OR REPLACE INTO clusters VALUES (?, ?, ?, ?, ?, ?)", (
+            cluster.id, cluster.fingerprint, signature, cluster.count, json.dumps(cluster.sources),
+            cluster.last_seen))
+        self._conn.executemany("INSERT OR REPLACE INTO members (id, cluster_id) VALUES (?, ?)",
+                               ((member, cluster.id) for member in cluster.members))
+        self._conn.executemany("INSERT INTO bands (band, key, cluster_id) VALUES (?, ?, ?)",
+                               ((band, key, cluster.id) for band, key in enumerate(cluster.band_keys)))
+        self._spilled += 1
+        self.counts["spilled"] += 1
+
+    def _promote(self, cluster_id, now):
+        """Moves a spilled cluster back into memory."""
+        row = self._conn.execute(
+            "SELECT fingerprint, signature, count, sources, last_seen FROM clusters WHERE id = ?", (cluster_id,)
+        ).fetchone()
+        if row is None or now - row[4] > self.ttl:
+            return None
+        members = [r[0] for r in self._conn.execute("SELECT id FROM members WHERE cluster_id = ?", (cluster_id,))]
+        with self._conn:
+            self._conn.execute("DELETE FROM clusters WHERE id = ?", (cluster_id,))
+            self._conn.execute("DELETE FROM members WHERE cluster_id = ?", (cluster_id,))
+            self._conn.execute("DELETE FROM bands WHERE cluster_id = ?", (cluster_id,))
+        self._spilled -= 1
+        self.counts["promoted"] += 1
+
+        signature = np.frombuffer(row[1], dtype=np.uint32).copy() if row[1] is not None else None
+        keys = band_keys(signature[None, :])[0] if signature is not None else None
+        cluster = Cluster(cluster_id, row[0], signature, keys, row[2], json.loads(row[3]), members or None, row[4])
+        self._insert(cluster)
+        return cluster
+
+
+class Deduplicator:
+    """
+    The pipeline stage. Items are taken a window at a time; within a window every cluster
+    comes out once, as its canonical notification with the window's duplicates folded in,
+    so duplicates are never scored on their own. A duplicate of a cluster from an earlier
+    window or run re-emits that canonical (same id, higher count), which the store upserts.
+    'lookup' (e.g. repository.get) fetches a canonical the index no longer holds in memory.
+
+    The canonical keeps the strongest priority features of its cluster, so folding never lowers
+    its score: it carries the 'dm' and 'mention' tags of any folded item, and takes a folded
+    item's sender when 'is_vip' (e.g. PriorityEngine.is_vip) says only that one is a VIP.
+    """
+
+    def __init__(self, index=None, lookup=None, window=DEDUP_WINDOW, skip_sources=DEDUP_SKIP_SOURCES, is_vip=None):
+        self.index = index or DedupIndex()
+        self.lookup = lookup
+        self.window = window
+        self.skip_sources = skip_sources
+        self.is_vip = is_vip
+
+    @classmethod
+    def from_config(cls, lookup=None, path=DEDUP_INDEX_PATH, is_vip=None):
+        """A deduplicator whose index spills to DEDUP_INDEX_PATH (or a tenant's 'path') and persists between runs."""
+        return cls(DedupIndex(path), lookup=lookup, is_vip=is_vip)
+
+    def stage(self, notifications):
+        """Normalized notifications -> canonical notifications carrying 'count' and 'sources'."""
+        for window in chunked(notifications, self.window):
+            yield from self._collapse(window)
+
+    def close(self):
+        self.index.close()
+
+    def _collapse(self, window):
+        canonicals = OrderedDict()
+        candidates = [n for n in window if n.get("source") not in self.skip_sources]
+        prepared = iter(self.index.prepare(candidates))
+
+        for notification in window:
+            if notification.get("source") in self.skip_sources:
+                canonicals[notification["id"]] = notification
+                continue
+
+            cluster, changed = self.index.add(notification, next(prepared))
+            if not changed:
+                continue
+            if cluster.id == notification["id"]:
+                canonical = notification
+                if cluster.count > 1:
+                    # The canonical polled again: what it took from its duplicates stays
+                    previous = canonicals.get(cluster.id) or cluster.item or self._stored(cluster.id)
+                    if previous is not None:
+                        canonical = self._strongest(canonical, previous)
+            else:
+                canonical = (canonicals.get(cluster.id) or cluster.item or self._stored(cluster.id)
+                             or Notification.of(notification).replace(id=cluster.id))
+                # Show when the incident was last reported, not when it first was
+                # (by epoch: the sources format their timestamps differently)
+                if (epoch_of(notification) or 0) > (epoch_of(canonical) or 0):
+                    canonical = Notification.of(canonical).replace(
+                        timestamp=notification["timestamp"], timestamp_epoch=epoch_of(notification))
+                canonical = self._strongest(canonical, notification)
+
+            # A copy: an earlier window may already have sent the previous canonical downstream
+            canonical = Notification.of(canonical).replace(count=cluster.count, sources=cluster.sources)
+            cluster.item = canonical
+            canonicals[cluster.id] = canonical
+        return canonicals.values()
+
+    def _strongest(self, canonical, other):
+        """'canonical', with the DM/mention flags and VIP sender of 'other' where it lacks them."""
+        changes = {}
+        missing = _flags(other) - _flags(canonical)
+        if missing:
+            changes["tags"] = list(canonical.get("tags") or []) + sorted(missing)
+        if self.is_vip is not None:
+            sender = other.get("sender") or {}
+            if self.is_vip(sender) and not self.is_vip(canonical.get("sender") or {}):
+                changes["sender"] = sender
+        return Notification.of(canonical).replace(**changes) if changes else canonical
+
+    def _stored(self, notification_id):
+        if self.lookup is None:
+            return None
+        try:
+            return self.lookup(notification_id)
+        except Exception as e:
+            logging.warning(f"Dedup lookup of {notification_id} failed: {e}")
+            return None
+
+
+def _flags(notification):
+    """The DM and mention flags of a notification, from its type or its tags (as the priority engine reads them)."""
+    kind = str(notification.get("type") or "").lower()
+    tags = notification.get("tags") or []
+    return {flag for flag in ("dm", "mention") if kind == flag or flag in tags}
@@ -0,0 +1,105 @@
+import re
+from collections import namedtuple
+
+KeywordMatch = namedtuple("KeywordMatch", ["keyword", "start", "end"])
+
+class KeywordMatcher:
+    """
+    Finds every configured keyword/phrase in a text in a single regex pass.
+    The keywords are compiled into one trie-shaped pattern, so the cost of a scan
+    depends on the text length rather than on how many keywords there are.
+
+    Matches must start at a word boundary: 'error' hits "errors" and "Error:"
+    but not "terror". When keywords overlap ('fail' / 'failure') find_all() keeps the longest;
+    find_every() reports them all.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted({k.lower() for k in keywords if k})
+        self.pattern = None
+        self.every = None
+        # Per keyword, the keywords it starts with (itself included), longest first
+        known = set(self.keywords)
+        self.prefixes = {k: tuple(k[:end] for end in range(len(k), 0, -1) if k[:end] in known) for k in self.keywords}
+        if self.keywords:
+            # Texts are lowercased before matching; that is cheaper than re.IGNORECASE
+            trie = _trie_pattern(self.keywords)
+            self.pattern = re.compile(r"(?<!\w)(?:" + trie + ")")
+            # A lookahead consumes nothing, so a match inside another ('fail' in 'deploy failed') is found too
+            self.every = re.compile(r"(?<!\w)(?=(" + trie + "))")
+
+    def find_all(self, text):
+        """
+        Returns every non-overlapping keyword occurrence as KeywordMatch(keyword, start, end),
+        in the order they appear in the text.
+        """
+        if self.pattern is None or not text:
+            return []
+        lowered = text.lower()
+        matches = [KeywordMatch(m.group(0), m.start(), m.end()) for m in self.pattern.finditer(lowered)]
+        if matches and len(lowered) != len(text):
+            matches = _original_offsets(matches, text)
+        return matches
+
+    def find_every(self, text):
+        """
+        Like find_all(), but overlapping occurrences are kept: wherever a keyword starts, every
+        keyword found there is reported (longest first), e.g. 'failure' and 'fail' for "failure",
+        and 'fail' inside "deploy failed". Each keyword list can then be checked on its own.
+        """
+        if self.every is None or not text:
+            return []
+        lowered = text.lower()
+        matches = [KeywordMatch(keyword, m.start(), m.start() + len(keyword))
+                   for m in self.every.finditer(lowered) for keyword in self.prefixes[m.group(1)]]
+        if matches and len(lowered) != len(text):
+            matches = _original_offsets(matches, text)
+        return matches
+
+    def search(self, text):
+        """Returns the first match, or None."""
+        if self.pattern is None or not text:
+            return None
+        lowered = text.lower()
+        m = self.pattern.search(lowered)
+        if m is None:
+            return None
+        match = KeywordMatch(m.group(0), m.start(), m.end())
+        return _original_offsets([match], text)[0] if len(lowered) != len(text) else match
+
+
+def _original_offsets(matches, text):
+    """
+    Maps match offsets in text.lower() back to 'text'. A few characters change length when
+    lowercased (e.g. 'İ' becomes 'i' plus a combining dot), which shifts everything after them.
+    """
+    origin = [i for i, char in enumerate(text) for _ in char.lower()]
+    origin.append(len(text))
+    return [m._replace(start=origin[m.start], end=origin[m.end]) for m in matches]
+
+
+def _trie_pattern(words):
+    """
+    Turns a list of words into a regex alternation shaped like a prefix trie,
+    e.g. ['fail', 'failure', 'fire'] -> 'f(?:ail(?:ure)?|ire)'.
+    Shared prefixes are only tested once, which keeps large keyword sets fast.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end-of-word marker
+
+    def build(node):
+        optional = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Greedy '?' tries the longer continuation first, so the longest keyword wins
+        return group + "?" if optional else group
+
+    return build(trie)
@@ -0,0 +1,368 @@
+"""
+Pipeline metrics: per-stage timings, item and error counts, exported as Prometheus text or JSON.
+
+Stages are generators pulling from the stage before them, so timing a pull also times
+everything upstream. StageTimer subtracts the time of the stage before it, so each stage is
+charged only for its own work and the stage times of a pass add up to its wall-clock time.
+The first stage ("fetch") is the wait for the fetch workers.
+
+Per pass every stage observes its time into 'stage_seconds' and counts its output into
+'stage_items_total'. ConcurrentIngestion adds per-source page latencies ('fetch_page_seconds'),
+items, errors and missed deadlines. HTTP requests, retries, rate-limit waits and bytes come
+from the rate-limit scheduler and transport (see NotificationAggregator.collect_metrics).
+
+Profiling is opt-in per stage (profile()): the stage's own work runs under cProfile ("cpu",
+a .prof file for pstats/snakeviz) or tracemalloc ("memory", the top allocation sites as text),
+dumped into PROFILE_DIR after each pass.
+"""
+import cProfile
+import itertools
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+
+from backend.config import METRICS_PREFIX, PROFILE_DIR
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Counts of observed values per bucket (each value counted in the first bucket that holds it)."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, Prometheus style, ending with +Inf."""
+        total, pairs = 0, []
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class PipelineMetrics:
+    """
+    Counters and latency histograms keyed by metric name and labels.
+    Thread-safe: fetch workers, the pipeline thread and the API server all use the shared instance.
+    """
+
+    def __init__(self, prefix=METRICS_PREFIX, buckets=LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.profiling = {}
+        self.profile_dir = PROFILE_DIR
+        self._lock = threading.Lock()
+        # Passes finishing together (tenants, daemon sources) share the temp file, so exports take turns
+        self._export_lock = threading.Lock()
+
+    # --- Recording ---
+    def inc(self, name, amount=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Sets a counter kept by another component (e.g. the scheduler's request count) to its current value."""
+        with self._lock:
+            self.counters[(name, _labels(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(self.buckets)
+            self.histograms[key].observe(value)
+
+    def stages(self):
+        """A StageTimer for one pipeline pass."""
+        return StageTimer(self)
+
+    # --- Profiling ---
+    def profile(self, stages, mode="cpu", directory=None):
+        """Turns on profiling of the named stages ("cpu" or "memory") for every later pass."""
+        if mode not in PROFILERS:
+            raise ValueError(f"Unknown profile mode {mode!r} (use {' or '.join(PROFILERS)})")
+        self.profiling = {stage: mode for stage in stages}
+        if directory is not None:
+            self.profile_dir = directory
+
+    def start_profile(self, name):
+        """A running profiler for the stage, if it is being profiled."""
+        mode = self.profiling.get(name)
+        return PROFILERS[mode]() if mode else None
+
+    # --- Export ---
+    def snapshot(self):
+        """Every counter and histogram as JSON-ready dicts."""
+        with self._lock:
+            counters = [{"name": self.prefix + name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{"name": self.prefix + name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                           "buckets": {_bound(bound): total for bound, total in h.cumulative()}}
+                          for (name, labels), h in sorted(self.histograms.items())]
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus(self):
+        """The text exposition format (what GET /metrics returns and Prometheus scrapes)."""
+        lines, typed = [], set()
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                name = self.prefix + name
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_render(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                name = self.prefix + name
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} histogram")
+                for bound, total in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_render(labels + (('le', _bound(bound)),))} {total}")
+                lines.append(f"{name}_sum{_render(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_render(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Writes the metrics to 'path': JSON for a .json file, Prometheus text otherwise (e.g. .prom)."""
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.prometheus()
+        temp_path = f"{path}.tmp"
+        with self._export_lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            # Scrapers (e.g. node_exporter's textfile collector) never see a half-written file
+            os.replace(temp_path, path)
+
+
+class StageTimer:
+    """
+    Instruments the stages of one pipeline pass, created in pipeline order: each stage's input
+    is (possibly through pass-through wrappers like tally) the stage created before it.
+    'seconds' and 'items' hold each stage's share of the pass once it has finished; the totals
+    go into the metrics too.
+
+    A wrapped stage only times its own pulls (inclusive of everything upstream); its share is
+    that minus the inclusive time of the stage before it, worked out when it finishes.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.seconds = {}
+        self.items = {}
+        self._last = None  # Inclusive time of the most recently created stage
+
+    def source(self, name, items):
+        """Instruments the first stage of a pipeline (the time to produce each item is all its own)."""
+        return self._measure(name, iter(items), self._chain(), None, self.metrics.start_profile(name))
+
+    def stage(self, name, run, items, *args, **kwargs):
+        """run(items, *args) as an instrumented stage, charged only for its own work."""
+        profile = self.metrics.start_profile(name)
+        if profile is not None:
+            items = _paused(items, profile)
+        upstream, spent = self._last, self._chain()
+        return self._measure(name, run(items, *args, **kwargs), spent, upstream, profile)
+
+    def sink(self, name, consume, items, *args, **kwargs):
+        """Calls consume(items, *args) (e.g. the store) as the last, instrumented stage, and returns its result."""
+        profile = self.metrics.start_profile(name)
+        counted = _Counted(items if profile is None else _paused(items, profile))
+        upstream = self._last
+        if profile is not None:
+            profile.resume()
+        started = time.perf_counter()
+        try:
+            return consume(counted, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.pause()
+            self._finish(name, elapsed - (upstream.seconds if upstream else 0.0), counted.count, profile)
+
+    def summary(self):
+        """'fetch 0.41s, normalize 0.02s, ...' in pipeline order."""
+        return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.seconds.items())
+
+    def _chain(self):
+        self._last = _Spent()
+        return self._last
+
+    def _measure(self, name, outputs, spent, upstream, profile=None):
+        clock, count, inclusive = time.perf_counter, 0, 0.0
+        try:
+            if profile is not None:
+                profile.resume()
+            resumed = clock()
+            for item in outputs:
+                inclusive += clock() - resumed
+                if profile is not None:
+                    profile.pause()
+                count += 1
+                yield item
+                if profile is not None:
+                    profile.resume()
+                resumed = clock()
+            inclusive += clock() - resumed
+        finally:
+            if profile is not None:
+                profile.pause()
+            spent.seconds = inclusive
+            self._finish(name, inclusive - (upstream.seconds if upstream else 0.0), count, profile)
+
+    def _finish(self, name, seconds, count, profile):
+        seconds = max(seconds, 0.0)
+        self.seconds[name], self.items[name] = seconds, count
+        self.metrics.observe("stage_seconds", seconds, stage=name)
+        self.metrics.inc("stage_items_total", count, stage=name)
+        if profile is not None:
+            base_path = os.path.join(self.metrics.profile_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{next(_dumps)}")
+            path = profile.dump(base_path)
+            logging.info(f"🔬 {name}: {profile.mode} profile of {seconds:.3f}s written to {path}")
+
+
+class _Spent:
+    """Inclusive seconds of a finished stage, read by the stage after it."""
+    seconds = 0.0
+
+
+class _Counted:
+    """A sink's input, counting the items it takes."""
+
+    def __init__(self, items):
+        self.items = iter(items)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self.items)
+        self.count += 1
+        return item
+
+
+def _paused(items, profile):
+    """A profiled stage's input: the profiler is paused while upstream stages run, so it covers one stage."""
+    iterator = iter(items)
+    while True:
+        profile.pause()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            profile.resume()
+        yield item
+
+
+class _CpuProfile:
+    mode = "cpu"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def resume(self):
+        self.profiler.enable()
+
+    def pause(self):
+        self.profiler.disable()
+
+    def dump(self, base_path):
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+        path = base_path + ".prof"
+        self.profiler.dump_stats(path)
+        stats = pstats.Stats(self.profiler).sort_stats("cumulative")
+        top = [f"{func[2]} ({os.path.basename(func[0])}:{func[1]})" for func in stats.fcn_list[:5]]
+        logging.info(f"🔬 Hottest by cumulative time: {', '.join(top)}")
+        return path
+
+
+class _MemoryProfile:
+    """
+    Allocations made while the stage was alive. tracemalloc cannot be paused per stage, so
+    interleaved stages show up too; profile one stage at a time for a clean picture.
+    """
+    mode = "memory"
+
+    def __init__(self):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        self.before = tracemalloc.take_snapshot()
+
+    def resume(self):
+        pass
+
+    def pause(self):
+        pass
+
+    def dump(self, base_path, top=25):
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self.started_tracing:
+            tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        changes = after.filter_traces(ignore).compare_to(self.before.filter_traces(ignore), "lineno")
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+        path = base_path + ".txt"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n")
+            f.write(f"Top {top} allocation sites by growth:\n")
+            for change in changes[:top]:
+                f.write(f"{change}\n")
+        return path
+
+
+PROFILERS = {"cpu": _CpuProfile, "memory": _MemoryProfile}
+_dumps = itertools.count(1)  # Keeps dumps of concurrent passes apart
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _render(labels):
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def _bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+_shared_metrics = None
+_shared_lock = threading.Lock()
+
+def get_shared_metrics():
+    """
+    Returns the process-wide metrics, so the pipeline, its fetch workers and the
+    server's /metrics endpoint all see the same numbers.
+    """
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = PipelineMetrics()
+        return _shared_metrics
@@ -1,57 +1,256 @@
-import uuid
+"""
+Standardizes data from different sources (Slack, Gmail, GitHub, ...) into Notifications.
+
+Each source is described by a field-mapping spec in SOURCE_SPECS. At start-up every spec is
+compiled into its own normalizer function, so per item there is no source dispatch chain,
+no throwaway defaults (UUIDs, clock reads) and no wholesale dict merge: just the getters
+that source needs.
+
+A spec maps notification fields to where they come from in the raw item:
+    "text"                     raw["text"]
+    ("fields", "status", "name")  a nested value
+    "{key}: {fields[summary]}" a template over the raw item
+    callable                   called with the raw item
+A getter that finds nothing (None) leaves the field at its default ("defaults" in the spec,
+then DEFAULTS). 'sender_name'/'sender_email' become the sender.
+
+IDs come from the source's own keys ("id" in the spec), so fetching or pushing the same item
+again upserts it. Items without a native key get an ID hashed from their content instead
+of a random one, for the same reason.
+
+Every notification also gets 'timestamp_epoch' (see timestamps.py); normalize_batch()
+parses a whole page's timestamps in one go.
+"""
+import hashlib
+import operator
 from datetime import datetime
 
+from backend.models import Notification
+from backend.processing.timestamps import to_epoch, to_epochs
+
+# Fields every notification starts with before its source mapping is applied
+DEFAULTS = {
+    "type": "message",
+    "title": "New Notification",
+    "content": "",
+    "sender_name": "Unknown",
+    "sender_email": "",
+    "priority": "normal",  # Will be updated by Engine later
+    "is_read": False,
+    "channel": "General",
+    "url": "#",
+    "tags": [],
+    "priority_score": 0,
+}
+
+# Jira priority names -> ours
+JIRA_PRIORITIES = {"highest": "urgent", "high": "urgent", "critical": "urgent", "medium": "high"}
+
+
+def _slack_time(raw):
+    ts = raw.get("ts")
+    return datetime.fromtimestamp(float(ts)).isoformat() if ts else None
+
+
+def _discord_author(raw):
+    author = raw.get("author")
+    if isinstance(author, dict):
+        return author.get("global_name") or author.get("username")
+    return author
+
+
+def _github_repo(raw):
+    # repository_url is ".../repos/<owner>/<repo>"
+    url = raw.get("repository_url")
+    return "/".join(url.split("/")[-2:]) if url else None
+
+
+def _github_id(raw):
+    # 'owner/repo#number', which the search API and webhooks agree on
+    repo = _github_repo(raw)
+    return f"{repo}#{raw['number']}" if repo and raw.get("number") is not None else None
+
+
+def _github_title(raw):
+    # 'reason' is added by GitHubClient.raw_item(): why the item is in our list
+    title = raw.get("title")
+    return f"{raw['reason']}: {title}" if title and raw.get("reason") else title
+
+
+def _jira_priority(raw):
+    name = ((raw.get("fields") or {}).get("priority") or {}).get("name") or ""
+    return JIRA_PRIORITIES.get(name.lower(), "normal")
+
+
+SOURCE_SPECS = {
+    "slack": {
+        # channel + ts identifies a message, whether it was polled or pushed by the Events API
+        "id": "slack:{channel}:{ts}",
+        "content": "text",
+        "channel": "channel_name",
+        # The user ID; resolving it to a name would take a users.info call per sender
+        "sender_name": "user",
+        "url": "permalink",
+        "timestamp": _slack_time,
+        "defaults": {"channel": "#general", "sender_name": "Slack User"},
+    },
+    "gmail": {
+        "type": "email",
+        "id": "gmail:{id}",
+        "title": "subject",
+        "content": "snippet",
+        "sender_name": "from",
+        "defaults": {"title": "No Subject", "sender_name": "Email Sender"},
+    },
+    "discord": {
+        "id": "discord:{id}",
+        "content": "content",
+        "sender_name": _discord_author,
+        "channel": "channel",
+        "timestamp": "timestamp",
+        "defaults": {"sender_name": "Discord User", "channel": "Discord"},
+    },
+    "calendar": {
+        # CalendarIntegration returns title/start/link/creator per upcoming event
+        "type": "event",
+        "id": "id",
+        "title": "title",
+        "timestamp": "start",
+        "sender_name": "creator",
+        "url": "link",
+        "defaults": {"title": "Busy", "sender_name": "Google Calendar"},
+    },
+    "github": {
+        # Search API issue/PR items and webhook objects, annotated by GitHubClient.raw_item()
+        "type": "pr",
+        "id": _github_id,
+        "title": _github_title,
+        "content": lambda raw: f"Repo: {raw['repository_url'].split('/')[-1]}" if raw.get("repository_url") else None,
+        "sender_name": ("user", "login"),
+        "timestamp": "created_at",
+        "priority": "priority",
+        "url": "html_url",
+    },
+    "jira": {
+        # Search results and webhook issues, annotated with 'site' by JiraClient.raw_item()
+        "type": "ticket",
+        "id": "id",
+        "title": "{key}: {fields[summary]}",
+        "content": "Status: {fields[status][name]}",
+        "timestamp": ("fields", "created"),
+        "priority": _jira_priority,
+        "url": "https://{site}/browse/{key}",
+        "defaults": {"sender_name": "Jira"},
+    },
+}
+
+
+def _getter(rule):
+    """One spec rule -> function(raw) returning the value, or None when the raw item lacks it."""
+    if callable(rule):
+        return rule
+    if isinstance(rule, tuple):
+        def dig(raw):
+            for key in rule:
+                if not isinstance(raw, dict):
+                    return None
+                raw = raw.get(key)
+            return raw
+        return dig
+    if "{" in rule:
+        def fill(raw):
+            try:
+                return rule.format_map(raw)
+            except (KeyError, IndexError, TypeError, AttributeError):
+                return None
+        return fill
+    return operator.methodcaller("get", rule)
+
+
+def content_id(source, fields):
+    """A stable ID for items without a native one: the same content always gets the same ID."""
+    sender = fields.get("sender") or {}
+    key = "\x1f".join(str(part) for part in (
+        fields.get("title", ""), fields.get("content", ""), sender.get("name", ""), fields.get("timestamp") or ""))
+    return f"{source}:{hashlib.blake2b(key.encode(), digest_size=10).hexdigest()}"
+
+
+def compile_spec(source, spec):
+    """
+    Builds the mapping function for one source spec: raw item -> notification fields,
+    with everything but 'timestamp_epoch' filled in.
+    """
+    base = {**DEFAULTS, "source": source, "type": spec.get("type", DEFAULTS["type"]), **spec.get("defaults", {})}
+    getters = [(field, _getter(rule)) for field, rule in spec.items()
+               if field not in ("type", "id", "defaults", "sender_name", "sender_email")]
+    native_id = _getter(spec["id"]) if "id" in spec else None
+    sender_name, sender_email = base.pop("sender_name"), base.pop("sender_email")
+    get_name = _getter(spec["sender_name"]) if "sender_name" in spec else None
+    get_email = _getter(spec["sender_email"]) if "sender_email" in spec else None
+    # Items already in our format (demo data, older callers) only get the gaps filled
+    internal_base = dict(base, sender={"name": sender_name, "email": sender_email})
+
+    def build(raw):
+        if "title" in raw and "content" in raw:
+            fields = {**internal_base, **raw}
+        else:
+            fields = dict(base)
+            for field, get in getters:
+                value = get(raw)
+                if value is not None:
+                    fields[field] = value
+            name = get_name(raw) if get_name else None
+            email = get_email(raw) if get_email else None
+            fields["sender"] = {"name": sender_name if name is None else name,
+                                "email": sender_email if email is None else email}
+
+        if not fields.get("id"):
+            fields["id"] = (native_id(raw) if native_id else None) or content_id(source, fields)
+        if not fields.get("timestamp"):
+            fields["timestamp"] = datetime.now().isoformat()
+        return fields
+
+    return build
+
+
 class NotificationNormalizer:
     """
-    Standardizes data from different sources (Slack, Gmail, etc.) 
+    Standardizes data from different sources (Slack, Gmail, etc.)
     into a unified format for the Dashboard.
     """
 
+    def __init__(self, specs=None):
+        self.normalizers = {}
+        for source, spec in (SOURCE_SPECS if specs is None else specs).items():
+            self.register(source, spec)
+
+    def register(self, source, spec):
+        """Adds (or replaces) the mapping for one source."""
+        self.normalizers[source] = compile_spec(source, spec)
+
     def normalize(self, raw_data, source_type):
         """
         Input: Raw dictionary from API
-        Output: Clean dictionary matching our Data Model
+        Output: Notification (see backend/models.py)
         """
-        # 1. Create a skeleton with defaults
-        norm = {
-            "id": str(uuid.uuid4()),
-            "source": source_type,
-            "type": "message",
-            "title": "New Notification",
-            "content": "",
-            "sender": {"name": "Unknown", "email": ""},
-            "timestamp": datetime.now().isoformat(),
-            "priority": "normal", # Will be updated by Engine later
-            "is_read": False,
-            "channel": "General",
-            "url": "#",
-            "tags": [],
-            "priority_score": 0
-        }
-
-        # 2. Map fields based on source
-        if source_type == "slack":
-            # Real Slack API returns 'text' and 'user' ID
-            norm["content"] = raw_data.get("text", "")
-            norm["channel"] = raw_data.get("channel_name", "#general")
-            # In a real app, we would look up the user ID to get a name
-            norm["sender"]["name"] = raw_data.get("user", "Slack User")
-            norm["url"] = raw_data.get("permalink", "#")
-            
-        elif source_type == "gmail":
-            # Real Gmail API returns headers (Subject, From) and snippet
-            norm["title"] = raw_data.get("subject", "No Subject")
-            norm["content"] = raw_data.get("snippet", "")
-            norm["sender"]["name"] = raw_data.get("from", "Email Sender")
-            norm["type"] = "email"
-            
-        elif source_type == "discord":
-            norm["content"] = raw_data.get("content", "")
-            norm["sender"]["name"] = raw_data.get("author", "Discord User")
-            norm["channel"] = raw_data.get("channel", "Discord")
-
-        # 3. If it's already in our Mock format (internal), just pass it through
-        if "title" in raw_data and "content" in raw_data:
-            norm.update(raw_data)
-
-        return norm
\ No newline at end of file
+        fields = self._normalizer(source_type)(raw_data)
+        if fields.get("timestamp_epoch") is None:
+            fields["timestamp_epoch"] = to_epoch(fields["timestamp"])
+        return Notification(fields)
+
+    def normalize_batch(self, raw_items, source_type):
+        """Normalizes a page of raw items from one source."""
+        build = self._normalizer(source_type)
+        page = [build(raw) for raw in raw_items]
+        epochs = to_epochs([fields["timestamp"] for fields in page]).tolist()
+        for fields, epoch in zip(page, epochs):
+            if fields.get("timestamp_epoch") is None:
+                fields["timestamp_epoch"] = None if epoch != epoch else epoch  # NaN: unparseable
+        return [Notification(fields) for fields in page]
+
+    def _normalizer(self, source_type):
+        normalizer = self.normalizers.get(source_type)
+        if normalizer is None:
+            # Unknown sources keep only what they bring (plus defaults)
+            normalizer = self.normalizers[source_type] = compile_spec(source_type, {})
+        return normalizer
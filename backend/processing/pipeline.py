@@ -0,0 +1,154 @@
+"""
+Generator stages for the ingestion -> normalize -> score -> store pipeline.
+
+Each stage pulls items (or small runs of them) from the stage before it, so only a bounded
+window of notifications (one queue of pages plus one storage chunk) is alive at
+any moment, however large the batch. Ordering is left to the store's score index.
+"""
+import itertools
+import logging
+import operator
+import queue
+import threading
+import time
+from collections import Counter
+
+
+class ConcurrentIngestion:
+    """
+    Runs every source fetcher on the executor and yields (source, raw_item) pairs as pages arrive.
+
+    A fetcher is a generator function that yields pages (lists of raw items) and
+    returns its next sync cursor. Pages travel through a bounded queue, so a fast
+    source cannot run far ahead of the downstream stages.
+
+    Each source has its own deadline, capped by the run deadline. A source that misses it
+    is logged and dropped: pages it already delivered are kept, its cursor is not advanced.
+    After iteration, 'cursors' holds the cursor of every source that finished in time.
+    With 'metrics', page latencies, items, errors and missed deadlines are recorded per source.
+    """
+
+    def __init__(self, executor, fetchers, timeouts, default_timeout, run_deadline, max_pages=32, metrics=None):
+        self.executor = executor
+        self.fetchers = fetchers
+        self.timeouts = timeouts
+        self.default_timeout = default_timeout
+        self.run_deadline = run_deadline
+        self.pages = queue.Queue(maxsize=max_pages)
+        self.cursors = {}
+        self.late = []
+        self.item_counts = Counter()
+        self.metrics = metrics
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        started = time.monotonic()
+        run_deadline = started + self.run_deadline
+        deadlines = {
+            name: min(started + self.timeouts.get(name, self.default_timeout), run_deadline)
+            for name in self.fetchers
+        }
+        pending = set(self.fetchers)
+        for name, fetch in self.fetchers.items():
+            self.executor.submit(self._pump, name, fetch)
+
+        try:
+            while pending:
+                now = time.monotonic()
+                for name in [n for n in pending if deadlines[n] <= now]:
+                    pending.discard(name)
+                    self.late.append(name)
+                    if self.metrics is not None:
+                        self.metrics.inc("deadline_missed_total", source=name)
+                    logging.warning(f"⏱️  {name} missed its deadline after {now - started:.1f}s. "
+                                    f"Keeping {self.item_counts[name]} items it already sent.")
+                if not pending:
+                    break
+
+                try:
+                    kind, name, payload = self.pages.get(timeout=min(deadlines[n] for n in pending) - now)
+                except queue.Empty:
+                    continue
+
+                if name not in pending:
+                    continue  # Late source; drop whatever it still sends
+                if kind == "page":
+                    self.item_counts[name] += len(payload)
+                    for item in payload:
+                        yield name, item
+                else:
+                    pending.discard(name)
+                    self.cursors[name] = payload
+                    logging.info(f"   {name}: {self.item_counts[name]} items ({time.monotonic() - started:.2f}s)")
+        finally:
+            # Unblocks producers that are still waiting to put a page
+            self._closed.set()
+
+    def _pump(self, name, fetch):
+        """Worker-thread side: drains one fetcher into the shared queue."""
+        pages = fetch()
+        while True:
+            started = time.perf_counter()
+            try:
+                page = next(pages)
+            except StopIteration as stop:
+                self._put(("done", name, stop.value))
+                return
+            except Exception as e:
+                logging.error(f"{name} ingestion failed: {e}")
+                if self.metrics is not None:
+                    self.metrics.inc("errors_total", stage="fetch", source=name)
+                self._put(("done", name, None))
+                return
+            if self.metrics is not None:
+                self.metrics.observe("fetch_page_seconds", time.perf_counter() - started, source=name)
+                self.metrics.inc("fetch_items_total", len(page), source=name)
+            if not self._put(("page", name, page)):
+                pages.close()
+                return
+
+    def _put(self, message):
+        while not self._closed.is_set():
+            try:
+                self.pages.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def normalize_stage(tagged_items, normalizer, batch_size=100):
+    """
+    (source, raw_item) pairs -> normalized notifications.
+    Consecutive items of one source are normalized together (one timestamp parse per run).
+    """
+    for chunk in chunked(tagged_items, batch_size):
+        for source, run in itertools.groupby(chunk, key=operator.itemgetter(0)):
+            yield from normalizer.normalize_batch([raw for _, raw in run], source)
+
+
+def score_stage(notifications, engine):
+    """Scores notifications one by one, in arrival order."""
+    return engine.iter_process(notifications)
+
+
+def tally(items, counts, key=None):
+    """
+    Passes items through unchanged while counting them into 'counts'
+    ('total', plus one bucket per key(item) when a key is given).
+    """
+    for item in items:
+        counts["total"] += 1
+        if key is not None:
+            counts[key(item)] += 1
+        yield item
+
+
+def chunked(items, size):
+    """Groups a stream into lists of at most 'size' items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
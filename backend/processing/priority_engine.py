@@ -1,99 +1,299 @@
+import hashlib
+import json
+import time
 from datetime import datetime
-from backend.config import (
-    SCORING_WEIGHTS, 
-    PRIORITY_THRESHOLDS, 
-    URGENT_KEYWORDS, 
-    VIP_SENDERS
-)
+from email.utils import parseaddr
+from functools import lru_cache
+from backend.processing.keyword_matcher import KeywordMatcher
+from backend.processing.score_cache import content_key
+from backend.processing.scoring_config import load_scoring_config
+from backend.processing.timestamps import HOUR
 
 class PriorityEngine:
     """
     Core logic for determining notification importance.
     Uses a weighted scoring system based on keywords, sender reputation, and source metadata.
+
+    The settings come from a ScoringConfig (the config file, by default), compiled into ScoringRules.
+    reload() swaps in new rules with one assignment; each batch reads them once, so a batch
+    being scored finishes with the rules it started on.
     """
 
+    BASE_SCORE = 10
+
+    # Scoring features, in the order their reasons are reported.
+    # Shared with the vectorized batch path so both score identically.
+    FEATURES = ("keyword_match", "critical_term", "vip_sender", "is_direct_message", "is_mention")
+    FEATURE_DEFAULTS = {"keyword_match": 20, "critical_term": 30, "vip_sender": 30, "is_direct_message": 20, "is_mention": 20}
+    FEATURE_REASONS = {
+        "critical_term": "Critical Terminology",
+        "vip_sender": "VIP Sender",
+        "is_direct_message": "Direct Message",
+        "is_mention": "Direct Mention"
+    }
+    RECENCY_REASON = "Recent Activity"
+    # How each feature shows up in a stored notification's reasons
+    REASON_PREFIXES = {"keyword_match": "Keyword Match: ", **FEATURE_REASONS}
+    OVERRIDE_SCORES = {"urgent": 95, "high": 80}
+    OVERRIDE_REASONS = {"urgent": ["Critical Source Alert"], "high": ["High Importance Source"]}
+
+    def __init__(self, cache=None, urgent_keywords=None, critical_terms=None, vip_senders=None, matcher=None, config=None):
+        # The lists default to the config's; a tenant brings its own
+        config = (load_scoring_config() if config is None else config).with_overrides(
+            urgent_keywords=urgent_keywords, critical_terms=critical_terms, vip_senders=vip_senders)
+        self.rules = ScoringRules(config, matcher)
+        # Where "now" comes from for the recency bonus (read once per batch)
+        self.clock = time.time
+        # Optional ScoreCache: unchanged notifications skip _calculate_score.
+        # It holds content scores only; the recency bonus depends on the clock and is added after.
+        self.cache = cache
+
+    def reload(self, config, matcher=None):
+        """
+        Switches to 'config'. Everything is compiled before the swap, so scoring never waits
+        on it; 'matcher' may be a shared one already compiled over these keywords.
+        """
+        self.rules = ScoringRules(config, matcher)
+        return self.rules
+
+    @property
+    def scoring_config(self):
+        return self.rules.config
+
+    @property
+    def config_version(self):
+        return self.rules.config_version
+
     def process(self, notifications):
         """
         Ingests raw notifications and appends 'priority_score' (0-100) and 'priority' labels.
         """
-        processed = []
+        # Sort by Priority Score descending (Urgent first)
+        return sorted(self.iter_process(notifications), key=lambda x: x["priority_score"], reverse=True)
+
+    def iter_process(self, notifications):
+        """
+        Streaming form of process(): scores each notification as it arrives and yields it
+        in input order, without collecting or sorting the batch.
+        """
+        now = self.clock()
+        rules = self.rules
         for note in notifications:
             # 1. Check for pre-assigned priority (e.g. from upstream integrations)
             # If a source explicitly marks an item as urgent, we respect that override.
-            current_priority = note.get("priority", "normal")
+            current_priority = self._upstream_priority(note)
             
-            if current_priority == "urgent":
-                note["priority_score"] = 95
-                note["priority_reasons"] = ["Critical Source Alert"]
-                processed.append(note)
+            if current_priority in self.OVERRIDE_SCORES:
+                note["priority"] = current_priority
+                note["priority_score"] = self.OVERRIDE_SCORES[current_priority]
+                note["priority_reasons"] = list(self.OVERRIDE_REASONS[current_priority])
+                yield note
                 continue
 
-            if current_priority == "high":
-                note["priority_score"] = 80
-                note["priority_reasons"] = ["High Importance Source"]
-                processed.append(note)
-                continue
-
-            # 2. Calculate dynamic score for unlabelled items
-            score, reasons = self._calculate_score(note)
+            # 2. Calculate dynamic score for unlabelled items (or reuse it if the content is unchanged)
+            score, reasons = self._cached_score(note, rules)
             
             # 3. Assign label and finalize
             note["priority_score"] = score
-            note["priority"] = self._assign_label(score)
+            note["priority"] = self._assign_label(score, rules)
             note["priority_reasons"] = reasons
+            self._add_recency(note, now, rules)
             
-            processed.append(note)
-            
-        # Sort by Priority Score descending (Urgent first)
-        return sorted(processed, key=lambda x: x["priority_score"], reverse=True)
+            yield note
+
+    def process_batch(self, notifications):
+        """
+        Columnar variant of process() for large batches (backfills), see batch_scoring.py.
+        Produces the same scores, labels, reasons and ordering.
+        """
+        try:
+            from backend.processing.batch_scoring import score_batch
+        except ImportError:
+            # NumPy is optional; the scalar path gives identical results
+            return self.process(notifications)
+        rules = self.rules
+        if self.cache is None:
+            return score_batch(self, notifications, rules=rules)
+
+        # Cached items are filled in directly; only the misses go through the columnar path
+        now = self.clock()
+        notes = list(notifications)
+        misses, keys = [], []
+        for note in notes:
+            if self._upstream_priority(note) in self.OVERRIDE_SCORES:
+                misses.append(note)
+                keys.append(None)
+                continue
+            key = content_key(note, rules.config_version)
+            cached = self.cache.get(key)
+            if cached is None:
+                misses.append(note)
+                keys.append(key)
+                continue
+            score, reasons = cached
+            note["priority_score"] = score
+            note["priority"] = self._assign_label(score, rules)
+            note["priority_reasons"] = list(reasons)
+        score_batch(self, misses, recency=False, rules=rules)
+        for note, key in zip(misses, keys):
+            if key is not None:
+                self.cache.put(key, note["priority_score"], note["priority_reasons"])
+        for note in notes:
+            if note["source_priority"] not in self.OVERRIDE_SCORES:
+                self._add_recency(note, now, rules)
+        return sorted(notes, key=lambda x: x["priority_score"], reverse=True)
+
+    def _upstream_priority(self, note):
+        """
+        The label an integration assigned before scoring.
+        It is kept as 'source_priority' so that re-scoring a stored item does not
+        mistake the engine's own previous label for an upstream override.
+        """
+        if "source_priority" not in note:
+            # Items scored before 'source_priority' existed: only override reasons mean the label came from upstream
+            reasons = note.get("priority_reasons")
+            from_upstream = reasons is None or reasons in self.OVERRIDE_REASONS.values()
+            note["source_priority"] = note.get("priority", "normal") if from_upstream else "normal"
+        return note["source_priority"]
 
-    def _calculate_score(self, note):
-        score = 10 # Base score
+    def _cached_score(self, note, rules):
+        if self.cache is None:
+            return self._calculate_score(note, rules)
+        key = content_key(note, rules.config_version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            score, reasons = cached
+            return score, list(reasons)
+        score, reasons = self._calculate_score(note, rules)
+        self.cache.put(key, score, reasons)
+        return score, reasons
+
+    def _calculate_score(self, note, rules):
+        score = self.BASE_SCORE # Base score
         reasons = []
 
         # A. Keyword Analysis
-        # Checks against both config-defined keywords and an internal critical set
-        local_urgent_words = ['urgent', 'down', 'crash', 'error', 'fail', 'alert', 'critical', 'sev-1']
-        
-        full_text = (note.get("title", "") + " " + note.get("content", "")).lower()
+        # One pass over the text finds config keywords and critical terminology together. Overlapping
+        # matches are all kept, so each list is checked on its own ('failure' can be a keyword while
+        # 'fail' is a critical term), and keywords a shared matcher finds for other tenants are in neither.
+        full_text = note.get("title", "") + " " + note.get("content", "")
+        matches = rules.matcher.find_every(full_text)
         
-        for word in URGENT_KEYWORDS:
-            if word in full_text:
-                score += SCORING_WEIGHTS.get("keyword_match", 20)
-                reasons.append(f"Keyword Match: '{word}'")
-                break
+        keyword_hit = next((m for m in matches if m.keyword in rules.urgent_keywords), None)
+        if keyword_hit:
+            score += rules.weights["keyword_match"]
+            reasons.append(f"Keyword Match: '{keyword_hit.keyword}' at {keyword_hit.start}")
         
-        if any(w in full_text for w in local_urgent_words):
-             score += 30
-             reasons.append("Critical Terminology")
+        if any(m.keyword in rules.critical_terms for m in matches):
+             score += rules.weights["critical_term"]
+             reasons.append(self.FEATURE_REASONS["critical_term"])
 
         # B. Sender Reputation
-        sender_email = note.get("sender", {}).get("email", "").lower()
-        sender_name = note.get("sender", {}).get("name", "").lower()
-        
-        if any(vip in sender_email or vip in sender_name for vip in VIP_SENDERS):
-            score += SCORING_WEIGHTS.get("vip_sender", 30)
-            reasons.append("VIP Sender")
+        if self.is_vip(note.get("sender", {}), rules):
+            score += rules.weights["vip_sender"]
+            reasons.append(self.FEATURE_REASONS["vip_sender"])
 
         # C. Contextual Metadata (DMs, Mentions)
-        notif_type = note.get("type", "").lower()
-        tags = note.get("tags", [])
+        is_dm, is_mention = self._context_flags(note)
         
-        if notif_type == "dm" or "dm" in tags:
-            score += SCORING_WEIGHTS.get("is_direct_message", 20)
-            reasons.append("Direct Message")
+        if is_dm:
+            score += rules.weights["is_direct_message"]
+            reasons.append(self.FEATURE_REASONS["is_direct_message"])
             
-        if notif_type == "mention" or "mention" in tags:
-            score += SCORING_WEIGHTS.get("is_mention", 20)
-            reasons.append("Direct Mention")
+        if is_mention:
+            score += rules.weights["is_mention"]
+            reasons.append(self.FEATURE_REASONS["is_mention"])
 
         return min(score, 100), reasons
 
-    def _assign_label(self, score):
-        if score >= PRIORITY_THRESHOLDS.get("urgent", 85):
+    def recency_bonus(self, epoch, now, rules=None):
+        """Points for being close to 'now': by whole hours of distance, from bonus_table."""
+        if epoch is None:
+            return 0
+        table = (rules or self.rules).bonus_table
+        hours = int(abs(now - epoch) // HOUR)
+        return table[hours] if hours < len(table) else 0
+
+    def _add_recency(self, note, now, rules):
+        """Adds the recency bonus to a content-scored notification and relabels it."""
+        bonus = self.recency_bonus(note.get("timestamp_epoch"), now, rules)
+        if bonus:
+            note["priority_score"] = min(note["priority_score"] + bonus, 100)
+            note["priority"] = self._assign_label(note["priority_score"], rules)
+            note["priority_reasons"].append(self.RECENCY_REASON)
+
+    def _context_flags(self, note):
+        """(is_direct_message, is_mention) from the notification type or its tags."""
+        notif_type = note.get("type", "").lower()
+        tags = note.get("tags", [])
+        return (notif_type == "dm" or "dm" in tags), (notif_type == "mention" or "mention" in tags)
+
+    def is_vip(self, sender, rules=None):
+        """
+        Exact lookup against the VIP senders by email or name.
+        Display strings like "Sarah Chen <sarah.chen@company.com>" are unpacked first.
+        """
+        vips = (rules or self.rules).vip_senders
+        return not vips.isdisjoint(sender_keys(sender.get("email") or "", sender.get("name") or ""))
+
+    def _assign_label(self, score, rules=None):
+        thresholds = (rules or self.rules).thresholds
+        if score >= thresholds["urgent"]:
             return "urgent"
-        elif score >= PRIORITY_THRESHOLDS.get("high", 50):
+        elif score >= thresholds["high"]:
             return "high"
-        elif score >= PRIORITY_THRESHOLDS.get("normal", 20):
+        elif score >= thresholds["normal"]:
             return "normal"
-        return "low"
\ No newline at end of file
+        return "low"
+
+
+class ScoringRules:
+    """
+    A ScoringConfig compiled for scoring: keyword sets and the matcher, VIPs as a set, weights,
+    thresholds and the recency bonus table. Never changed once built.
+    """
+
+    def __init__(self, config, matcher=None):
+        self.config = config
+        self.urgent_keywords = config.urgent_keywords
+        self.critical_terms = config.critical_terms
+        self.vip_senders = config.vip_senders
+        # One matcher covers both keyword lists (or a shared one covering every tenant's)
+        self.matcher = matcher or KeywordMatcher(self.urgent_keywords | self.critical_terms)
+        # For the batch path, per matcher keyword: the longest urgent keyword it starts with (or None),
+        # and whether it starts with a critical term (what find_every() would report at that spot)
+        self.keyword_roles = {
+            keyword: (next((k for k in prefixes if k in self.urgent_keywords), None),
+                      any(k in self.critical_terms for k in prefixes))
+            for keyword, prefixes in self.matcher.prefixes.items()
+        }
+        self.weights = {f: config.weights.get(f, PriorityEngine.FEATURE_DEFAULTS[f]) for f in PriorityEngine.FEATURES}
+        self.thresholds = {label: config.thresholds[label] for label in ("urgent", "high", "normal")}
+        # Recency bonus by hour bucket of age: bonus_table[hours] for hours < recency_window_hours
+        recency, window = config.weights.get("recency_bonus", 0), config.recency_window_hours
+        self.bonus_table = [round(recency * (1 - hour / window)) for hour in range(window)]
+        self.config_version = self._config_version()
+
+    def _config_version(self):
+        """Hash of the settings content scores depend on; part of every cache key."""
+        config = {
+            "weights": self.weights, "thresholds": self.thresholds, "base": PriorityEngine.BASE_SCORE,
+            "keywords": sorted(self.urgent_keywords), "critical": sorted(self.critical_terms),
+            "vips": sorted(self.vip_senders),
+            # Bumped when the matching itself changes what a text scores (2: overlapping keywords all count)
+            "matching": 2,
+        }
+        return hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=8192)
+def sender_keys(email, name):
+    """
+    The lowercased addresses/names a sender can match a VIP entry by.
+    Senders repeat a lot (and across tenants), so the parsing is shared by every engine.
+    """
+    candidates = {email.lower(), name.lower()}
+    for value in (email, name):
+        if "<" in value:
+            candidates.add(parseaddr(value)[1].lower())
+    return frozenset(candidates)
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Memoized scores for PriorityEngine.
+
+Most notifications come back unchanged from one run to the next (re-polled threads, open
+tickets, upcoming events), so their score and reasons are remembered under a hash of the
+fields scoring reads (title, content, sender, type, tags) plus the engine's config version.
+Changing the weights, thresholds, keywords or VIPs changes the version, so old entries
+simply stop matching and age out of the LRU.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from backend.config import SCORE_CACHE_PATH, SCORE_CACHE_SIZE
+from backend.storage.backends import atomic_write_json
+
+
+def content_key(note, version):
+    """Hash of everything _calculate_score looks at, salted with the config version."""
+    sender = note.get("sender") or {}
+    parts = (version, note.get("title", ""), note.get("content", ""), sender.get("email") or "",
+             sender.get("name") or "", note.get("type", ""), "\x1e".join(note.get("tags") or ()))
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
+class ScoreCache:
+    """
+    LRU of content key -> (score, reasons), with hit/miss counters.
+    With a 'path', load() and save() keep it across runs as a JSON file.
+    """
+
+    def __init__(self, max_entries=SCORE_CACHE_SIZE, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        return cls(SCORE_CACHE_SIZE, SCORE_CACHE_PATH).load()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, score, reasons):
+        with self._lock:
+            self.entries[key] = (score, tuple(reasons))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "entries": len(self.entries), "evictions": self.evictions}
+
+    # --- Persistence ---
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logging.warning(f"⚠️  Score cache unreadable, starting empty: {e}")
+            return self
+        with self._lock:
+            # Saved least recently used first, so the LRU order survives the round trip
+            for key, (score, reasons) in list(data.get("entries", {}).items())[-self.max_entries:]:
+                self.entries[key] = (score, tuple(reasons))
+        return self
+
+    def save(self):
+        """Writes the cache out if anything was added since it was loaded."""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            entries = {key: [score, list(reasons)] for key, (score, reasons) in self.entries.items()}
+            self._dirty = False
+        try:
+            atomic_write_json(self.path, {"entries": entries})
+        except Exception as e:
+            logging.error(f"❌ Error saving score cache: {e}")
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_shared_score_cache():
+    """
+    Returns the process-wide cache (SCORE_CACHE_PATH), loading it on first use.
+    Keys carry the config version, so tenants with different keywords or VIPs never share
+    an entry, while those scoring the same way reuse each other's work.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ScoreCache.from_config()
+        return _shared_cache
@@ -0,0 +1,176 @@
+"""
+Versioned scoring configuration for PriorityEngine.
+
+A ScoringConfig is one immutable set of everything scoring reads: feature weights (and the
+recency bonus), label thresholds, the recency window, the keyword lists and the VIP senders.
+The defaults are the constants in backend/config.py; a JSON file overrides any of them:
+
+    {"weights": {"vip_sender": 35}, "thresholds": {"high": 55}, "urgent_keywords": ["urgent", "outage"]}
+
+The file is SCORING_CONFIG_PATH, or SCORING_CONFIG from the environment (a path, or the JSON
+itself). A resident daemon watches the file (ScoringConfigWatcher) and swaps the new config into
+its engines without a restart; diff() tells which stored scores the change can affect.
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from backend.config import (
+    SCORING_CONFIG_PATH,
+    SCORING_WEIGHTS,
+    PRIORITY_THRESHOLDS,
+    RECENCY_WINDOW_HOURS,
+    URGENT_KEYWORDS,
+    CRITICAL_TERMS,
+    VIP_SENDERS
+)
+
+# Labels the engine falls back to when PRIORITY_THRESHOLDS leaves one out
+THRESHOLD_DEFAULTS = {"urgent": 85, "high": 50, "normal": 20}
+WEIGHT_KEYS = ("keyword_match", "critical_term", "vip_sender", "is_direct_message", "is_mention", "recency_bonus")
+
+
+class ScoringChange(namedtuple("ScoringChange", ["keywords", "senders", "features", "score_ranges", "recency_hours"])):
+    """
+    What differs between two configs, in terms of the stored notifications it can re-score:
+    keywords added to or removed from either list, VIPs added or removed, features whose weight
+    changed, [low, high) score ranges that now get another label, and the recency window
+    (in hours either side of now) whose bonus changed. False when nothing did.
+    """
+
+    def __bool__(self):
+        return any(self)
+
+
+class ScoringConfig:
+    """One version of the scoring settings. Built once and never changed; a new version is a new object."""
+
+    KEYS = ("weights", "thresholds", "recency_window_hours", "urgent_keywords", "critical_terms", "vip_senders")
+
+    def __init__(self, weights=None, thresholds=None, recency_window_hours=None,
+                 urgent_keywords=None, critical_terms=None, vip_senders=None, source="defaults"):
+        self.weights = {**SCORING_WEIGHTS, **(weights or {})}
+        self.thresholds = {**THRESHOLD_DEFAULTS, **PRIORITY_THRESHOLDS, **(thresholds or {})}
+        self.recency_window_hours = RECENCY_WINDOW_HOURS if recency_window_hours is None else recency_window_hours
+        self.urgent_keywords = _lowered(URGENT_KEYWORDS if urgent_keywords is None else urgent_keywords, "urgent_keywords")
+        self.critical_terms = _lowered(CRITICAL_TERMS if critical_terms is None else critical_terms, "critical_terms")
+        self.vip_senders = _lowered(VIP_SENDERS if vip_senders is None else vip_senders, "vip_senders")
+        # Where it was loaded from, for log lines
+        self.source = source
+        self._validate()
+        self.version = hashlib.blake2b(json.dumps(self.to_dict(), sort_keys=True).encode(), digest_size=6).hexdigest()
+
+    @classmethod
+    def from_dict(cls, settings, source="defaults"):
+        if not isinstance(settings, dict):
+            raise ValueError(f"Scoring config from {source} must be a JSON object")
+        unknown = set(settings) - set(cls.KEYS)
+        if unknown:
+            raise ValueError(f"Scoring config from {source}: unknown settings {', '.join(sorted(unknown))}")
+        return cls(**settings, source=source)
+
+    def to_dict(self):
+        return {
+            "weights": dict(self.weights), "thresholds": dict(self.thresholds),
+            "recency_window_hours": self.recency_window_hours,
+            "urgent_keywords": sorted(self.urgent_keywords), "critical_terms": sorted(self.critical_terms),
+            "vip_senders": sorted(self.vip_senders),
+        }
+
+    def with_overrides(self, **settings):
+        """A copy with some settings replaced (those given as None are kept), e.g. a tenant's own lists."""
+        settings = {key: value for key, value in settings.items() if value is not None}
+        if not settings:
+            return self
+        return ScoringConfig.from_dict({**self.to_dict(), **settings}, source=self.source)
+
+    def diff(self, old):
+        """The ScoringChange from 'old' to this config."""
+        thresholds = self.thresholds, old.thresholds
+        window = self.recency_window_hours, old.recency_window_hours
+        recency_changed = window[0] != window[1] or self.weights.get("recency_bonus") != old.weights.get("recency_bonus")
+        return ScoringChange(
+            keywords=(self.urgent_keywords ^ old.urgent_keywords) | (self.critical_terms ^ old.critical_terms),
+            senders=self.vip_senders ^ old.vip_senders,
+            features=tuple(key for key in WEIGHT_KEYS[:-1] if self.weights.get(key) != old.weights.get(key)),
+            score_ranges=tuple((min(new, before), max(new, before)) for label in THRESHOLD_DEFAULTS
+                               for new, before in [(thresholds[0][label], thresholds[1][label])] if new != before),
+            recency_hours=max(window) if recency_changed else 0,
+        )
+
+    def _validate(self):
+        for key, value in self.weights.items():
+            if key not in WEIGHT_KEYS:
+                raise ValueError(f"Scoring config from {self.source}: unknown weight '{key}'")
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f"Scoring config from {self.source}: weight '{key}' must be a whole number of points")
+        for key, value in self.thresholds.items():
+            if key not in THRESHOLD_DEFAULTS:
+                raise ValueError(f"Scoring config from {self.source}: unknown threshold '{key}'")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(f"Scoring config from {self.source}: threshold '{key}' must be a number")
+        if not isinstance(self.recency_window_hours, int) or self.recency_window_hours < 1:
+            raise ValueError(f"Scoring config from {self.source}: recency_window_hours must be a positive whole number")
+
+
+def _lowered(values, name):
+    if isinstance(values, str) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"Scoring config: {name} must be a list of strings")
+    return frozenset(value.lower() for value in values)
+
+
+def scoring_config_path(env=None):
+    """The config file in effect, or None when SCORING_CONFIG holds the JSON itself."""
+    value = (os.environ if env is None else env).get("SCORING_CONFIG", "").strip()
+    if value.startswith("{"):
+        return None
+    return value or SCORING_CONFIG_PATH
+
+
+def load_scoring_config(env=None):
+    """
+    The current ScoringConfig: SCORING_CONFIG (inline JSON or a path), else SCORING_CONFIG_PATH
+    if it exists, else the defaults. Raises ValueError for a config that does not parse or validate.
+    """
+    env = os.environ if env is None else env
+    path = scoring_config_path(env)
+    if path is None:
+        return ScoringConfig.from_dict(json.loads(env["SCORING_CONFIG"]), source="SCORING_CONFIG")
+    if not os.path.exists(path):
+        if env.get("SCORING_CONFIG", "").strip():
+            raise ValueError(f"SCORING_CONFIG: no such file {path}")
+        return ScoringConfig()
+    with open(path, "r", encoding="utf-8") as f:
+        return ScoringConfig.from_dict(json.load(f), source=path)
+
+
+class ScoringConfigWatcher:
+    """
+    Tells when the config file has changed (one stat() per check), for the daemon's loop.
+    An inline SCORING_CONFIG never changes while the process runs.
+    """
+
+    def __init__(self, env=None):
+        self.env = env
+        self.path = scoring_config_path(env)
+        self._stamp = self._stat()
+
+    def _stat(self):
+        if self.path is None:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None  # Removed: back to the defaults
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self):
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+    def load(self):
+        return load_scoring_config(self.env)
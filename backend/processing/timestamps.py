@@ -0,0 +1,109 @@
+"""
+Canonical timestamps: every notification carries 'timestamp_epoch' (UTC seconds since 1970)
+next to the 'timestamp' string its source gave us.
+
+Sources disagree on format: naive local ISO strings (MockGenerator, Calendar all-day dates),
+'Z' (GitHub), '+0000' (Jira), '+00:00' (Discord) and Slack 'ts' epoch strings. Those do not
+sort or compare correctly as text, so ordering, range filters and recency all use the epoch.
+
+to_epochs() parses a whole batch at once: offsets are split off in one pass and the
+wall-clock parts go through NumPy's datetime64 parser together. Naive strings are read
+as local time, like datetime.fromisoformat(...).timestamp() reads them.
+"""
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+
+HOUR = 3600
+DAY = 24 * HOUR
+MIN_BATCH = 16
+_LOCAL_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value):
+    """One timestamp (ISO string, epoch string/number or datetime) -> epoch seconds, or None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, bool) or math.isnan(value) else float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        if value[4:5] != "-":
+            return float(value)  # Slack 'ts' ("1767000000.000100")
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def epoch_of(item):
+    """A notification's epoch: its 'timestamp_epoch', or parsed from 'timestamp' for items stored before it existed."""
+    epoch = item.get("timestamp_epoch")
+    return epoch if epoch is not None else to_epoch(item.get("timestamp"))
+
+
+def to_epochs(values):
+    """
+    Batch form of to_epoch(): a float64 array with NaN where a value could not be parsed.
+    A page from one source shares one format, which is parsed in a single NumPy call;
+    mixed or unusual batches fall back to to_epoch() per value.
+    """
+    values = list(values)
+    epochs = None
+    # For a handful of values the NumPy call costs more than it saves
+    if len(values) >= MIN_BATCH:
+        try:
+            epochs = _parse_uniform(values)
+        except (TypeError, ValueError, IndexError):
+            pass
+    if epochs is None:
+        epochs = np.array([to_epoch(value) for value in values], dtype=np.float64)
+    return epochs
+
+
+def _parse_uniform(values):
+    """Epochs of a batch in one shared format, or None if the formats differ."""
+    if not all(type(value) is str and value[4:5] == "-" for value in values):
+        if all(type(value) is str and value[4:5] != "-" for value in values):
+            return np.array(values, dtype=np.float64)  # Slack 'ts' strings
+        return None
+    if all(value[-1] == "Z" for value in values):
+        return _utc_walls([value[:-1] for value in values])
+    tail = values[0][-6:]
+    if tail[0] in "+-" and tail[3] == ":" and all(value.endswith(tail) for value in values):
+        offset = int(tail[1:3]) * HOUR + int(tail[4:]) * 60
+        return _utc_walls([value[:-6] for value in values]) - (offset if tail[0] == "+" else -offset)
+    tail = tail[1:]
+    if tail[0] in "+-" and tail[1:].isdigit() and all(value.endswith(tail) for value in values):
+        offset = int(tail[1:3]) * HOUR + int(tail[3:]) * 60
+        return _utc_walls([value[:-5] for value in values]) - (offset if tail[0] == "+" else -offset)
+    if any("+" in value or "Z" in value or "-" in value[10:] for value in values):
+        return None  # Mixed offsets
+    # Naive: local wall-clock time
+    walls = _utc_walls(values)
+    return walls - _local_offsets(walls)
+
+
+def _utc_walls(values):
+    return np.array(values, dtype="datetime64[us]").astype(np.int64) / 1e6
+
+
+def _local_offsets(walls):
+    """UTC offsets (seconds) of local wall-clock times, looked up once per distinct hour."""
+    hours = np.floor(walls / HOUR).astype(np.int64)
+    low, high = int(hours.min()), int(hours.max())
+    # Offsets change at most twice a year, so within a month equal ends mean one offset throughout
+    if high - low < 30 * 24 and _local_offset(low) == _local_offset(high):
+        return _local_offset(low)
+    unique, inverse = np.unique(hours, return_inverse=True)
+    return np.array([_local_offset(hour) for hour in unique.tolist()])[inverse]
+
+
+def _local_offset(hour):
+    return hour * HOUR - (_LOCAL_EPOCH + timedelta(hours=hour)).timestamp()
+
+
+def hour_bucket(epoch):
+    """The hour an epoch falls in, as whole hours since 1970 (UTC)."""
+    return int(epoch // HOUR)
@@ -1,16 +1,44 @@
+import argparse
 import logging
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-# Integrations
-from backend.integrations.slack_integration import SlackIntegration
-from backend.integrations.github_client import GitHubClient
-from backend.integrations.jira_client import JiraClient
+# Integrations (client modules are imported on demand, see backend/integrations/__init__.py)
+from backend import integrations
 from backend.integrations.mock_generator import MockGenerator
+from backend.integrations.rate_limiter import ScopedScheduler, get_shared_scheduler
 
 # Core Systems
+from backend.config import (
+    load_env,
+    ENABLED_SOURCES,
+    SOURCE_TIMEOUTS,
+    DEFAULT_SOURCE_TIMEOUT,
+    INGESTION_DEADLINE,
+    INGESTION_QUEUE_PAGES,
+    STORE_CHUNK_SIZE,
+    PAGE_SIZE,
+    MAX_ITEMS_PER_SOURCE,
+    METRICS_PATH,
+    CURSORS_PATH,
+    DATA_DIR,
+    DB_PATH,
+    DEDUP_INDEX_PATH,
+    STORAGE_BACKEND
+)
+from backend.processing.backfill import refresh_recency, rescore_changed
+from backend.processing.dedup import Deduplicator
+from backend.processing.metrics import get_shared_metrics
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.pipeline import ConcurrentIngestion, normalize_stage, score_stage, tally
 from backend.processing.priority_engine import PriorityEngine
+from backend.processing.score_cache import get_shared_score_cache
+from backend.processing.scoring_config import load_scoring_config
 from backend.storage.repository import NotificationRepository
+from backend.storage.cursor_store import SyncCursorStore
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [%(levelname)s] - %(message)s')
@@ -19,61 +47,396 @@ class NotificationAggregator:
     """
     Orchestrator for the Clarity Hub pipeline.
     Fetches data from configured sources, runs priority analysis, and persists to storage.
+
+    With a 'tenant' (backend/tenants.py) it serves that one user: credentials, data files and
+    scoring lists come from the tenant, fetches run on the shared 'executor' and keywords are
+    found by the shared 'matcher'.
+
+    'scoring' is the ScoringConfig to start with (default: the config file's); reload_scoring()
+    switches it while running and rescore_stored() re-scores what the switch affects.
     """
     
-    def __init__(self):
-        load_dotenv()
+    def __init__(self, sources=None, workload=None, tenant=None, executor=None, matcher=None, scoring=None):
+        load_env()
+        self.tenant = tenant
+        self.env = os.environ if tenant is None else tenant.env
+        self.log_prefix = f"[{tenant.id}] " if tenant else ""
+        # Tenant runs label their metrics with the tenant
+        self.labels = {"tenant": tenant.id} if tenant else {}
         self.demo_mode = os.getenv("DEMO_MODE", "True").lower() == "true"
-        self.repository = NotificationRepository()
-        self.priority_engine = PriorityEngine()
+        # Demo runs: 'workload' returns the raw items to ingest (e.g. MockGenerator.stream for a
+        # load test); by default it is the dashboard demo set, reproducible with DEMO_SEED
+        self.workload = workload or (lambda: MockGenerator(seed=os.getenv("DEMO_SEED")).generate(count=60))
+        self.repository = NotificationRepository.from_config(self._path(DATA_DIR), STORAGE_BACKEND, self._path(DB_PATH))
+        self.cursors = SyncCursorStore(self._path(CURSORS_PATH))
+        self.normalizer = NotificationNormalizer()
+        # Live runs re-poll mostly unchanged items, so their scores are remembered across runs
+        # (in one cache for the whole process; its keys tell tenants' configs apart)
+        cache = None if self.demo_mode else get_shared_score_cache()
+        scoring = load_scoring_config(self.env) if scoring is None else scoring
+        if tenant is None:
+            self.priority_engine = PriorityEngine(cache=cache, config=scoring)
+        else:
+            self.priority_engine = tenant.priority_engine(cache=cache, matcher=matcher, config=scoring)
+        # Live runs share one duplicate index (spilling to disk), so repeats are caught across runs too
+        self.deduplicator = None if self.demo_mode else Deduplicator.from_config(
+            lookup=lambda notification_id: self.repository.get(notification_id), path=self._path(DEDUP_INDEX_PATH),
+            is_vip=self.priority_engine.is_vip)
+        # Per-stage timings and counters, exported to METRICS_PATH after every pass.
+        # PROFILE_STAGES=score,... (PROFILE_MODE=cpu|memory) profiles those stages too.
+        self.metrics = get_shared_metrics()
+        if os.getenv("PROFILE_STAGES"):
+            self.metrics.profile([name.strip() for name in os.getenv("PROFILE_STAGES").split(",")],
+                                 os.getenv("PROFILE_MODE", "cpu"))
+        # Shared keep-alive pools, opened by the first REST client; reused across runs when resident
+        self.transport = None
 
-    def run(self):
-        logging.info("🚀 Pipeline Started")
-        raw_data = []
+        # Live sources, fetched concurrently on a small thread pool (one worker per source).
+        # Only enabled sources with credentials in place get a fetcher (and have their client imported).
+        fetchers = {
+            "slack": self._fetch_slack,
+            "github": self._fetch_github,
+            "jira": self._fetch_jira,
+            "gmail": self._fetch_gmail,
+            "discord": self._fetch_discord,
+            "calendar": self._fetch_calendar,
+        }
+        self.fetchers = {}
+        for name in self._enabled_sources(sources):
+            needs = integrations.missing(name, self.env, self._path(""))
+            if not needs:
+                self.fetchers[name] = fetchers[name]
+            elif not self.demo_mode:
+                logging.info(f"⏭️  {self.log_prefix}{name}: not configured ({', '.join(needs)} missing), skipping")
+        if not self.demo_mode and not self.fetchers:
+            logging.warning(f"⚠️  {self.log_prefix}No live source is configured; set credentials in .env or use DEMO_MODE=true")
+        self.executor = executor or ThreadPoolExecutor(max_workers=max(len(self.fetchers), 1), thread_name_prefix="ingest")
+
+        # API clients are built (and authenticated) on first use, then kept for every later run
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def run(self, sources=None):
+        """
+        One pipeline pass. 'sources' limits a live run to some of the fetchers
+        (the daemon polls each source on its own interval); by default all of them run.
+        """
+        logging.info(f"🚀 {self.log_prefix}Pipeline Started ({', '.join(sources)})" if sources
+                     else f"🚀 {self.log_prefix}Pipeline Started")
+        started = time.perf_counter()
+        stages = self.metrics.stages()
+        counts = Counter()
+        received = Counter()
+        cache = self.priority_engine.cache
+        lookups_before = (cache.hits, cache.misses) if cache else None
 
         # --- Ingestion Phase ---
         if self.demo_mode:
             logging.info("⚠️  Demo Mode: Generating synthetic data stream")
-            generator = MockGenerator()
-            raw_data = generator.generate(count=60)
+            ingestion = self._ingest_demo()
         else:
             logging.info("🔌 Live Mode: Connecting to external APIs")
-            raw_data.extend(self._fetch_slack())
-            raw_data.extend(self._fetch_github())
-            raw_data.extend(self._fetch_jira())
-
-        logging.info(f"📥 Ingested {len(raw_data)} items")
+            ingestion = self._ingest_live(sources)
 
         # --- Processing Phase ---
-        prioritized_data = self.priority_engine.process(raw_data)
+        # Lazy stages: items flow through one at a time and are stored in bounded chunks,
+        # so memory stays flat however many items a run carries
+        fetched = stages.source("fetch", ingestion)
+        notifications = tally(stages.stage("normalize", normalize_stage, fetched, self.normalizer), received)
+        # Demo runs replace the whole dataset, so they only fold duplicates within the run
+        deduplicator = Deduplicator(is_vip=self.priority_engine.is_vip) if self.demo_mode else self.deduplicator
+        unique = stages.stage("dedup", deduplicator.stage, notifications)
+        prioritized = tally(stages.stage("score", score_stage, unique, self.priority_engine),
+                            counts, key=lambda n: n["priority"])
         
         # --- Storage Phase ---
-        self.repository.save_all(prioritized_data)
+        if self.demo_mode:
+            stored = stages.sink("store", self.repository.save_all, prioritized)
+        else:
+            # Live runs only carry what changed since the last sync, so upsert instead of overwrite
+            stored = stages.sink("store", self.repository.upsert_stream, prioritized, chunk_size=STORE_CHUNK_SIZE)
+
+        self.metrics.inc("runs_total", mode="demo" if self.demo_mode else "live", **self.labels)
+        self.metrics.observe("run_seconds", time.perf_counter() - started)
+        if not stored:
+            logging.error(f"{self.log_prefix}Storage failed. Sync cursors not advanced.")
+            self.metrics.inc("errors_total", stage="store", **self.labels)
+            self.export_metrics()
+            return
+        if not self.demo_mode:
+            # Only move the cursors once the items they cover are safely stored
+            self.cursors.update(ingestion.cursors)
         
-        urgent_count = sum(1 for n in prioritized_data if n['priority'] == 'urgent')
-        logging.info(f"✅ Pipeline Complete. Persisted {len(prioritized_data)} items ({urgent_count} Urgent).")
+        logging.info(f"✅ {self.log_prefix}Pipeline Complete. Persisted {counts['total']} new/updated items "
+                     f"({counts['urgent']} Urgent), {self.repository.count()} total.")
+        if received["total"] > counts["total"]:
+            logging.info(f"🧬 {self.log_prefix}Dedup: {received['total']} received, {received['total'] - counts['total']} "
+                         f"folded into existing notifications")
+
+        if cache is not None:
+            hits, misses = cache.hits - lookups_before[0], cache.misses - lookups_before[1]
+            if hits + misses:
+                logging.info(f"🧠 Score cache: {hits}/{hits + misses} reused ({hits / (hits + misses):.0%}), "
+                             f"{len(cache.entries)} entries")
+
+        if self.transport is not None:
+            http = self.transport.stats()
+            reused = http['requests'] - http['connections_opened']
+            logging.info(f"🔁 HTTP: {http['requests']} requests over {http['connections_opened']} connections ({reused} reused)")
+        if not self.demo_mode:
+            for source, limits in get_shared_scheduler().stats().items():
+                logging.info(f"⏳ {source}: {limits['wait_seconds']:.2f}s waiting on rate limits vs "
+                             f"{limits['fetch_seconds']:.2f}s fetching ({limits['throttled']} throttled)")
+
+        logging.info(f"⏱️  {self.log_prefix}Stages: {stages.summary()}")
+        self.export_metrics()
+
+    def collect_metrics(self):
+        """Copies the HTTP counters kept by the rate-limit scheduler and the transport into the metrics."""
+        for source, limits in get_shared_scheduler().stats().items():
+            self.metrics.set("http_requests_total", limits["requests"], source=source)
+            self.metrics.set("http_retries_total", limits["retries"], source=source)
+            self.metrics.set("http_throttled_total", limits["throttled"], source=source)
+            self.metrics.set("rate_limit_wait_seconds_total", limits["wait_seconds"], source=source)
+            self.metrics.set("http_seconds_total", limits["fetch_seconds"], source=source)
+        if self.transport is not None:
+            for source, received in self.transport.stats()["bytes_by_source"].items():
+                self.metrics.set("http_bytes_total", received, source=source)
+
+    def export_metrics(self):
+        self.collect_metrics()
+        try:
+            self.metrics.export(METRICS_PATH)
+        except OSError as e:
+            logging.warning(f"Could not write metrics to {METRICS_PATH}: {e}")
+
+    def _ingest_demo(self):
+        for item in self.workload():
+            yield item["source"], item
+
+    def _ingest_live(self, sources=None):
+        """
+        Fetches the live sources concurrently and streams (source, item) pairs as pages arrive.
+        Each source is awaited until its own timeout or the run deadline, whichever comes first.
+        Sources that miss it are logged and dropped; everything that did arrive is kept.
+        """
+        fetchers = {name: fetch for name, fetch in self.fetchers.items() if sources is None or name in sources}
+        return ConcurrentIngestion(
+            self.executor,
+            fetchers,
+            SOURCE_TIMEOUTS,
+            DEFAULT_SOURCE_TIMEOUT,
+            INGESTION_DEADLINE,
+            max_pages=INGESTION_QUEUE_PAGES,
+            metrics=self.metrics
+        )
+
+    def _enabled_sources(self, sources=None):
+        """Sources this aggregator may poll: 'sources', else the ENABLED_SOURCES env var, else the config."""
+        if sources is None:
+            sources = self.env.get("ENABLED_SOURCES")
+        if isinstance(sources, str):
+            sources = [name.strip() for name in sources.split(",") if name.strip()]
+        if sources is None:
+            return list(ENABLED_SOURCES)
+        unknown = [name for name in sources if name not in integrations.INTEGRATIONS]
+        if unknown:
+            raise ValueError(f"Unknown sources: {', '.join(unknown)} (known: {', '.join(integrations.INTEGRATIONS)})")
+        return sources
+
+    def _path(self, path):
+        """Where a data or credential file lives: in the tenant's directory, else where the config puts it."""
+        return path if self.tenant is None else self.tenant.path(os.path.basename(path))
+
+    def _page_budget(self):
+        return {"page_size": PAGE_SIZE, "max_items": MAX_ITEMS_PER_SOURCE}
+
+    def _source_timeout(self, name):
+        return SOURCE_TIMEOUTS.get(name, DEFAULT_SOURCE_TIMEOUT)
+
+    def _client(self, name):
+        with self._clients_lock:
+            if name not in self._clients:
+                self._clients[name] = self._build_client(name)
+            return self._clients[name]
+
+    def _build_client(self, name):
+        factories = {
+            "slack": lambda client: client(timeout=self._source_timeout("slack"), scheduler=self._scheduler(), env=self.env),
+            "github": lambda client: client(timeout=self._source_timeout("github"), transport=self._http(), env=self.env),
+            "jira": lambda client: client(timeout=self._source_timeout("jira"), transport=self._http(), env=self.env),
+            "discord": lambda client: client(timeout=self._source_timeout("discord"), transport=self._http(), env=self.env),
+            # Google clients run their OAuth flow here, once per process (per tenant)
+            "gmail": lambda client: client(scheduler=self._scheduler(), credentials_dir=self._path("")),
+            "calendar": lambda client: client(credentials_dir=self._path("")),
+        }
+        return factories[name](integrations.load(name))
+
+    def _http(self):
+        # Called under _clients_lock; requests is only imported once a REST source is used
+        if self.transport is None:
+            from backend.integrations.http_transport import get_shared_transport
+            self.transport = get_shared_transport()
+            if self.tenant is not None:
+                self.transport = self.transport.scoped(self._rate_scopes())
+        return self.transport
+
+    def _scheduler(self):
+        scheduler = get_shared_scheduler()
+        return scheduler if self.tenant is None else ScopedScheduler(scheduler, self._rate_scopes())
+
+    def _rate_scopes(self):
+        """Per source, the account this tenant calls it as; rate-limit buckets are kept per account."""
+        return {name: integrations.credential_scope(name, self.env, self._path("")) for name in integrations.INTEGRATIONS}
+
+    def reload_scoring(self, config, matcher=None):
+        """
+        Switches the engine to 'config' (with the tenant's own lists). Passes already scoring
+        finish with the old one; the caller re-scores the store once they are done.
+        """
+        if self.tenant is not None:
+            config = self.tenant.scoring_config(config)
+        self.priority_engine.reload(config, matcher)
+        logging.info(f"🎛️  {self.log_prefix}Scoring config {config.version} loaded from {config.source}")
+
+    def rescore_stored(self):
+        """Re-scores the stored notifications whose scores the current config changes (see backfill.rescore_changed)."""
+        return rescore_changed(self.repository, self.priority_engine, log_prefix=self.log_prefix)
+
+    def refresh_recency(self):
+        """Re-scores the stored notifications whose recency bonus has moved on (see backfill.refresh_recency)."""
+        return refresh_recency(self.repository, self.priority_engine, log_prefix=self.log_prefix)
+
+    def close(self):
+        """Releases the worker threads, HTTP pools and the database connection, and saves the duplicate index and score cache."""
+        self.executor.shutdown(wait=True)
+        if self.transport is not None:
+            self.transport.close()
+        if self.deduplicator is not None:
+            self.deduplicator.close()
+        if self.priority_engine.cache is not None:
+            self.priority_engine.cache.save()
+        self.repository.backend.close()
 
     # --- Helper Methods for Error Isolation ---
+    # Each is a generator: it yields pages of raw items and returns the next sync cursor.
+    # On failure the cursor is None, so it is not advanced. Items a fetch found closed are removed as it ends.
     def _fetch_slack(self):
         try:
-            return SlackIntegration().fetch_messages(limit=10)
+            client = self._client("slack")
+            yield from client.iter_pages(oldest=self.cursors.get("slack"), **self._page_budget())
+            return client.sync_cursor
         except Exception as e:
-            logging.error(f"Slack Integration Failed: {e}")
-            return []
+            logging.error(f"{self.log_prefix}Slack Integration Failed: {e}")
+            self.metrics.inc("errors_total", stage="fetch", source="slack", **self.labels)
+            return None
 
     def _fetch_github(self):
         try:
-            return GitHubClient().fetch_data()
+            client = self._client("github")
+            yield from client.iter_pages(since=self.cursors.get("github"), **self._page_budget())
+            self._remove_resolved("github", client.resolved)
+            return client.sync_cursor
         except Exception as e:
-            logging.error(f"GitHub Integration Failed: {e}")
-            return []
+            logging.error(f"{self.log_prefix}GitHub Integration Failed: {e}")
+            self.metrics.inc("errors_total", stage="fetch", source="github", **self.labels)
+            return None
 
     def _fetch_jira(self):
         try:
-            return JiraClient().fetch_data()
+            client = self._client("jira")
+            yield from client.iter_pages(since=self.cursors.get("jira"), **self._page_budget())
+            self._remove_resolved("jira", client.resolved)
+            return client.sync_cursor
+        except Exception as e:
+            logging.error(f"{self.log_prefix}Jira Integration Failed: {e}")
+            self.metrics.inc("errors_total", stage="fetch", source="jira", **self.labels)
+            return None
+
+    def _fetch_gmail(self):
+        try:
+            client = self._client("gmail")
+            yield from client.iter_pages(history_id=self.cursors.get("gmail"), **self._page_budget())
+            self._remove_resolved("gmail", client.resolved)
+            return client.sync_cursor
         except Exception as e:
-            logging.error(f"Jira Integration Failed: {e}")
-            return []
+            logging.error(f"{self.log_prefix}Gmail Integration Failed: {e}")
+            self.metrics.inc("errors_total", stage="fetch", source="gmail", **self.labels)
+            return None
+
+    def _fetch_discord(self):
+        try:
+            client = self._client("discord")
+            yield from client.iter_pages(after=self.cursors.get("discord"), **self._page_budget())
+            return client.sync_cursor
+        except Exception as e:
+            logging.error(f"{self.log_prefix}Discord Integration Failed: {e}")
+            self.metrics.inc("errors_total", stage="fetch", source="discord", **self.labels)
+            return None
+
+    def _remove_resolved(self, source, resolved):
+        """
+        Deletes the stored notifications of items a fetch found closed, resolved or read.
+        Their IDs come from the same normalizer spec that stored them.
+        """
+        if not resolved:
+            return
+        # The run's store stage exports the snapshot once it is done
+        removed = self.repository.remove([self.normalizer.normalize(raw, source)["id"] for raw in resolved],
+                                         snapshot=False)
+        if removed:
+            logging.info(f"🧹 {self.log_prefix}{source}: removed {removed} closed/resolved items")
+
+    def _fetch_calendar(self):
+        # Upcoming events are re-read every time (no cursor); stable event IDs make that an update
+        try:
+            yield self._client("calendar").fetch_events(max_results=PAGE_SIZE)
+            return None
+        except Exception as e:
+            logging.error(f"{self.log_prefix}Calendar Integration Failed: {e}")
+            self.metrics.inc("errors_total", stage="fetch", source="calendar", **self.labels)
+            return None
 
 if __name__ == "__main__":
-    NotificationAggregator().run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clarity Hub notification pipeline")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident and poll each source on its own interval (POLL_INTERVALS)")
+    parser.add_argument("--sources", help="Comma-separated live sources to poll (default: ENABLED_SOURCES)")
+    parser.add_argument("--load", type=int, metavar="N",
+                        help="Demo mode: stream N generated items (LOAD_PROFILE, seeded by DEMO_SEED) as a load test")
+    parser.add_argument("--tenants", nargs="?", const="", metavar="IDS",
+                        help="Serve every tenant under TENANTS_DIR in one process (or just the comma-separated IDS)")
+    args = parser.parse_args()
+
+    workload = None
+    if args.load:
+        workload = lambda: MockGenerator(seed=os.getenv("DEMO_SEED")).stream(args.load)
+    try:
+        if args.tenants is None:
+            aggregator = NotificationAggregator(sources=args.sources, workload=workload)
+        else:
+            from backend.config import TENANT_MAX_PASSES
+            from backend.tenants import MultiTenantAggregator, load_tenants
+            names = [name.strip() for name in args.tenants.split(",") if name.strip()] or None
+            aggregator = MultiTenantAggregator(load_tenants(names=names), sources=args.sources, workload=workload)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.load and not aggregator.demo_mode:
+        parser.error("--load needs DEMO_MODE=true")
+    if args.daemon:
+        from backend.daemon import AggregatorDaemon
+        # Tenant passes (one per tenant and source) share a bounded pool
+        max_passes = TENANT_MAX_PASSES if args.tenants is not None else None
+        try:
+            daemon = AggregatorDaemon(aggregator, max_passes=max_passes)
+        except ValueError as e:
+            aggregator.close()
+            parser.error(str(e))
+        daemon.run_forever()
+    else:
+        # Scores stored under an older config are brought up to date first
+        aggregator.rescore_stored()
+        aggregator.run()
+        # Bonuses given by earlier runs fade with time
+        aggregator.refresh_recency()
+        aggregator.close()
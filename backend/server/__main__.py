@@ -0,0 +1,122 @@
+"""
+Local server: python -m backend.server [--host 127.0.0.1] [--port 8787] [--daemon]
+
+Receives Slack Events API, GitHub and Jira webhooks on /webhooks/<source>.
+Expose it through a tunnel or reverse proxy and keep the aggregator polling
+(e.g. --daemon) for reconciliation.
+
+Also serves the dashboard (/frontend/), its read API (/api/...) and live updates
+(/api/events). With --daemon the polling pipeline runs in this process too, so its
+writes reach open dashboards the moment they are stored.
+
+Edits to the scoring config apply to pushed items without a restart: the daemon reloads it
+for both paths; without --daemon the receiver checks the file itself. Stored notifications are
+re-scored by the aggregator (the daemon, or the next run).
+"""
+import argparse
+import logging
+import os
+import threading
+
+from backend.config import load_env, BASE_DIR, DATA_DIR, DB_PATH, STORAGE_BACKEND, SERVER_HOST, SERVER_PORT, ALLOWED_ORIGIN
+from backend.processing.dedup import Deduplicator
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.scoring_config import ScoringConfigWatcher
+from backend.server.api import NotificationApi
+from backend.server.app import HttpServer, static_files
+from backend.server.events import ChangeFeed
+from backend.server.webhooks import WebhookReceiver
+from backend.storage.repository import NotificationRepository
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - [%(levelname)s] - %(message)s')
+
+# Seconds between checks of the scoring config file when no daemon runs in the process
+SCORING_CHECK_INTERVAL = 2.0
+
+
+def watch_scoring(engine, stop, interval=SCORING_CHECK_INTERVAL):
+    """Reloads 'engine' whenever the scoring config file changes, until 'stop' is set."""
+    watcher = ScoringConfigWatcher()
+    while not stop.wait(interval):
+        if not watcher.changed():
+            continue
+        try:
+            config = watcher.load()
+        except (OSError, ValueError) as e:
+            logging.error(f"⚠️  Scoring config not reloaded, keeping the current one: {e}")
+            continue
+        engine.reload(config)
+        logging.info(f"🎛️  Scoring config {config.version} loaded from {config.source} for pushed items")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clarity Hub webhook receiver and dashboard API")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--allow-origin", default=ALLOWED_ORIGIN,
+                        help="The one other origin allowed to read the API (default: none)")
+    parser.add_argument("--daemon", action="store_true", help="Also run the polling pipeline in this process")
+    args = parser.parse_args()
+    load_env()  # Webhook secrets
+
+    aggregator = None
+    if args.daemon:
+        # Imported here so the plain receiver does not load every integration
+        from backend.run_aggregator import NotificationAggregator
+        aggregator = NotificationAggregator()
+
+    repository = NotificationRepository.from_config(DATA_DIR, STORAGE_BACKEND, DB_PATH)
+    # With the daemon, scoring config reloads go through the aggregator's engine and apply to pushed items too
+    engine = aggregator.priority_engine if aggregator is not None else PriorityEngine()
+    if aggregator is not None and aggregator.deduplicator is not None:
+        # One index on disk, one owner: pushed and polled items fold into the same clusters
+        dedup, own_dedup = aggregator.deduplicator, False
+    else:
+        dedup, own_dedup = Deduplicator.from_config(lookup=repository.get, is_vip=engine.is_vip), True
+    receiver = WebhookReceiver(repository, NotificationNormalizer(), engine, dedup=dedup)
+    api = NotificationApi(repository)
+    feed = ChangeFeed(repository).start()
+    snapshot_dir = os.path.dirname(DATA_DIR)
+    routes = {
+        **receiver.routes(),
+        **api.routes(),
+        **feed.routes(),
+        ("GET", "/frontend/*"): static_files(os.path.join(BASE_DIR, "frontend"), "/frontend"),
+        ("GET", "/notifications.json"): static_files(snapshot_dir, ""),
+    }
+    server = HttpServer(routes, args.host, args.port, allowed_origin=args.allow_origin)
+
+    logging.info(f"📡 Webhook receiver listening on {server.url}/webhooks/{{slack,github,jira}}")
+    logging.info(f"📊 Dashboard on {server.url}/frontend/ (API under /api/, live updates on /api/events)")
+    stop_watching = threading.Event()
+    try:
+        if aggregator is not None:
+            from backend.daemon import AggregatorDaemon
+
+            feed.watch(aggregator.repository)  # Pipeline writes reach dashboards without waiting for a check
+            try:
+                daemon = AggregatorDaemon(aggregator)
+            except ValueError as e:
+                aggregator.close()
+                parser.error(str(e))
+            server.start()
+            daemon.run_forever()  # Until SIGINT/SIGTERM; closes the aggregator (and its dedup index)
+        else:
+            threading.Thread(target=watch_scoring, args=(engine, stop_watching), daemon=True,
+                             name="scoring-watch").start()
+            server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("🛑 Shutting down")
+    finally:
+        stop_watching.set()
+        feed.close()
+        server.stop()
+        receiver.flush()
+        if own_dedup:
+            dedup.close()
+        repository.backend.close()
+
+
+if __name__ == "__main__":
+    main()
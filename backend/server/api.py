@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import json
+import time
+from collections import Counter
+
+from backend.config import API_GZIP_MIN_BYTES
+from backend.models import jsonable
+from backend.processing.metrics import get_shared_metrics
+from backend.processing.timestamps import HOUR
+from backend.storage.backends import matches_filters
+
+class NotificationApi:
+    """
+    Read API for the dashboard, so it no longer re-downloads the whole notifications.json.
+
+    GET /api/notifications[?priority=&source=&limit=&since=<cursor>]
+    GET /api/urgent, /api/high, /api/calendar   (the same, pre-filtered for each panel)
+    GET /api/activity[?bucket=hour|day&hours=&priority=&source=]   (counts per time bucket)
+    GET /metrics, /api/metrics   (pipeline metrics of this process: Prometheus text / JSON)
+
+    Every response carries a 'cursor' ("<epoch>:<seq>" of the store) and a weak ETag built from it,
+    so an unchanged view costs a 304 without touching the rows. With '?since=<cursor>' only the
+    notifications written after that cursor come back ('full': false): 'items' are the changed ones
+    still in the view, 'removed' the changed ones that left it. An unknown or outdated cursor
+    (e.g. after a demo run replaced everything) gets the full view. Views with a 'limit' are
+    top-N lists, so any change resends that page in full.
+    """
+
+    VIEWS = {
+        "urgent": {"priority": "urgent"},
+        "high": {"priority": "high"},
+        "calendar": {"source": "calendar"},
+    }
+
+    def __init__(self, repository, gzip_min_bytes=API_GZIP_MIN_BYTES, metrics=None):
+        self.repository = repository
+        self.gzip_min_bytes = gzip_min_bytes
+        self.metrics = metrics or get_shared_metrics()
+        self.counts = Counter()
+
+    def routes(self):
+        routes = {("GET", "/api/notifications"): self.notifications, ("GET", "/api/activity"): self.activity,
+                  ("GET", "/metrics"): self.prometheus, ("GET", "/api/metrics"): self.metrics_snapshot}
+        for name, view in self.VIEWS.items():
+            routes[("GET", f"/api/{name}")] = lambda request, view=view: self.notifications(request, view)
+        return routes
+
+    def notifications(self, request, view=None):
+        filters = dict(view or {})
+        for key in ("priority", "source"):
+            value = request.param(key)
+            if value:
+                filters[key] = value.split(",") if "," in value else value
+        try:
+            limit = int(request.param("limit")) if request.param("limit") else None
+        except ValueError:
+            return 400, {}, {"error": "limit must be an integer"}
+
+        epoch, seq = self.repository.version()
+        cursor = f"{epoch}:{seq}"
+        # 'since' is left out: a client holding the current ETag is already at the current cursor
+        query = sorted((key, values[0]) for key, values in request.query.items() if key != "since")
+        etag = 'W/"' + hashlib.sha1(f"{cursor}|{request.path}|{query}".encode()).hexdigest()[:20] + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag in (request.headers.get("If-None-Match") or ""):
+            self.counts["not_modified"] += 1
+            return 304, headers, b""
+
+        since_seq = self._parse_cursor(request.param("since"), epoch, seq)
+        if since_seq is None:
+            body = self._full(filters, limit)
+        elif since_seq == seq:
+            body = {"full": False, "items": [], "removed": []}
+        elif limit is not None:
+            body = self._full(filters, limit)
+        else:
+            body = self._delta(since_seq, filters)
+
+        self.counts["full" if body["full"] else "delta"] += 1
+        return self._json(request, dict(body, cursor=cursor), headers)
+
+    def activity(self, request):
+        """Counts per hour/day from the store's time-bucket index, e.g. for an activity sparkline."""
+        granularity = request.param("bucket") or "hour"
+        if granularity not in ("hour", "day"):
+            return 400, {}, {"error": "bucket must be 'hour' or 'day'"}
+        try:
+            hours = int(request.param("hours")) if request.param("hours") else 48
+        except ValueError:
+            return 400, {}, {"error": "hours must be an integer"}
+        filters = {key: request.param(key).split(",") for key in ("priority", "source") if request.param(key)}
+
+        # The window slides every hour even when the store does not change
+        epoch, seq = self.repository.version()
+        key = f"{epoch}:{seq}|{int(time.time() // HOUR)}|{sorted(request.query.items())}"
+        etag = 'W/"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in (request.headers.get("If-None-Match") or ""):
+            return 304, headers, b""
+
+        counts = self.repository.buckets(granularity, hours=hours, **filters)
+        return self._json(request, {"bucket": granularity, "counts": counts}, headers)
+
+    def prometheus(self, request):
+        """Pipeline metrics for a Prometheus scrape (filled in when the pipeline runs in this process, --daemon)."""
+        return 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}, self.metrics.prometheus()
+
+    def metrics_snapshot(self, request):
+        return self._json(request, self.metrics.snapshot(), {"Cache-Control": "no-cache"})
+
+    def _full(self, filters, limit):
+        return {"full": True, "items": self.repository.query(limit=limit, **filters), "removed": []}
+
+    def _delta(self, since_seq, filters):
+        items, removed = [], []
+        for item in self.repository.changes(since_seq):
+            if matches_filters(item, **filters):
+                items.append(item)
+            else:
+                removed.append(item["id"])
+        return {"full": False, "items": items, "removed": removed}
+
+    @staticmethod
+    def _parse_cursor(cursor, epoch, seq):
+        """The cursor's seq if it belongs to the current epoch and is not from the future, else None."""
+        if not cursor or ":" not in cursor:
+            return None
+        cursor_epoch, _, cursor_seq = cursor.rpartition(":")
+        try:
+            cursor_seq = int(cursor_seq)
+        except ValueError:
+            return None
+        if cursor_epoch != epoch or cursor_seq > seq:
+            return None
+        return cursor_seq
+
+    def _json(self, request, body, headers):
+        data = json.dumps(body, separators=(",", ":"), default=jsonable).encode()
+        headers.update({"Content-Type": "application/json", "Vary": "Accept-Encoding"})
+        accepts = request.headers.get("Accept-Encoding") or ""
+        if len(data) >= self.gzip_min_bytes and "gzip" in accepts:
+            data = gzip.compress(data, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        return 200, headers, data
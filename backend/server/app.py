@@ -0,0 +1,183 @@
+import json
+import logging
+import mimetypes
+import os
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from backend.models import jsonable
+
+class Request:
+    """What a route handler gets: method, path, query parameters, headers and the raw body."""
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body or b"{}")
+
+    def param(self, name, default=None):
+        """First value of a query parameter."""
+        return self.query.get(name, [default])[0]
+
+
+class HttpServer:
+    """
+    Small threaded HTTP server for the local endpoints (webhook receiver and friends).
+    Routes map (method, path) to handler(request) -> (status, headers, body);
+    a path ending in '/*' matches everything under that prefix.
+    Dict/list bodies are sent as JSON, strings as UTF-8, bytes as-is. An iterator body is
+    streamed chunk by chunk until it ends or the client goes away (Server-Sent Events).
+    Cross-origin reads are refused (no CORS headers) unless 'allowed_origin' names the one origin
+    allowed, e.g. a dashboard served from another port: the API serves private notifications, and
+    any page the user opens could otherwise read them from localhost.
+    """
+
+    def __init__(self, routes, host="127.0.0.1", port=0, allowed_origin=None):
+        self.routes = routes
+        self.allowed_origin = allowed_origin.rstrip("/") if allowed_origin else None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves on a background thread and returns immediately."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="http-server")
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def cors_headers(self, origin):
+        """CORS headers for a request from 'origin': none unless it is the allowed origin."""
+        if self.allowed_origin is None or origin != self.allowed_origin:
+            return {}
+        return {"Access-Control-Allow-Origin": origin, "Access-Control-Expose-Headers": "ETag", "Vary": "Origin"}
+
+    def route(self, method, path):
+        handler = self.routes.get((method, path))
+        if handler is not None:
+            return handler
+        for (route_method, route_path), handler in self.routes.items():
+            if route_method == method and route_path.endswith("/*") and path.startswith(route_path[:-1]):
+                return handler
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                route = server.route(self.command, parts.path)
+
+                if route is None:
+                    status, headers, payload = 404, {}, {"error": "not found"}
+                else:
+                    try:
+                        request = Request(self.command, parts.path, parse_qs(parts.query), self.headers, body)
+                        status, headers, payload = route(request)
+                    except Exception as e:
+                        logging.error(f"❌ {self.command} {parts.path} failed: {e}")
+                        status, headers, payload = 500, {}, {"error": "internal error"}
+
+                self._send(status, dict(headers), payload)
+
+            def _send(self, status, headers, payload):
+                if isinstance(payload, Iterator):
+                    return self._stream(status, headers, payload)
+                if isinstance(payload, bytes):
+                    data = payload
+                elif isinstance(payload, str):
+                    data = payload.encode()
+                    headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+                else:
+                    data = json.dumps(payload, default=jsonable).encode()
+                    headers.setdefault("Content-Type", "application/json")
+
+                self.send_response(status)
+                for key, value in {**server.cors_headers(self.headers.get("Origin")), **headers}.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def _stream(self, status, headers, chunks):
+                self.send_response(status)
+                for key, value in {**server.cors_headers(self.headers.get("Origin")), **headers}.items():
+                    self.send_header(key, value)
+                # No length up front: the body ends when the connection closes
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    close = getattr(chunks, "close", None)
+                    if close is not None:
+                        close()
+
+            def do_OPTIONS(self):
+                # CORS preflight (conditional GETs carry If-None-Match, which is not a "simple" header)
+                if not server.cors_headers(self.headers.get("Origin")):
+                    return self._send(403, {}, b"")
+                self._send(204, {
+                    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+                    "Access-Control-Allow-Headers": "If-None-Match, Content-Type",
+                    "Access-Control-Max-Age": "600",
+                }, b"")
+
+            do_GET = _dispatch
+            do_POST = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def static_files(root, prefix):
+    """A '<prefix>/*' route handler serving files under 'root' (directories serve their index.html)."""
+    root = os.path.realpath(root)
+
+    def handler(request):
+        relative = request.path[len(prefix):].lstrip("/")
+        path = os.path.realpath(os.path.join(root, relative))
+        if path != root and not path.startswith(root + os.sep):
+            return 404, {}, {"error": "not found"}
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            return 404, {}, {"error": "not found"}
+        with open(path, "rb") as f:
+            data = f.read()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return 200, {"Content-Type": content_type, "Cache-Control": "no-cache"}, data
+
+    return handler
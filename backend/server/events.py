@@ -0,0 +1,167 @@
+import json
+import logging
+import queue
+import threading
+from collections import Counter
+
+from backend.config import CHANGE_FEED_INTERVAL, SSE_HEARTBEAT, SSE_MAX_CLIENTS, SSE_QUEUE_SIZE
+from backend.models import jsonable
+from backend.storage.backends import matches_filters
+
+# Queue markers: the client fell behind and must refetch, or the server is going away
+RESYNC = ("resync", {})
+CLOSED = object()
+
+class Subscription:
+    """One connected dashboard: its filters and a bounded queue of events waiting to be sent."""
+
+    def __init__(self, filters, maxsize):
+        self.filters = filters
+        self.queue = queue.Queue(maxsize)
+        self.overflows = 0
+
+    def offer(self, event):
+        """
+        Queues without ever blocking the publisher. A client that is a full queue behind
+        gets its backlog swapped for a single 'resync', and catches up through the API.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflows += 1
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.queue.put_nowait(CLOSED if event is CLOSED else RESYNC)
+
+
+class ChangeFeed:
+    """
+    In-process pub/sub of store changes, streamed to dashboards as Server-Sent Events (GET /api/events).
+
+    The feed follows the store's (epoch, seq), like the delta API does. It wakes up right after
+    every write made through the repository in this process (webhooks, or the pipeline with
+    `python -m backend.server --daemon`), and every CHANGE_FEED_INTERVAL seconds to pick up
+    writes from other processes. Each check publishes one 'notifications' event with everything
+    written since the last one; a replaced dataset (new epoch) publishes 'reset' instead.
+    """
+
+    def __init__(self, repository, interval=CHANGE_FEED_INTERVAL, queue_size=SSE_QUEUE_SIZE,
+                 heartbeat=SSE_HEARTBEAT, max_clients=SSE_MAX_CLIENTS):
+        self.repository = repository
+        self.interval = interval
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.epoch, self.seq = repository.version()
+        self.subscribers = set()
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.watch(repository)
+
+    def watch(self, repository):
+        """Wakes the feed right after every write made through 'repository'."""
+        repository.add_listener(self._wake.set)
+
+    def routes(self):
+        return {("GET", "/api/events"): self.events}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="change-feed")
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stops the feed and ends every open stream."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            for subscription in self.subscribers:
+                subscription.offer(CLOSED)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"❌ Change feed check failed: {e}")
+
+    def check(self):
+        """Publishes whatever was written since the previous check."""
+        # Version first: a write landing in between is sent now and again next time, never lost
+        epoch, seq = self.repository.version()
+        if epoch != self.epoch:
+            self.epoch, self.seq = epoch, seq
+            self.publish("reset", [])
+        elif seq > self.seq:
+            items = self.repository.changes(self.seq)
+            self.seq = seq
+            self.publish("notifications", items)
+
+    @property
+    def cursor(self):
+        return f"{self.epoch}:{self.seq}"
+
+    def publish(self, event, items):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            if event == "reset":
+                subscription.offer((event, {"cursor": self.cursor}))
+                continue
+            # Same shape as an API delta: changed items still in the view, and the ids that left it
+            matched, removed = [], []
+            for item in items:
+                if matches_filters(item, **subscription.filters):
+                    matched.append(item)
+                elif subscription.filters:
+                    removed.append(item["id"])
+            if matched or removed:
+                subscription.offer((event, {"cursor": self.cursor, "items": matched, "removed": removed}))
+        self.counts[event] += 1
+
+    # --- Endpoint ---
+
+    def events(self, request):
+        with self._lock:
+            if len(self.subscribers) >= self.max_clients:
+                return 503, {"Retry-After": "30"}, {"error": "too many live clients"}
+        filters = {}
+        for key in ("priority", "source"):
+            value = request.param(key)
+            if value:
+                filters[key] = value.split(",") if "," in value else value
+        headers = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        return 200, headers, self._stream(Subscription(filters, self.queue_size))
+
+    def _stream(self, subscription):
+        with self._lock:
+            self.subscribers.add(subscription)
+        self.counts["connected"] += 1
+        try:
+            # Reconnect delay for EventSource, and something to flush the headers through proxies
+            yield f"retry: 3000\n: connected at {self.cursor}\n\n"
+            while True:
+                try:
+                    event = subscription.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is CLOSED:
+                    return
+                if event is RESYNC:
+                    self.counts["resync"] += 1
+                name, data = event
+                yield f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'), default=jsonable)}\n\n"
+        finally:
+            with self._lock:
+                self.subscribers.discard(subscription)
@@ -0,0 +1,209 @@
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from backend.config import WEBHOOK_SNAPSHOT_DELAY
+from backend.integrations.github_client import GitHubClient
+from backend.integrations.jira_client import JiraClient
+
+# Slack rejects deliveries older than this too; it keeps captured requests from being replayed
+SLACK_MAX_AGE = 60 * 5
+
+class WebhookReceiver:
+    """
+    Push ingestion for the Slack Events API, GitHub webhooks and Jira webhooks.
+    Every delivery is signature-checked, then normalized, scored and upserted on the spot,
+    so it reaches the store in milliseconds instead of at the next poll.
+
+    Polling keeps running as reconciliation: both paths produce the same notification IDs,
+    so a pushed item and its polled copy land on the same row. A closed PR/issue or a resolved
+    ticket is removed from the store, as polling does when it finds one.
+    The JSON snapshot is re-exported at most every WEBHOOK_SNAPSHOT_DELAY seconds.
+    With a 'dedup' stage, a pushed duplicate is folded into its canonical notification.
+    """
+
+    def __init__(self, repository, normalizer, engine, secrets=None, snapshot_delay=WEBHOOK_SNAPSHOT_DELAY,
+                 dedup=None):
+        self.repository = repository
+        self.normalizer = normalizer
+        self.engine = engine
+        self.dedup = dedup
+        self.secrets = secrets or {
+            "slack": os.getenv("SLACK_SIGNING_SECRET"),
+            "github": os.getenv("GITHUB_WEBHOOK_SECRET"),
+            "jira": os.getenv("JIRA_WEBHOOK_SECRET"),
+        }
+        # Only used for its issue -> notification mapping
+        self.jira = JiraClient()
+        self.snapshot_delay = snapshot_delay
+        self.counts = Counter()
+        self._snapshot_timer = None
+        self._lock = threading.Lock()
+
+        for source, secret in self.secrets.items():
+            if not secret:
+                print(f"⚠️ No {source} webhook secret set; its deliveries will be rejected.")
+
+    def routes(self):
+        return {
+            ("POST", "/webhooks/slack"): self.slack,
+            ("POST", "/webhooks/github"): self.github,
+            ("POST", "/webhooks/jira"): self.jira_event,
+        }
+
+    # --- Endpoints ---
+
+    def slack(self, request):
+        if not verify_slack(self.secrets.get("slack"), request.headers, request.body):
+            return self._rejected("slack")
+        payload = request.json()
+
+        # Sent once when the Request URL is configured
+        if payload.get("type") == "url_verification":
+            return 200, {}, {"challenge": payload.get("challenge")}
+
+        event = payload.get("event") or {}
+        is_message = event.get("type") in ("message", "app_mention") and not event.get("subtype")
+        if payload.get("type") != "event_callback" or not is_message:
+            return self._ignored("slack")
+
+        # Same shape SlackIntegration produces when polling
+        raw = dict(event, channel_name="Slack Channel")
+        return self._ingest("slack", raw)
+
+    def github(self, request):
+        signature = request.headers.get("X-Hub-Signature-256")
+        if not verify_hub_signature(self.secrets.get("github"), signature, request.body):
+            return self._rejected("github")
+
+        event = request.headers.get("X-GitHub-Event")
+        if event == "ping":
+            return 200, {}, {"ok": True}
+
+        payload = request.json()
+        action = payload.get("action")
+        if event not in ("pull_request", "issues"):
+            return self._ignored("github")
+        item = dict(payload["pull_request" if event == "pull_request" else "issue"])
+        item["repository_url"] = payload["repository"]["url"]
+
+        if action == "closed":
+            # Closed or merged: it leaves the list, as it does when polling finds it closed
+            return self._remove("github", item)
+        if event == "pull_request" and action == "review_requested":
+            prefix, priority = "Review Required", "high"
+        elif action == "assigned":
+            prefix, priority = "Assigned to You", "normal"
+        else:
+            return self._ignored("github")
+        return self._ingest("github", GitHubClient.raw_item(item, prefix, priority))
+
+    def jira_event(self, request):
+        # Jira webhooks created with a secret sign the body like GitHub does
+        signature = request.headers.get("X-Hub-Signature")
+        if not verify_hub_signature(self.secrets.get("jira"), signature, request.body):
+            return self._rejected("jira")
+
+        payload = request.json()
+        issue = payload.get("issue")
+        if payload.get("webhookEvent") not in ("jira:issue_created", "jira:issue_updated") or not issue:
+            return self._ignored("jira")
+        # A resolved ticket leaves the list, as it does when polling finds it resolved
+        if self.jira.is_resolved(issue):
+            return self._remove("jira", self.jira.raw_item(issue))
+
+        return self._ingest("jira", self.jira.raw_item(issue))
+
+    # --- Pipeline ---
+
+    def _ingest(self, source, raw):
+        started = time.perf_counter()
+        notification = self.normalizer.normalize(raw, source)
+        unique = list(self.dedup.stage([notification])) if self.dedup else [notification]
+        if not unique:
+            return self._ignored(source)  # A folded duplicate delivered again
+        scored = list(self.engine.iter_process(unique))
+        if not self.repository.upsert_all(scored, snapshot=False):
+            return 500, {}, {"error": "storage failed"}
+        self._schedule_snapshot()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.counts[source] += 1
+        note = scored[0]
+        logging.info(f"📬 {source} push: {note['id']} stored as {note['priority']} in {elapsed_ms:.1f}ms")
+        return 200, {}, {"ok": True, "id": note["id"], "priority": note["priority"]}
+
+    def _remove(self, source, raw):
+        notification_id = self.normalizer.normalize(raw, source)["id"]
+        removed = self.repository.remove([notification_id], snapshot=False)
+        if removed is None:
+            return 500, {}, {"error": "storage failed"}
+        if removed:
+            self._schedule_snapshot()
+            logging.info(f"📬 {source} push: {notification_id} closed, removed")
+        self.counts[f"{source}_removed"] += 1
+        return 200, {}, {"ok": True, "id": notification_id, "removed": bool(removed)}
+
+    def _rejected(self, source):
+        self.counts[f"{source}_rejected"] += 1
+        logging.warning(f"🚫 {source} webhook with a missing or bad signature rejected")
+        return 401, {}, {"error": "invalid signature"}
+
+    def _ignored(self, source):
+        self.counts[f"{source}_ignored"] += 1
+        return 200, {}, {"ok": True, "ignored": True}
+
+    def _schedule_snapshot(self):
+        with self._lock:
+            if self._snapshot_timer is not None:
+                return  # An export is already on its way and will include this item
+            self._snapshot_timer = threading.Timer(self.snapshot_delay, self._export_snapshot)
+            self._snapshot_timer.daemon = True
+            self._snapshot_timer.start()
+
+    def _export_snapshot(self):
+        with self._lock:
+            self._snapshot_timer = None
+        try:
+            self.repository.export_snapshot()
+        except Exception as e:
+            print(f"❌ Error exporting snapshot: {e}")
+
+    def flush(self):
+        """Exports a pending snapshot right away (call on shutdown)."""
+        with self._lock:
+            timer, self._snapshot_timer = self._snapshot_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._export_snapshot()
+
+
+def verify_slack(secret, headers, body, now=None):
+    """
+    Slack signs 'v0:{timestamp}:{body}' with the app's signing secret (X-Slack-Signature).
+    Stale timestamps are refused so a captured request cannot be replayed later.
+    """
+    timestamp = headers.get("X-Slack-Request-Timestamp")
+    signature = headers.get("X-Slack-Signature")
+    if not secret or not timestamp or not signature:
+        return False
+    try:
+        if abs((now or time.time()) - int(timestamp)) > SLACK_MAX_AGE:
+            return False
+    except ValueError:
+        return False
+    base = b"v0:" + timestamp.encode() + b":" + body
+    expected = "v0=" + hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def verify_hub_signature(secret, signature, body):
+    """Checks a 'sha256=<hex hmac of body>' header (GitHub X-Hub-Signature-256, Jira X-Hub-Signature)."""
+    if not secret or not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
@@ -0,0 +1,636 @@
+import itertools
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import uuid
+from collections import Counter
+
+from backend.models import Notification, dumps, jsonable
+from backend.processing.timestamps import DAY, HOUR, epoch_of, to_epoch, to_epochs
+
+# A character the full-text index keeps in a token (its unicode61 tokenizer splits on the rest)
+_WORD = re.compile(r"[^\W_]")
+
+class StorageBackend:
+    """
+    Interface every storage engine implements.
+    Notifications are keyed by their 'id'. Writes accept Notifications or plain dicts;
+    reads return Notifications.
+    """
+
+    def upsert_many(self, items):
+        """Inserts or replaces the given notifications in one atomic commit. Returns the count written."""
+        raise NotImplementedError
+
+    def replace_all(self, items):
+        """Atomically swaps the whole dataset for 'items'."""
+        raise NotImplementedError
+
+    def delete_many(self, ids):
+        """
+        Deletes the notifications with these IDs in one commit. Returns how many were stored.
+        A deleted row cannot show up in changes(), so a delete starts a new epoch.
+        """
+        raise NotImplementedError
+
+    def get(self, notification_id):
+        raise NotImplementedError
+
+    def query(self, priority=None, source=None, since=None, until=None,
+              order_by="priority_score", descending=True, limit=None, offset=0):
+        """
+        Filtered, ordered, paginated read. 'since'/'until' bound the timestamp (inclusive);
+        they may be ISO strings or epoch seconds. Time ordering and bounds use 'timestamp_epoch'.
+        """
+        raise NotImplementedError
+
+    def count(self, priority=None, source=None, since=None, until=None):
+        raise NotImplementedError
+
+    def buckets(self, granularity="hour", priority=None, source=None, since=None, until=None):
+        """
+        Notification counts per hour or day (UTC) as [(bucket start epoch, count)], oldest first.
+        Empty buckets are left out.
+        """
+        raise NotImplementedError
+
+    def iter_all(self, batch_size=1000, **filters):
+        """Streams matching notifications (highest score first) without loading them all at once."""
+        raise NotImplementedError
+
+    def version(self):
+        """
+        (epoch, seq) describing the current state. 'seq' grows with every write;
+        'epoch' changes when the dataset is replaced wholesale or rows are deleted, so older seqs stop meaning anything.
+        """
+        raise NotImplementedError
+
+    def changes(self, since_seq):
+        """Notifications written after 'since_seq' (same epoch), oldest change first."""
+        raise NotImplementedError
+
+    def match_ids(self, keywords=(), senders=(), reasons=(), score_ranges=(), near=None):
+        """
+        IDs of the notifications a scoring change can affect: text with one of 'keywords' (where the
+        keyword matcher would find it, at the start of a word), a sender that is one of 'senders', a
+        stored reason starting with one of 'reasons', a score in one of the [low, high) 'score_ranges',
+        or a timestamp within near=(epoch, seconds) of that epoch. May include a few that turn out
+        unaffected, never leaves one out. None means "every notification" (there is no index to ask).
+        """
+        return None
+
+    def get_many(self, ids, batch_size=500):
+        """Streams the notifications with these IDs (missing ones are skipped)."""
+        wanted = set(ids)
+        for note in self.iter_all(batch_size=batch_size):
+            if note["id"] in wanted:
+                yield note
+
+    def get_meta(self, key):
+        """A value the store keeps about itself (e.g. the scoring config its scores were made with), or None."""
+        raise NotImplementedError
+
+    def set_meta(self, key, value):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite store in WAL mode.
+    Each notification is one row (upsert by id) with the fields we filter/sort on
+    pulled out into indexed columns and the full document kept as JSON.
+    WAL lets readers (e.g. a dashboard API) run while the pipeline commits.
+
+    Titles, content and senders are also in a full-text index (notification_terms, FTS5), updated
+    in the same commit as the rows. It is the inverted index match_ids() uses to find the
+    notifications a new keyword or VIP touches without reading the rest.
+    """
+
+    # 'timestamp' orders by the epoch column: the strings come in several formats
+    ORDER_COLUMNS = {"priority_score": "priority_score", "timestamp": "timestamp_epoch", "source": "source",
+                     "priority": "priority", "id": "id"}
+    # Whole hours since 1970; the same expression as the bucket index, so queries can use it
+    HOUR_BUCKET = f"CAST(timestamp_epoch / {HOUR} AS INTEGER)"
+
+    UPSERT = """
+        INSERT INTO notifications (id, source, priority, priority_score, timestamp, timestamp_epoch, data, seq)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            source = excluded.source,
+            priority = excluded.priority,
+            priority_score = excluded.priority_score,
+            timestamp = excluded.timestamp,
+            timestamp_epoch = excluded.timestamp_epoch,
+            data = excluded.data,
+            seq = excluded.seq
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS notifications (
+            id TEXT PRIMARY KEY,
+            source TEXT,
+            priority TEXT,
+            priority_score INTEGER,
+            timestamp TEXT,
+            data TEXT NOT NULL,
+            seq INTEGER NOT NULL DEFAULT 0,
+            timestamp_epoch REAL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_notifications_priority ON notifications(priority, priority_score DESC);
+        CREATE INDEX IF NOT EXISTS idx_notifications_score ON notifications(priority_score DESC, id);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        with self._lock:
+            self._conn.executescript(self.SCHEMA)
+            self._migrate()
+
+    def _migrate(self):
+        # Stores created before change tracking have no 'seq' column yet
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(notifications)")}
+        if "seq" not in columns:
+            self._conn.execute("ALTER TABLE notifications ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        if "timestamp_epoch" not in columns:
+            self._conn.execute("ALTER TABLE notifications ADD COLUMN timestamp_epoch REAL")
+            self._backfill_epochs()
+        # Time indexes used to be on the timestamp strings
+        self._conn.execute("DROP INDEX IF EXISTS idx_notifications_source")
+        self._conn.execute("DROP INDEX IF EXISTS idx_notifications_timestamp")
+        self._conn.executescript(f"""
+            CREATE INDEX IF NOT EXISTS idx_notifications_seq ON notifications(seq);
+            CREATE INDEX IF NOT EXISTS idx_notifications_source_time ON notifications(source, timestamp_epoch);
+            CREATE INDEX IF NOT EXISTS idx_notifications_time ON notifications(timestamp_epoch);
+            CREATE INDEX IF NOT EXISTS idx_notifications_hour ON notifications({self.HOUR_BUCKET});
+        """)
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex[:12],))
+        self._migrate_search()
+
+    def _migrate_search(self):
+        """Adds the full-text index to stores created before it, and indexes what they hold."""
+        if self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'notification_terms'").fetchone():
+            return
+        # Contentless: the text stays in 'data'; the index only maps words to rowids
+        self._conn.execute("CREATE VIRTUAL TABLE notification_terms USING fts5(text, sender, content='', columnsize=0)")
+        cursor = self._conn.execute("SELECT rowid, data FROM notifications")
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                return
+            self._conn.executemany("INSERT INTO notification_terms (rowid, text, sender) VALUES (?, ?, ?)",
+                                   [(rowid, *search_terms(json.loads(data))) for rowid, data in rows])
+
+    def _backfill_epochs(self, batch_size=10000):
+        """Fills 'timestamp_epoch' (column and document) for rows stored before it existed."""
+        cursor = self._conn.execute("SELECT id, timestamp FROM notifications")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            epochs = to_epochs([timestamp for _, timestamp in rows]).tolist()
+            self._conn.executemany(
+                "UPDATE notifications SET timestamp_epoch = ?, data = json_set(data, '$.timestamp_epoch', ?) WHERE id = ?",
+                [(epoch, epoch, row_id) for (row_id, _), epoch in zip(rows, epochs) if epoch == epoch])
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def to_row(item):
+        """Serializes a notification into the column tuple used by upserts."""
+        return (
+            item["id"],
+            item.get("source"),
+            item.get("priority"),
+            item.get("priority_score", 0),
+            item.get("timestamp"),
+            epoch_of(item),
+            dumps(item)
+        )
+
+    def _write(self, statements):
+        """Runs the callable(conn) inside one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def upsert_many(self, items):
+        items = list(items)
+        return self.upsert_rows([self.to_row(item) for item in items], items)
+
+    def upsert_rows(self, rows, items=None):
+        """
+        Upserts rows already produced by to_row() (e.g. serialized in a worker process).
+        'items', the notifications they were made from, saves decoding them again for the full-text index.
+        """
+        if not rows:
+            return 0
+        # Every row written by this commit shares the next seq, which is what delta readers track
+        self._write(lambda conn: self._upsert(conn, rows, self._next_seq(conn), items))
+        return len(rows)
+
+    def _upsert(self, conn, rows, seq, items=None):
+        """
+        Upserts 'rows' and brings their full-text entries up to date, inside the caller's transaction.
+        Old and new entries both come from search_terms(), so a 'delete' removes exactly what was indexed;
+        rows whose text and sender did not change (most re-polls) leave the index alone.
+        """
+        latest = {row[0]: row for row in rows}
+        notes = {item["id"]: item for item in items} if items is not None else {}
+
+        def new_terms(row_id):
+            note = notes.get(row_id)
+            return search_terms(json.loads(latest[row_id][6]) if note is None else note)
+        before = {row_id: (rowid, data) for row_id, rowid, data in self._lookup(conn, "id, rowid, data", latest)}
+        conn.executemany(self.UPSERT, (row + (seq,) for row in rows))
+
+        stale, fresh, added = [], [], []
+        for row_id, row in latest.items():
+            if row_id not in before:
+                added.append(row_id)
+                continue
+            rowid, data = before[row_id]
+            if data == row[6]:
+                continue
+            old, new = search_terms(json.loads(data)), new_terms(row_id)
+            if old != new:
+                stale.append((rowid, *old))
+                fresh.append((rowid, *new))
+        fresh += [(rowid, *new_terms(row_id)) for row_id, rowid in self._lookup(conn, "id, rowid", added)]
+        conn.executemany("INSERT INTO notification_terms (notification_terms, rowid, text, sender) "
+                         "VALUES ('delete', ?, ?, ?)", stale)
+        conn.executemany("INSERT INTO notification_terms (rowid, text, sender) VALUES (?, ?, ?)", fresh)
+
+    def _lookup(self, conn, columns, ids, batch_size=500):
+        """SELECT 'columns' of the stored notifications among 'ids', in batches that fit SQLite's parameter limit."""
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            yield from conn.execute(f"SELECT {columns} FROM notifications WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+
+    def _next_seq(self, conn):
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM notifications").fetchone()[0]
+
+    def replace_all(self, items):
+        # Rows are generated lazily and written in chunks, so 'items' can be a stream of any length
+        written = 0
+
+        def swap(conn):
+            nonlocal written
+            conn.execute("DELETE FROM notifications")
+            conn.execute("INSERT INTO notification_terms (notification_terms) VALUES ('delete-all')")
+            # A new epoch tells delta readers that their old seq no longer applies
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'epoch'", (uuid.uuid4().hex[:12],))
+            items_left = iter(items)
+            while True:
+                chunk = list(itertools.islice(items_left, 1000))
+                if not chunk:
+                    return
+                self._upsert(conn, [self.to_row(item) for item in chunk], 1, chunk)
+                written += len(chunk)
+
+        self._write(swap)
+        return written
+
+    def delete_many(self, ids):
+        def delete(conn):
+            found = list(self._lookup(conn, "rowid, data", set(ids)))
+            if not found:
+                return 0
+            conn.executemany("INSERT INTO notification_terms (notification_terms, rowid, text, sender) "
+                             "VALUES ('delete', ?, ?, ?)", [(rowid, *search_terms(json.loads(data))) for rowid, data in found])
+            conn.executemany("DELETE FROM notifications WHERE rowid = ?", [(rowid,) for rowid, _ in found])
+            # Delta readers cannot see a row that is gone; the new epoch sends them the full view instead
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'epoch'", (uuid.uuid4().hex[:12],))
+            return len(found)
+
+        return self._write(delete)
+
+    def get(self, notification_id):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM notifications WHERE id = ?", (notification_id,)).fetchone()
+        return Notification.from_json(row[0]) if row else None
+
+    def _where(self, priority=None, source=None, since=None, until=None):
+        clauses, params = [], []
+        for column, value in (("priority", priority), ("source", source)):
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp_epoch >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            clauses.append("timestamp_epoch <= ?")
+            params.append(to_epoch(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _select(self, order_by, descending, limit, offset, filters):
+        if order_by not in self.ORDER_COLUMNS:
+            raise ValueError(f"Cannot order by '{order_by}'")
+        where, params = self._where(**filters)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT data FROM notifications{where} ORDER BY {self.ORDER_COLUMNS[order_by]} {direction}, id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return sql, params
+
+    def query(self, priority=None, source=None, since=None, until=None,
+              order_by="priority_score", descending=True, limit=None, offset=0):
+        filters = {"priority": priority, "source": source, "since": since, "until": until}
+        sql, params = self._select(order_by, descending, limit, offset, filters)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Notification.from_json(row[0]) for row in rows]
+
+    def count(self, priority=None, source=None, since=None, until=None):
+        where, params = self._where(priority, source, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM notifications{where}", params).fetchone()[0]
+
+    def buckets(self, granularity="hour", priority=None, source=None, since=None, until=None):
+        where, params = self._where(priority, source, since, until)
+        where += (" AND " if where else " WHERE ") + "timestamp_epoch IS NOT NULL"
+        # Days are grouped from the hour index (24 hours each, UTC)
+        bucket = self.HOUR_BUCKET if granularity == "hour" else f"{self.HOUR_BUCKET} / 24"
+        size = HOUR if granularity == "hour" else DAY
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {bucket} AS bucket, COUNT(*) FROM notifications{where} GROUP BY bucket ORDER BY bucket",
+                params).fetchall()
+        return [(bucket * size, count) for bucket, count in rows]
+
+    def iter_all(self, batch_size=1000, order_by="priority_score", descending=True, **filters):
+        for raw in self.iter_json(batch_size, order_by, descending, **filters):
+            yield Notification.from_json(raw)
+
+    def iter_json(self, batch_size=1000, order_by="priority_score", descending=True, **filters):
+        """Like iter_all() but yields the stored JSON text, skipping a decode/encode round-trip."""
+        # A separate read connection gives the iterator a consistent snapshot
+        # without holding the writer lock while the caller consumes it.
+        sql, params = self._select(order_by, descending, None, 0, {
+            "priority": None, "source": None, "since": None, "until": None, **filters
+        })
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0]
+        finally:
+            conn.close()
+
+    def version(self):
+        with self._lock:
+            epoch = self._conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM notifications").fetchone()[0]
+        return epoch, seq
+
+    def changes(self, since_seq):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM notifications WHERE seq > ? ORDER BY seq", (since_seq,)
+            ).fetchall()
+        return [Notification.from_json(row[0]) for row in rows]
+
+    def match_ids(self, keywords=(), senders=(), reasons=(), score_ranges=(), near=None):
+        queries, params = [], []
+        # Keywords are prefix phrases ("sev-1": sev, then a word starting with 1); senders whole phrases
+        for column, values, prefix in (("text", keywords, "*"), ("sender", senders, "")):
+            if not values:
+                continue
+            if not all(_WORD.search(value) for value in values):
+                return None  # Nothing the index could look up; only a full scan finds it
+            phrases = " OR ".join('"' + value.replace('"', '""') + '"' + prefix for value in sorted(values))
+            queries.append("SELECT id FROM notifications WHERE rowid IN "
+                           "(SELECT rowid FROM notification_terms WHERE notification_terms MATCH ?)")
+            params.append(f"{column} : ({phrases})")
+        for prefix in reasons:
+            queries.append("SELECT id FROM notifications WHERE EXISTS "
+                           "(SELECT 1 FROM json_each(data, '$.priority_reasons') WHERE substr(value, 1, ?) = ?)")
+            params += [len(prefix), prefix]
+        for low, high in score_ranges:
+            queries.append("SELECT id FROM notifications WHERE priority_score >= ? AND priority_score < ?")
+            params += [low, high]
+        if near is not None:
+            epoch, seconds = near
+            queries.append("SELECT id FROM notifications WHERE timestamp_epoch > ? AND timestamp_epoch < ?")
+            params += [epoch - seconds, epoch + seconds]
+        if not queries:
+            return set()
+        with self._lock:
+            return {row[0] for row in self._conn.execute(" UNION ".join(queries), params)}
+
+    def get_many(self, ids, batch_size=500):
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            with self._lock:
+                rows = list(self._lookup(self._conn, "data", ids[start:start + batch_size]))
+            for row in rows:
+                yield Notification.from_json(row[0])
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self._write(lambda conn: conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)))
+
+    def rowid_chunks(self, chunk_size):
+        """
+        Splits the table into [start, end) rowid ranges of roughly 'chunk_size' rows.
+        Workers can read a range independently, so nothing has to pass through one process.
+        """
+        with self._lock:
+            low, high = self._conn.execute("SELECT MIN(rowid), MAX(rowid) FROM notifications").fetchone()
+        if low is None:
+            return []
+        return [(start, min(start + chunk_size, high + 1)) for start in range(low, high + 1, chunk_size)]
+
+    def read_rowid_range(self, start, end):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM notifications WHERE rowid >= ? AND rowid < ?", (start, end)
+            ).fetchall()
+        return [Notification.from_json(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JsonFileBackend(StorageBackend):
+    """
+    Legacy single-file store: the whole dataset lives in one JSON array.
+    Kept for setups that want the dashboard to read the store directly.
+    Writes go through a temp file + rename, so readers never see half a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Not part of the file, so kept for the life of the process only
+        self._meta = {}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r') as f:
+            return [Notification(item) for item in json.load(f)]
+
+    def _save(self, data):
+        data = sorted(data, key=lambda x: x.get("priority_score", 0), reverse=True)
+        atomic_write_json(self.path, data)
+
+    def upsert_many(self, items):
+        items = list(items)
+        with self._lock:
+            merged = {n['id']: n for n in self._load()}
+            merged.update((item['id'], item) for item in items)
+            self._save(merged.values())
+        return len(items)
+
+    def replace_all(self, items):
+        items = list(items)
+        with self._lock:
+            self._save(items)
+        return len(items)
+
+    def delete_many(self, ids):
+        ids = set(ids)
+        with self._lock:
+            data = self._load()
+            kept = [n for n in data if n['id'] not in ids]
+            if len(kept) < len(data):
+                self._save(kept)
+        return len(data) - len(kept)
+
+    def get(self, notification_id):
+        with self._lock:
+            return next((n for n in self._load() if n['id'] == notification_id), None)
+
+    def _filter(self, data, priority=None, source=None, since=None, until=None):
+        return [n for n in data if matches_filters(n, priority, source, since, until)]
+
+    def query(self, priority=None, source=None, since=None, until=None,
+              order_by="priority_score", descending=True, limit=None, offset=0):
+        with self._lock:
+            data = self._filter(self._load(), priority, source, since, until)
+        if order_by == "timestamp":
+            data.sort(key=lambda n: epoch_of(n) or 0, reverse=descending)
+        else:
+            data.sort(key=lambda n: (n.get(order_by) or 0) if order_by == "priority_score" else (n.get(order_by) or ""),
+                      reverse=descending)
+        return data[offset:offset + limit] if limit is not None else data[offset:]
+
+    def count(self, priority=None, source=None, since=None, until=None):
+        with self._lock:
+            return len(self._filter(self._load(), priority, source, since, until))
+
+    def buckets(self, granularity="hour", priority=None, source=None, since=None, until=None):
+        size = HOUR if granularity == "hour" else DAY
+        with self._lock:
+            data = self._filter(self._load(), priority, source, since, until)
+        counts = Counter(int(epoch // size) * size for epoch in map(epoch_of, data) if epoch is not None)
+        return sorted(counts.items())
+
+    def iter_all(self, batch_size=1000, order_by="priority_score", descending=True, **filters):
+        yield from self.query(order_by=order_by, descending=descending, **filters)
+
+    def version(self):
+        # No per-row tracking in a single file: every write is a new epoch, so readers always get it in full
+        try:
+            return f"json{os.stat(self.path).st_mtime_ns}", 0
+        except FileNotFoundError:
+            return "json0", 0
+
+    def changes(self, since_seq):
+        return self.query()
+
+    def get_meta(self, key):
+        return self._meta.get(key)
+
+    def set_meta(self, key, value):
+        self._meta[key] = value
+
+
+def search_terms(note):
+    """
+    (text, sender) as the full-text index keeps them for a notification: the text the keyword
+    matcher scans (title and content) and the sender's name and address the VIP lookup reads.
+    """
+    sender = note.get("sender") or {}
+    if isinstance(sender, str):
+        sender = {"name": sender}
+    return f"{note.get('title') or ''} {note.get('content') or ''}", f"{sender.get('name') or ''} {sender.get('email') or ''}"
+
+
+def matches_filters(item, priority=None, source=None, since=None, until=None):
+    """The in-memory equivalent of the SQL filters ('priority'/'source' may be a value or a list)."""
+    def matches(value, wanted):
+        if wanted is None:
+            return True
+        return value in wanted if isinstance(wanted, (list, tuple, set)) else value == wanted
+
+    if since is not None or until is not None:
+        epoch = epoch_of(item)
+        if epoch is None or (since is not None and epoch < to_epoch(since)) or \
+                (until is not None and epoch > to_epoch(until)):
+            return False
+    return matches(item.get("priority"), priority) and matches(item.get("source"), source)
+
+
+def atomic_write_json(path, data, indent=None, preserialized=False):
+    """
+    Writes 'data' (any iterable of JSON-able items, or a JSON-able object) to 'path' atomically.
+    Iterables are streamed item by item, so they never need to be a list in memory.
+    With preserialized=True the items are already JSON strings and are written as-is.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            if isinstance(data, dict):
+                f.write(json.dumps(data, indent=indent, default=jsonable))
+            else:
+                f.write("[")
+                for i, item in enumerate(data):
+                    f.write(",\n" if i else "\n")
+                    f.write(item if preserialized else dumps(item) if indent is None
+                            else json.dumps(item, indent=indent, default=jsonable))
+                f.write("\n]")
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, path)
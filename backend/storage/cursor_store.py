@@ -0,0 +1,56 @@
+import json
+import os
+import threading
+
+from backend.storage.backends import atomic_write_json
+
+class SyncCursorStore:
+    """
+    Remembers, per source, how far the last successful sync got
+    (Slack 'oldest' ts, GitHub/Jira last-updated timestamp, Gmail historyId, Discord snowflake).
+    Integrations use it to fetch only what changed since the previous run.
+    """
+
+    def __init__(self, filepath="sync_cursors.json"):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._cursors = self._load()
+
+    def get(self, source, default=None):
+        with self._lock:
+            return self._cursors.get(source, default)
+
+    def update(self, cursors):
+        """
+        Records new cursor values and persists them.
+        Call only after the items they cover have been stored, so a failed run re-fetches them.
+        """
+        with self._lock:
+            self._cursors.update({k: v for k, v in cursors.items() if v is not None})
+            self._write(self._cursors)
+
+    def reset(self, source=None):
+        """Forgets one cursor (or all of them) so the next run does a full fetch."""
+        with self._lock:
+            if source is None:
+                self._cursors.clear()
+            else:
+                self._cursors.pop(source, None)
+            self._write(self._cursors)
+
+    def _load(self):
+        if not os.path.exists(self.filepath):
+            return {}
+        try:
+            with open(self.filepath, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"❌ Error loading sync cursors: {e}")
+            return {}
+
+    def _write(self, data):
+        # Write to a temp file and swap it in, so a crash never leaves half a cursor file
+        try:
+            atomic_write_json(self.filepath, data, indent=4)
+        except Exception as e:
+            print(f"❌ Error saving sync cursors: {e}")
@@ -1,39 +1,190 @@
 import json
 import os
+import time
+
+from backend.config import EXPORT_SNAPSHOT
+from backend.processing.pipeline import chunked
+from backend.processing.timestamps import HOUR
+from backend.storage.backends import SQLiteBackend, JsonFileBackend, atomic_write_json
 
 class NotificationRepository:
     """
-    Handles saving and loading notifications to/from a JSON file.
-    Acting as our simple local database.
+    Handles saving and loading notifications.
+    Data lives in a pluggable storage backend (SQLite by default, upsert-by-id with indexes
+    on priority, source and timestamp). The dashboard reads it through the API; with
+    export_snapshots (EXPORT_SNAPSHOT) a JSON snapshot is also exported atomically after writes.
     """
-    
-    def __init__(self, filepath="notifications.json"):
-        # We save the file in the root directory so the frontend can find it easily
+
+    def __init__(self, filepath="notifications.json", backend=None, export_snapshots=EXPORT_SNAPSHOT):
+        # We save the snapshot in the root directory so the frontend can find it easily
         self.filepath = filepath
+        self.backend = backend or SQLiteBackend(os.path.splitext(filepath)[0] + ".db")
+        self.export_snapshots = export_snapshots
+        # Store version the snapshot was last exported at; an unchanged store is not exported again
+        self._exported_version = None
+        # Called with no arguments after every committed write (e.g. the live-update feed)
+        self.listeners = []
+
+        # First start on a fresh database: carry over whatever the old JSON file held
+        if isinstance(self.backend, SQLiteBackend) and self.backend.count() == 0 and os.path.exists(self.filepath):
+            self.backend.upsert_many(self._read_snapshot())
+
+    @classmethod
+    def from_config(cls, filepath, backend_name, db_path=None):
+        """
+        Builds a repository for the backend named in config ("sqlite" or "json").
+        """
+        if backend_name == "json":
+            return cls(filepath, backend=JsonFileBackend(filepath))
+        if backend_name == "sqlite":
+            return cls(filepath, backend=SQLiteBackend(db_path or os.path.splitext(filepath)[0] + ".db"))
+        raise ValueError(f"Unknown storage backend '{backend_name}'")
+
+    def upsert_all(self, items, snapshot=True):
+        """
+        Inserts new notifications and updates existing ones (matched by 'id') in one commit.
+        Used by incremental syncs, where a run only carries the delta.
+        Bulk writers can pass snapshot=False and call export_snapshot() once at the end.
+        """
+        try:
+            self.backend.upsert_many(items)
+            self._notify()
+            if snapshot:
+                self.export_snapshot()
+            return True
+        except Exception as e:
+            print(f"❌ Error saving to database: {e}")
+            return False
+
+    def upsert_stream(self, items, chunk_size=500):
+        """
+        Streaming upsert: consumes 'items' in chunks of 'chunk_size', one commit per chunk,
+        so memory stays bounded however long the stream is. The snapshot is exported once at the end.
+        """
+        try:
+            for chunk in chunked(items, chunk_size):
+                self.backend.upsert_many(chunk)
+                self._notify()
+            self.export_snapshot()
+            return True
+        except Exception as e:
+            print(f"❌ Error saving to database: {e}")
+            return False
 
     def save_all(self, data):
         """
-        Saves the entire list of notifications to the file.
-        Overwrites the previous file.
+        Saves the entire list of notifications.
+        Overwrites the previous contents (compatibility shim over the backend).
+        'data' may also be a generator; the SQLite backend streams it in one transaction.
         """
         try:
-            with open(self.filepath, 'w') as f:
-                json.dump(data, f, indent=4)
+            self.backend.replace_all(data)
+            self._notify()
+            self.export_snapshot()
             return True
         except Exception as e:
             print(f"❌ Error saving to database: {e}")
             return False
 
+    def remove(self, notification_ids, snapshot=True):
+        """
+        Deletes the given notifications (e.g. ones closed or resolved at their source) in one commit.
+        Returns how many of them were stored, or None if the write failed.
+        """
+        try:
+            removed = self.backend.delete_many(notification_ids)
+            if removed:
+                self._notify()
+                if snapshot:
+                    self.export_snapshot()
+            return removed
+        except Exception as e:
+            print(f"❌ Error deleting from database: {e}")
+            return None
+
     def load_all(self):
         """
-        Reads the list of notifications from the file.
+        Reads every notification, highest priority score first (compatibility shim).
         """
-        if not os.path.exists(self.filepath):
+        try:
+            return self.backend.query()
+        except Exception as e:
+            print(f"❌ Error loading database: {e}")
             return []
-            
+
+    def get(self, notification_id):
+        return self.backend.get(notification_id)
+
+    def query(self, **filters):
+        """
+        Paginated/range read, e.g. query(priority="urgent", limit=20, offset=40)
+        or query(source="jira", since="2026-01-01T00:00:00") ('since'/'until' may also be epoch seconds).
+        """
+        return self.backend.query(**filters)
+
+    def count(self, **filters):
+        return self.backend.count(**filters)
+
+    def recent(self, hours=24, **filters):
+        """Notifications from the last 'hours' hours, e.g. recent(6, source="slack", limit=20)."""
+        now = time.time()
+        return self.backend.query(since=now - hours * HOUR, until=now, **filters)
+
+    def buckets(self, granularity="hour", hours=None, **filters):
+        """
+        Notification counts per hour or day, [(bucket start epoch, count)] oldest first,
+        optionally only for the last 'hours' hours (counted in whole hours).
+        """
+        if hours is not None:
+            now = time.time()
+            filters["since"], filters["until"] = (int(now // HOUR) - hours + 1) * HOUR, now
+        return self.backend.buckets(granularity, **filters)
+
+    def iter_all(self, batch_size=1000, **filters):
+        """Streams notifications in batches instead of loading the whole store."""
+        return self.backend.iter_all(batch_size=batch_size, **filters)
+
+    def version(self):
+        """(epoch, seq) of the current data; see StorageBackend.version()."""
+        return self.backend.version()
+
+    def changes(self, since_seq):
+        """Notifications written after 'since_seq', for delta readers such as the dashboard API."""
+        return self.backend.changes(since_seq)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _notify(self):
+        for callback in self.listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"❌ Error in write listener: {e}")
+
+    def export_snapshot(self):
+        """
+        Writes the JSON file a dashboard served without the API reads (only with export_snapshots,
+        and only if the store changed since the last export).
+        Streams from the store into a temp file and renames it, so the frontend never sees a partial file.
+        """
+        if not self.export_snapshots:
+            return
+        if isinstance(self.backend, JsonFileBackend) and self.backend.path == self.filepath:
+            return  # The store *is* the snapshot
+        version = self.backend.version()
+        if version == self._exported_version and os.path.exists(self.filepath):
+            return
+        if isinstance(self.backend, SQLiteBackend):
+            atomic_write_json(self.filepath, self.backend.iter_json(), preserialized=True)
+        else:
+            atomic_write_json(self.filepath, self.backend.iter_all())
+        self._exported_version = version
+
+    def _read_snapshot(self):
         try:
             with open(self.filepath, 'r') as f:
                 return json.load(f)
         except Exception as e:
             print(f"❌ Error loading database: {e}")
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,274 @@
+"""
+Multi-tenant mode: one aggregator process serving many users (python -m backend.run_aggregator --tenants).
+
+Every tenant gets its own NotificationAggregator, with its own credentials, store, sync cursors and
+duplicate index, all kept in its directory under TENANTS_DIR. The costly parts are shared:
+- fetch workers: one FairExecutor pool instead of a thread per source per user;
+- HTTP pools: one keep-alive transport, with rate-limit buckets kept per account;
+- the score cache;
+- one keyword matcher compiled over every tenant's keywords (recompiled when the scoring config is reloaded).
+"""
+import json
+import logging
+import os
+import threading
+from collections import ChainMap, Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from backend.config import (
+    HTTP_POOL_MAXSIZE,
+    TENANTS_DIR,
+    TENANT_FETCH_WORKERS,
+    TENANT_MAX_PASSES
+)
+from backend.integrations import CREDENTIAL_VARS
+from backend.processing.keyword_matcher import KeywordMatcher
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.scoring_config import load_scoring_config
+
+
+# Sources whose clients use the shared HttpTransport
+REST_SOURCES = {"github", "jira", "discord"}
+
+
+class Tenant:
+    """
+    One user: a directory holding their credentials, settings and data.
+
+    'env' is the tenant's .env on top of the process environment minus every credential
+    variable, so shared settings (API URLs, DEMO_MODE) carry over but one user's tokens never do.
+    tenant.json may set vip_senders, urgent_keywords and critical_terms (default: the scoring config's).
+    """
+
+    SETTINGS = ("vip_senders", "urgent_keywords", "critical_terms")
+
+    def __init__(self, id, directory, env=None, settings=None):
+        self.id = id
+        self.directory = directory
+        shared = {k: v for k, v in os.environ.items() if k not in CREDENTIAL_VARS}
+        self.env = ChainMap(dict(env or {}), shared)
+        settings = settings or {}
+        unknown = set(settings) - set(self.SETTINGS)
+        if unknown:
+            raise ValueError(f"Tenant {id}: unknown settings {', '.join(sorted(unknown))}")
+        self.vip_senders = settings.get("vip_senders")
+        self.urgent_keywords = settings.get("urgent_keywords")
+        self.critical_terms = settings.get("critical_terms")
+
+    @classmethod
+    def from_directory(cls, directory):
+        env = {}
+        if os.path.exists(os.path.join(directory, ".env")):
+            from dotenv import dotenv_values
+            env = {k: v for k, v in dotenv_values(os.path.join(directory, ".env")).items() if v is not None}
+        settings = {}
+        if os.path.exists(os.path.join(directory, "tenant.json")):
+            with open(os.path.join(directory, "tenant.json"), "r") as f:
+                settings = json.load(f)
+        return cls(os.path.basename(os.path.normpath(directory)), directory, env, settings)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def scoring_config(self, config):
+        """The shared ScoringConfig with this tenant's own lists in place."""
+        return config.with_overrides(urgent_keywords=self.urgent_keywords, critical_terms=self.critical_terms,
+                                     vip_senders=self.vip_senders)
+
+    def priority_engine(self, cache=None, matcher=None, config=None):
+        config = load_scoring_config() if config is None else config
+        return PriorityEngine(cache=cache, matcher=matcher, config=self.scoring_config(config))
+
+    def keywords(self, config=None):
+        """Every keyword this tenant scores on under 'config', lowercased (what its matcher has to find)."""
+        config = self.scoring_config(load_scoring_config() if config is None else config)
+        return {k for k in config.urgent_keywords | config.critical_terms if k}
+
+
+def load_tenants(directory=TENANTS_DIR, names=None):
+    """The tenants with a directory under 'directory' (only 'names', if given), sorted by ID."""
+    found = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))) \
+        if os.path.isdir(directory) else []
+    if names is not None:
+        unknown = [name for name in names if name not in found]
+        if unknown:
+            raise ValueError(f"Unknown tenants: {', '.join(unknown)} (found in {directory}: {', '.join(found) or 'none'})")
+        found = [name for name in found if name in names]
+    return [Tenant.from_directory(os.path.join(directory, name)) for name in found]
+
+
+class FairExecutor:
+    """
+    A fixed pool of worker threads shared by many tenants.
+
+    Each tenant queues its jobs in its own lane. A free worker serves the lane with the fewest
+    jobs running, taking turns between equals, so a tenant with many sources or slow fetches
+    cannot crowd out the rest: with N busy tenants each gets about 1/N of the workers.
+    lane(key) is a ThreadPoolExecutor-like view for code that submits work, e.g. ConcurrentIngestion.
+    """
+
+    def __init__(self, max_workers=TENANT_FETCH_WORKERS, thread_name_prefix="fair"):
+        self.lanes = OrderedDict()  # key -> queued (future, fn, args, kwargs), in turn order
+        self.running = Counter()
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._work, name=f"{thread_name_prefix}_{i}", daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, fn, *args, **kwargs):
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self.lanes.setdefault(key, deque()).append((future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def lane(self, key):
+        return _Lane(self, key)
+
+    def shutdown(self, wait=True):
+        """Stops taking jobs; the workers finish what is queued, then exit."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _take(self):
+        """Next job (lock held): from the least busy lane, which then goes to the back of the turn order."""
+        key = min(self.lanes, key=self.running.__getitem__)
+        jobs = self.lanes[key]
+        job = jobs.popleft()
+        if jobs:
+            self.lanes.move_to_end(key)
+        else:
+            del self.lanes[key]
+        self.running[key] += 1
+        return key, job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self.lanes and not self._shutdown:
+                    self._cond.wait()
+                if not self.lanes:
+                    return
+                key, (future, fn, args, kwargs) = self._take()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            with self._cond:
+                self.running[key] -= 1
+                if not self.running[key]:
+                    del self.running[key]
+
+
+class _Lane:
+    """One tenant's handle on a FairExecutor."""
+
+    def __init__(self, executor, key):
+        self.executor = executor
+        self.key = key
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit(self.key, fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        # The pool is shared; it is shut down by its owner, not by a tenant
+        pass
+
+
+class MultiTenantAggregator:
+    """
+    Runs the pipeline for many tenants in one process.
+
+    Acts as a NotificationAggregator for AggregatorDaemon: its fetchers are named 'tenant/source',
+    and run() takes such names, or runs every tenant. Tenants' passes run side by side (up to
+    TENANT_MAX_PASSES); a failing tenant is logged and does not stop the others.
+    """
+
+    def __init__(self, tenants, sources=None, workload=None, workers=TENANT_FETCH_WORKERS, max_passes=TENANT_MAX_PASSES):
+        from backend.run_aggregator import NotificationAggregator
+
+        if not tenants:
+            raise ValueError(f"No tenants found (one directory per tenant under {TENANTS_DIR})")
+        self.executor = FairExecutor(workers, thread_name_prefix="ingest")
+        self.max_passes = max_passes
+        self.tenants = tenants
+        scoring = load_scoring_config()
+        matcher = self._matcher(scoring)
+        self.aggregators = {
+            tenant.id: NotificationAggregator(sources, workload, tenant=tenant, executor=self.executor.lane(tenant.id),
+                                              matcher=matcher, scoring=scoring)
+            for tenant in tenants
+        }
+        first = next(iter(self.aggregators.values()))
+        self.demo_mode = first.demo_mode
+        self.fetchers = {f"{tenant_id}/{name}": fetch for tenant_id, aggregator in self.aggregators.items()
+                         for name, fetch in aggregator.fetchers.items()}
+        if not self.demo_mode and any(name.rpartition("/")[2] in REST_SOURCES for name in self.fetchers):
+            # Every worker may be talking to the same host; keep a pooled connection for each
+            from backend.integrations.http_transport import get_shared_transport
+            get_shared_transport(pool_maxsize=max(HTTP_POOL_MAXSIZE, workers))
+        logging.info(f"👥 Serving {len(self.aggregators)} tenants ({len(self.fetchers)} sources) "
+                     f"on {workers} shared fetch workers")
+
+    def run(self, sources=None):
+        """One pass per tenant, or for the 'tenant/source' names in 'sources'."""
+        if sources is None:
+            passes = {tenant_id: None for tenant_id in self.aggregators}
+        else:
+            passes = {}
+            for name in sources:
+                tenant_id, _, source = name.partition("/")
+                passes.setdefault(tenant_id, []).append(source)
+        if len(passes) == 1:
+            self._run_tenant(*next(iter(passes.items())))
+            return
+        with ThreadPoolExecutor(max_workers=min(len(passes), self.max_passes), thread_name_prefix="tenant") as pool:
+            list(pool.map(self._run_tenant, passes, passes.values()))
+
+    def _matcher(self, config):
+        """One trie over every tenant's keywords; each engine keeps only its own hits."""
+        return KeywordMatcher(set().union(*(tenant.keywords(config) for tenant in self.tenants)))
+
+    def reload_scoring(self, config):
+        """Switches every tenant to 'config' (with their own lists); the shared matcher is compiled first."""
+        matcher = self._matcher(config)
+        for aggregator in self.aggregators.values():
+            aggregator.reload_scoring(config, matcher)
+
+    def rescore_stored(self):
+        for tenant_id, aggregator in self.aggregators.items():
+            try:
+                aggregator.rescore_stored()
+            except Exception as e:
+                logging.error(f"[{tenant_id}] Re-scoring failed: {e}")
+
+    def refresh_recency(self):
+        for tenant_id, aggregator in self.aggregators.items():
+            try:
+                aggregator.refresh_recency()
+            except Exception as e:
+                logging.error(f"[{tenant_id}] Recency refresh failed: {e}")
+
+    def _run_tenant(self, tenant_id, sources):
+        try:
+            self.aggregators[tenant_id].run(sources=sources)
+        except Exception as e:
+            logging.error(f"[{tenant_id}] Pipeline pass failed: {e}")
+
+    def close(self):
+        """Closes every tenant's store and indexes, then the shared workers and HTTP pools."""
+        transports = {id(a.transport.shared): a.transport.shared for a in self.aggregators.values() if a.transport}
+        for aggregator in self.aggregators.values():
+            aggregator.close()
+        self.executor.shutdown(wait=True)
+        for transport in transports.values():
+            transport.close()
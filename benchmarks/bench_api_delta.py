@@ -0,0 +1,144 @@
+"""
+Dashboard polling benchmark: full notifications.json vs the delta/ETag API.
+
+Fills a temporary store with scored notifications, starts the local server and simulates
+a dashboard polling it while a few items change between some of the polls. Per poll:
+  snapshot : GET /notifications.json, the whole file every time (what main.js used to do)
+  api      : the four panel views (urgent, high, calendar, top-200 stream) polled with
+             ?since=<cursor> and If-None-Match, gzip accepted
+Reports bytes on the wire and latency for idle polls (nothing changed) and for polls after
+a small write, and checks that the delta-synced views match a fresh full read.
+
+Usage: python -m benchmarks.bench_api_delta [--items 5000] [--polls 20] [--changes 5]
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import requests
+
+from backend.processing.priority_engine import PriorityEngine
+from backend.server.api import NotificationApi
+from backend.server.app import HttpServer, static_files
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+from benchmarks.bench_scoring import make_batch
+
+VIEWS = ["/api/urgent", "/api/high", "/api/calendar", "/api/notifications?limit=200"]
+
+
+class ViewClient:
+    """Does what main.js does for one panel: keeps items by id, its cursor and the last ETag."""
+
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+        self.items = {}
+        self.cursor = None
+        self.etag = None
+
+    def poll(self):
+        """Returns the number of body bytes on the wire."""
+        separator = "&" if "?" in self.url else "?"
+        url = self.url + (f"{separator}since={self.cursor}" if self.cursor else "")
+        headers = {"Accept-Encoding": "gzip"}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        response = self.session.get(url, headers=headers, stream=True)
+        wire = response.raw.read(decode_content=False)
+        if response.status_code == 304:
+            return len(wire)
+        response.raise_for_status()
+
+        data = gzip.decompress(wire) if response.headers.get("Content-Encoding") == "gzip" else wire
+        payload = json.loads(data)
+        if payload["full"]:
+            self.items.clear()
+        for notification_id in payload["removed"]:
+            self.items.pop(notification_id, None)
+        for item in payload["items"]:
+            self.items[item["id"]] = item
+        self.cursor = payload["cursor"]
+        self.etag = response.headers.get("ETag")
+        return len(wire)
+
+
+def touch(repo, rng, count):
+    """Rewrites 'count' random notifications with a new priority, as a sync pass would."""
+    items = repo.query(limit=count, offset=rng.randrange(max(1, repo.count() - count)))
+    for item in items:
+        item["priority"] = rng.choice(["normal", "high", "urgent"])
+        item["priority_score"] = rng.randrange(0, 60)
+    repo.upsert_all(items, snapshot=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=5, help="Items rewritten before every other poll")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(7)
+    engine = PriorityEngine()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "notifications.json")
+        repo = NotificationRepository(snapshot_path, backend=SQLiteBackend(os.path.join(tmp, "notifications.db")),
+                                      export_snapshots=True)
+        batch = make_batch(args.items, seed=1)
+        for item in batch[:args.items // 20]:
+            item.update(source="calendar", type="event")
+        repo.upsert_all(engine.process(batch))
+
+        api = NotificationApi(repo)
+        server = HttpServer({**api.routes(), ("GET", "/notifications.json"): static_files(tmp, "")}).start()
+        session = requests.Session()
+        clients = [ViewClient(session, server.url + path) for path in VIEWS]
+
+        results = {("snapshot", "idle"): [], ("snapshot", "changed"): [], ("api", "idle"): [], ("api", "changed"): []}
+        try:
+            for client in clients:
+                client.poll()  # Initial full load, same for both approaches in spirit
+
+            for poll in range(args.polls):
+                state = "changed" if poll % 2 else "idle"
+                if state == "changed":
+                    touch(repo, rng, args.changes)
+
+                start = time.perf_counter()
+                response = session.get(server.url + "/notifications.json", headers={"Accept-Encoding": "gzip"})
+                results[("snapshot", state)].append((len(response.content), time.perf_counter() - start))
+
+                start = time.perf_counter()
+                wire = sum(client.poll() for client in clients)
+                results[("api", state)].append((wire, time.perf_counter() - start))
+
+            # The delta-synced views must equal what a fresh full read returns
+            for client, path in zip(clients, VIEWS):
+                fresh = ViewClient(session, server.url + path)
+                fresh.poll()
+                assert client.items == fresh.items, f"{path} drifted from the store"
+        finally:
+            server.stop()
+            repo.backend.close()
+
+    print(f"{args.items} notifications, {args.polls} polls ({args.changes} items rewritten before every other poll)")
+    for (mode, state), samples in results.items():
+        if not samples:
+            continue
+        sizes = [size for size, _ in samples]
+        latency = statistics.median(elapsed for _, elapsed in samples) * 1000
+        print(f"  {mode:<8} {state:<7}: {statistics.mean(sizes) / 1024:9.1f} KiB per poll, p50 {latency:6.2f}ms")
+    print(f"  API responses: {dict(api.counts)}; delta-synced views match a full read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Backfill scaling benchmark.
+
+Fills a temporary SQLite store with synthetic history, then re-scores it with
+rescore_history() at increasing worker counts and reports throughput and
+scaling efficiency relative to a single worker.
+
+Usage: python -m benchmarks.bench_backfill [--count 200000] [--workers 1,2,4,8]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from backend.processing.backfill import rescore_history
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+from benchmarks.bench_scoring import make_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        repo = NotificationRepository(os.path.join(tmp, "bench.json"), backend=SQLiteBackend(db_path))
+        repo.upsert_all(make_batch(args.count, seed=11), snapshot=False)
+
+        baseline = None
+        print(f"Re-scoring {args.count:,} notifications ({os.cpu_count()} CPUs available)")
+        for workers in (int(w) for w in args.workers.split(",")):
+            start = time.perf_counter()
+            rescore_history(repo, workers=workers, chunk_size=args.chunk_size, progress=lambda *a: None)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            print(f"  {workers} worker(s): {elapsed:6.2f}s  {args.count / elapsed:>10,.0f} items/s  "
+                  f"speed-up {speedup:.2f}x  efficiency {speedup / workers:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Daemon vs one-shot cycle benchmark.
+
+Serves Slack, GitHub and Jira from local stubs and times a full live pipeline pass
+(fetch -> normalize -> score -> store) two ways:
+  one-shot : a fresh `python` process per pass (imports, client construction, pools, DB open)
+  daemon   : repeated passes on one resident NotificationAggregator, as --daemon does
+Storage goes to a temporary directory, so the project's own data files are untouched.
+Rate-limit pacing is lifted for the resident passes: back-to-back passes would otherwise
+exceed the real APIs' quotas and measure the scheduler instead of the pipeline.
+
+Usage: python -m benchmarks.bench_daemon [--passes 5] [--latency 0.05]
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_ingestion import SLACK_HISTORY, GITHUB_SEARCH, JIRA_SEARCH
+from benchmarks.stub_servers import StubServer, json_route
+
+ONE_SHOT = """
+import os, time
+started = time.perf_counter()
+from backend.run_aggregator import NotificationAggregator
+from backend.storage.cursor_store import SyncCursorStore
+from backend.storage.repository import NotificationRepository
+aggregator = NotificationAggregator()
+aggregator.repository = NotificationRepository(os.path.join(os.environ["BENCH_DIR"], "notifications.json"))
+aggregator.cursors = SyncCursorStore(os.path.join(os.environ["BENCH_DIR"], "cursors.json"))
+aggregator.run()
+print(time.perf_counter() - started)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per request (s)")
+    args = parser.parse_args()
+
+    servers = [
+        StubServer({"/conversations.history": json_route(SLACK_HISTORY)}, latency=args.latency).start(),
+        StubServer({"/search/issues": json_route(GITHUB_SEARCH)}, latency=args.latency).start(),
+        StubServer({"/search": json_route(JIRA_SEARCH)}, latency=args.latency).start(),
+    ]
+    slack, github, jira = servers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "DEMO_MODE": "false", "BENCH_DIR": tmp,
+            "SLACK_BOT_TOKEN": "xoxb-bench", "SLACK_CHANNEL_ID": "C123", "SLACK_API_URL": slack.url + "/",
+            "GITHUB_TOKEN": "ghp-bench", "GITHUB_API_URL": github.url,
+            "JIRA_DOMAIN": "bench", "JIRA_EMAIL": "bench@example.com", "JIRA_API_TOKEN": "bench", "JIRA_API_URL": jira.url,
+        })
+        sources = ["slack", "github", "jira"]
+
+        try:
+            one_shot, in_process = [], []
+            for _ in range(args.passes):
+                start = time.perf_counter()
+                result = subprocess.run([sys.executable, "-c", ONE_SHOT], capture_output=True, text=True, check=True)
+                one_shot.append(time.perf_counter() - start)
+                in_process.append(float(result.stdout.strip().splitlines()[-1]))
+
+            # Imported after the environment is in place so the clients pick up the stub URLs
+            from backend.integrations.rate_limiter import get_shared_scheduler
+            from backend.run_aggregator import NotificationAggregator
+            from backend.storage.cursor_store import SyncCursorStore
+            from backend.storage.repository import NotificationRepository
+
+            logging.getLogger().setLevel(logging.WARNING)
+            get_shared_scheduler().limits = {}
+            get_shared_scheduler().default_limit = (1000, 1000)
+            aggregator = NotificationAggregator()
+            aggregator.repository = NotificationRepository(os.path.join(tmp, "daemon.json"))
+            aggregator.cursors = SyncCursorStore(os.path.join(tmp, "daemon_cursors.json"))
+
+            resident = []
+            for _ in range(args.passes + 1):
+                start = time.perf_counter()
+                aggregator.run(sources=sources)
+                resident.append(time.perf_counter() - start)
+            aggregator.close()
+        finally:
+            for server in servers:
+                server.stop()
+
+    first, warm = resident[0], resident[1:]
+    print(f"Pipeline pass over {', '.join(sources)} ({args.latency * 1000:.0f}ms per request), {args.passes} passes:")
+    print(f"  one-shot process : {sum(one_shot) / len(one_shot):.3f}s per pass "
+          f"({sum(in_process) / len(in_process):.3f}s after interpreter start)")
+    print(f"  daemon, 1st pass : {first:.3f}s")
+    print(f"  daemon, warm     : {sum(warm) / len(warm):.3f}s per pass")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Deduplication stage benchmark.
+
+Builds a synthetic stream where each incident is reported several times, by different
+sources and with small wording changes (a changed word, an appended counter), mixed with
+one-off notifications. Runs it through score -> store with and without the dedup stage and
+reports items scored, time, database size and JSON snapshot size. Then measures how well
+the index groups the stream: merges of unrelated incidents (false merges) and duplicates
+left unmerged, with the in-memory index bounded to --max-entries so clusters spill to disk.
+
+Usage: python -m benchmarks.bench_dedup [--incidents 5000] [--repeats 4] [--max-entries 2000]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from backend.processing.dedup import DedupIndex, Deduplicator
+from backend.processing.priority_engine import PriorityEngine
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+SOURCES = ["slack", "jira", "github", "gmail", "discord"]
+
+
+def make_stream(incidents, repeats, seed):
+    """Returns notifications tagged with the 'incident' they belong to, in arrival order."""
+    rng = random.Random(seed)
+    vocabulary = [f"{rng.choice('bcdfgklmnprstvz')}{rng.choice('aeiou')}{rng.choice('lmnrst')}{i}"
+                  for i in range(3000)]
+    stream = []
+    for incident in range(incidents):
+        title = rng.sample(vocabulary, rng.randint(4, 6))
+        content = rng.sample(vocabulary, rng.randint(10, 16))
+        copies = repeats if incident % 2 == 0 else 1  # Half the incidents are one-offs
+        for copy in range(copies):
+            words = list(content)
+            if copy % 3 == 1:
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)  # Reworded
+            elif copy % 3 == 2:
+                words.append(str(rng.randint(2, 99)))  # "(seen 3 times)"-style counter
+            # Repeats follow their first report within a few hundred notifications
+            arrival = incident + (rng.expovariate(1 / 100) if copy else 0)
+            stream.append({
+                "arrival": arrival, "id": f"{incident}-{copy}", "incident": incident,
+                "source": SOURCES[(incident + copy) % len(SOURCES)], "type": "message",
+                "title": " ".join(title).capitalize(), "content": " ".join(words) + ".",
+                "sender": {"name": "Bench", "email": ""}, "tags": [],
+                "timestamp": f"2026-01-{1 + copy % 28:02d}T10:00:00", "priority": "normal",
+            })
+    stream.sort(key=lambda n: n.pop("arrival"))
+    return stream
+
+
+def run_pipeline(stream, dedup, tmp, name):
+    engine = PriorityEngine()
+    snapshot = os.path.join(tmp, f"{name}.json")
+    # The snapshot size is part of what dedup saves, so export it
+    repo = NotificationRepository(snapshot, backend=SQLiteBackend(os.path.join(tmp, f"{name}.db")),
+                                  export_snapshots=True)
+    items = (dict(n) for n in stream)
+    start = time.perf_counter()
+    if dedup is not None:
+        items = dedup.stage(items)
+    scored = 0
+
+    def count(notifications):
+        nonlocal scored
+        for notification in notifications:
+            scored += 1
+            yield notification
+
+    repo.upsert_stream(engine.iter_process(count(items)), chunk_size=500)
+    elapsed = time.perf_counter() - start
+    rows = repo.count()
+    repo.backend.close()
+    return {"scored": scored, "rows": rows, "seconds": elapsed,
+            "db": os.path.getsize(os.path.join(tmp, f"{name}.db")), "snapshot": os.path.getsize(snapshot)}
+
+
+def grouping_quality(stream, index):
+    clusters_of = defaultdict(set)   # incident -> clusters its copies landed in
+    incidents_of = defaultdict(set)  # cluster -> incidents it absorbed
+    start = time.perf_counter()
+    for notification in stream:
+        cluster, _ = index.add(notification)
+        clusters_of[notification["incident"]].add(cluster.id)
+        incidents_of[cluster.id].add(notification["incident"])
+    elapsed = time.perf_counter() - start
+    false_merges = sum(len(incidents) - 1 for incidents in incidents_of.values())
+    missed = sum(len(clusters) - 1 for clusters in clusters_of.values())
+    return false_merges, missed, len(stream) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidents", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=4, help="Reports per repeated incident")
+    parser.add_argument("--max-entries", type=int, default=2000, help="In-memory clusters before spilling")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    stream = make_stream(args.incidents, args.repeats, seed=11)
+    duplicates = len(stream) - args.incidents
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = run_pipeline(stream, None, tmp, "plain")
+        deduped = run_pipeline(stream, Deduplicator(DedupIndex(os.path.join(tmp, "pipeline_index.db"))),
+                               tmp, "deduped")
+
+        index = DedupIndex(os.path.join(tmp, "quality_index.db"), max_entries=args.max_entries)
+        false_merges, missed, rate = grouping_quality(stream, index)
+        counts = dict(index.counts)
+        index.close()
+
+    print(f"{len(stream)} notifications: {args.incidents} incidents, {duplicates} of them repeats")
+    for label, result in (("no dedup", plain), ("dedup", deduped)):
+        print(f"  {label:<9}: {result['scored']:6d} scored, {result['rows']:6d} rows, {result['seconds']:6.2f}s, "
+              f"db {result['db'] / 1024:7.0f} KiB, snapshot {result['snapshot'] / 1024:7.0f} KiB")
+    print(f"  grouping : {false_merges} false merges, {missed} of {duplicates} repeats left unmerged "
+          f"({rate:,.0f} items/s, {args.max_entries} clusters in memory)")
+    print(f"  index    : {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Gmail message fetch benchmark.
+
+Serves a fake Gmail API from a local stub: its own discovery document (so the real
+googleapiclient is built against it), plus profile, messages.list, messages.get and
+the multipart batch endpoint. Compares the old one-get-per-message fetch
+(format='full') with GmailIntegration's batched metadata fetch, reporting HTTP
+requests, bytes received and wall-clock time.
+
+Usage: python -m benchmarks.bench_gmail_batch [--count 300] [--latency 0.02]
+"""
+import argparse
+import email.parser
+import json
+import os
+import time
+import uuid
+from urllib.parse import parse_qs, urlsplit
+
+import googleapiclient
+import httplib2
+from googleapiclient.discovery import build
+
+from backend.integrations.gmail_integration import GmailIntegration
+from benchmarks.stub_servers import StubServer
+
+API_PREFIX = "/gmail/v1/users/me"
+BODY_HTML = "<p>" + "Quarterly numbers attached, see the dashboard for details. " * 400 + "</p>"
+
+
+class FakeMailbox:
+    """In-memory mailbox answering the handful of Gmail calls the integration makes."""
+
+    def __init__(self, count):
+        self.ids = [f"{i:016x}" for i in range(10_000, 10_000 + count)]
+        # A realistic message carries dozens of headers; the fetch only needs two of them
+        self.headers = [{"name": f"X-Header-{n}", "value": "x" * 60} for n in range(30)]
+
+    def message(self, message_id, query):
+        headers = self.headers + [
+            {"name": "Subject", "value": f"Report {message_id}"},
+            {"name": "From", "value": "Finance <finance@company.com>"},
+        ]
+        message = {"id": message_id, "threadId": message_id, "labelIds": ["INBOX", "UNREAD"],
+                   "snippet": "Quarterly numbers attached", "historyId": "900"}
+        if query.get("format", ["full"])[0] == "metadata":
+            wanted = set(query.get("metadataHeaders", []))
+            message["payload"] = {"headers": [h for h in headers if h["name"] in wanted]}
+        else:
+            message["payload"] = {"headers": headers, "mimeType": "text/html",
+                                  "body": {"size": len(BODY_HTML), "data": BODY_HTML}}
+        return message
+
+    def answer(self, path, query):
+        if path == f"{API_PREFIX}/profile":
+            return {"emailAddress": "me@company.com", "historyId": "900"}
+        if path == f"{API_PREFIX}/messages":
+            start = int(query.get("pageToken", ["0"])[0])
+            size = int(query.get("maxResults", ["100"])[0])
+            page = {"messages": [{"id": i, "threadId": i} for i in self.ids[start:start + size]]}
+            if start + size < len(self.ids):
+                page["nextPageToken"] = str(start + size)
+            return page
+        return self.message(path.rsplit("/", 1)[-1], query)
+
+
+def make_routes(mailbox, discovery):
+    def api(handler, body):
+        parts = urlsplit(handler.path)
+        return 200, {}, mailbox.answer(parts.path, parse_qs(parts.query))
+
+    def batch(handler, body):
+        # Each part of the multipart/mixed request is a serialized HTTP request
+        envelope = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {handler.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        boundary = uuid.uuid4().hex
+        chunks = []
+        for part in envelope.get_payload():
+            request_line = part.get_payload().splitlines()[0]
+            target = urlsplit(request_line.split(" ")[1])
+            payload = json.dumps(mailbox.answer(target.path, parse_qs(target.query)))
+            content_id = part["Content-ID"].strip("<>")
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 200 OK\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{payload}\r\n"
+            )
+        data = ("".join(chunks) + f"--{boundary}--\r\n").encode()
+        return 200, {"Content-Type": f"multipart/mixed; boundary={boundary}"}, data
+
+    return {
+        "/discovery/v1/apis/gmail/v1/rest": lambda handler, body: (200, {}, discovery),
+        "/batch": batch,
+        f"{API_PREFIX}/*": api,
+    }
+
+
+def legacy_fetch(service, messages):
+    """The previous behaviour: one blocking messages.get(format='full') per message."""
+    emails = []
+    for msg in messages:
+        txt = service.users().messages().get(userId='me', id=msg['id'], format='full').execute()
+        headers = txt['payload']['headers']
+        emails.append({
+            "id": msg['id'],
+            "subject": next((h['value'] for h in headers if h['name'] == 'Subject'), "No Subject"),
+            "from": next((h['value'] for h in headers if h['name'] == 'From'), "Unknown"),
+            "snippet": txt.get('snippet', '')
+        })
+    return emails
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=300, help="Unread messages in the fake mailbox")
+    parser.add_argument("--latency", type=float, default=0.02, help="Injected latency per HTTP request (s)")
+    args = parser.parse_args()
+
+    discovery_path = os.path.join(os.path.dirname(googleapiclient.__file__), "discovery_cache", "documents", "gmail.v1.json")
+    with open(discovery_path) as f:
+        discovery = json.load(f)
+
+    mailbox = FakeMailbox(args.count)
+    with StubServer(make_routes(mailbox, discovery), latency=args.latency) as stub:
+        discovery["rootUrl"] = stub.url + "/"
+        service = build(
+            "gmail", "v1",
+            http=httplib2.Http(),
+            discoveryServiceUrl=stub.url + "/discovery/v1/apis/{api}/{apiVersion}/rest",
+            static_discovery=False,
+            cache_discovery=False,
+        )
+        client = GmailIntegration(service=service)
+        messages = [{"id": i} for i in mailbox.ids]
+
+        results = {}
+        for label, fetch in (("per-message full", lambda: legacy_fetch(service, messages)),
+                             ("batched metadata", lambda: client._fetch_details(messages))):
+            requests_before, bytes_before = stub.request_count, stub.bytes_sent
+            start = time.perf_counter()
+            results[label] = fetch()
+            elapsed = time.perf_counter() - start
+            requests = stub.request_count - requests_before
+            received = stub.bytes_sent - bytes_before
+            print(f"  {label:<17} {requests:>5} requests  {received / 1024:>9,.0f} KiB  {elapsed:6.2f}s")
+
+        assert results["per-message full"] == results["batched metadata"], "fetch results differ"
+
+        start = time.perf_counter()
+        emails = [e for page in client.iter_pages(page_size=100, max_items=args.count) for e in page]
+        print(f"  iter_pages end-to-end: {len(emails)} emails in {time.perf_counter() - start:.2f}s "
+              f"(cursor {client.sync_cursor})")
+
+
+if __name__ == "__main__":
+    main()
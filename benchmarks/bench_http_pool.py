@@ -0,0 +1,55 @@
+"""
+Connection reuse benchmark.
+
+Issues the same series of requests against a local stub API twice: once with a bare
+requests.get() per call (new connection each time) and once through the shared
+HttpTransport. Prints wall-clock time and the transport's connection-reuse counters.
+
+Usage: python -m benchmarks.bench_http_pool [--requests 200] [--runs 3]
+"""
+import argparse
+import time
+
+import requests
+
+from backend.integrations.http_transport import HttpTransport
+from benchmarks.stub_servers import StubServer, json_route
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per simulated pipeline run")
+    parser.add_argument("--runs", type=int, default=3, help="Pipeline runs sharing one transport")
+    args = parser.parse_args()
+
+    payload = {"items": [{"id": i, "title": f"Issue {i}"} for i in range(50)]}
+    total = args.requests * args.runs
+
+    with StubServer({"/search/issues": json_route(payload)}) as server:
+        url = f"{server.url}/search/issues"
+
+        start = time.perf_counter()
+        for _ in range(total):
+            requests.get(url, headers={"Connection": "close"}).json()
+        unpooled = time.perf_counter() - start
+
+        transport = HttpTransport()
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            for _ in range(args.requests):
+                transport.get(url).json()
+        pooled = time.perf_counter() - start
+        stats = transport.stats()
+        transport.close()
+
+    print(f"{total} requests over {args.runs} runs")
+    print(f"New connection per request : {unpooled:.2f}s")
+    print(f"Shared keep-alive transport: {pooled:.2f}s")
+    print(f"Connections opened: {stats['connections_opened']}, "
+          f"reused: {stats['requests'] - stats['connections_opened']}")
+    for host, counters in stats["hosts"].items():
+        print(f"  {host}: {counters}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Concurrent ingestion benchmark.
+
+Starts one local stub server per live source (Slack, GitHub, Jira), each with its own
+injected latency, and compares a sequential pass over the fetchers with
+NotificationAggregator._ingest_live(). Wall-clock time of the concurrent pass should
+track the slowest source rather than the sum of all of them.
+
+Usage: python -m benchmarks.bench_ingestion [--slack 0.4] [--github 0.8] [--jira 1.2]
+"""
+import argparse
+import logging
+import os
+import time
+
+from benchmarks.stub_servers import StubServer, json_route
+
+SLACK_HISTORY = {
+    "ok": True,
+    "messages": [{"type": "message", "user": "U123", "text": f"Message {i}", "ts": f"17000000{i:02d}.000100"} for i in range(10)],
+}
+
+GITHUB_SEARCH = {
+    "items": [{
+        "id": 1000 + i,
+        "number": i,
+        "title": f"Fix flaky test #{i}",
+        "repository_url": "https://api.github.com/repos/acme/clarity-hub",
+        "user": {"login": "octocat"},
+        "created_at": "2026-01-20T10:00:00Z",
+        "html_url": f"https://github.com/acme/clarity-hub/pull/{i}",
+    } for i in range(10)],
+}
+
+JIRA_SEARCH = {
+    "issues": [{
+        "id": str(2000 + i),
+        "key": f"OPS-{i}",
+        "fields": {
+            "summary": f"Rotate credentials {i}",
+            "priority": {"name": "Medium"},
+            "status": {"name": "In Progress"},
+            "created": "2026-01-20T10:00:00.000+0000",
+        },
+    } for i in range(10)],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slack", type=float, default=0.4, help="Injected Slack latency (s)")
+    parser.add_argument("--github", type=float, default=0.8, help="Injected GitHub latency per request (s)")
+    parser.add_argument("--jira", type=float, default=1.2, help="Injected Jira latency (s)")
+    args = parser.parse_args()
+
+    slack = StubServer({"/conversations.history": json_route(SLACK_HISTORY)}, latency=args.slack).start()
+    github = StubServer({"/search/issues": json_route(GITHUB_SEARCH)}, latency=args.github).start()
+    jira = StubServer({"/search": json_route(JIRA_SEARCH)}, latency=args.jira).start()
+
+    os.environ.update({
+        "SLACK_BOT_TOKEN": "xoxb-bench", "SLACK_CHANNEL_ID": "C123", "SLACK_API_URL": slack.url + "/",
+        "GITHUB_TOKEN": "ghp-bench", "GITHUB_API_URL": github.url,
+        "JIRA_DOMAIN": "bench", "JIRA_EMAIL": "bench@example.com", "JIRA_API_TOKEN": "bench", "JIRA_API_URL": jira.url,
+    })
+
+    # Imported after the environment is in place so the clients pick up the stub URLs
+    from backend.run_aggregator import NotificationAggregator
+
+    logging.getLogger().setLevel(logging.WARNING)
+    aggregator = NotificationAggregator()
+
+    try:
+        start = time.perf_counter()
+        sequential_items = sum(len(page) for fetch in aggregator.fetchers.values() for page in fetch())
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent_items = sum(1 for _ in aggregator._ingest_live())
+        concurrent = time.perf_counter() - start
+    finally:
+        for server in (slack, github, jira):
+            server.stop()
+
+    # GitHub runs two searches per fetch, so its round-trip counts twice
+    per_source = {"slack": args.slack, "github": 2 * args.github, "jira": args.jira}
+    print(f"Injected latency per source: {per_source}")
+    print(f"  sum of sources : {sum(per_source.values()):.2f}s")
+    print(f"  slowest source : {max(per_source.values()):.2f}s")
+    print(f"Sequential : {sequential:.2f}s ({sequential_items} items)")
+    print(f"Concurrent : {concurrent:.2f}s ({concurrent_items} items)")
+    print(f"Speed-up   : {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
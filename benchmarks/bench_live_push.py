@@ -0,0 +1,189 @@
+"""
+Live push benchmark: Server-Sent Events vs polling the delta API.
+
+Starts the local server (API + change feed) on a temporary store and measures how long a
+freshly written notification takes to reach a dashboard:
+  sse, in-process : write through the server's repository (webhooks, --daemon pipeline)
+  sse, external   : write from another connection, picked up by the feed's periodic check
+                    (every 0.25s here, CHANGE_FEED_INTERVAL in config)
+  poll            : the delta API polled every --poll-interval seconds, plus how many of
+                    those polls came back empty
+A last run connects a client that never reads and floods the feed, to check that writers are
+not slowed down by it and that it is told to resync once its queue is full.
+
+Usage: python -m benchmarks.bench_live_push [--clients 5] [--writes 30] [--poll-interval 1.0]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import requests
+
+from backend.server.api import NotificationApi
+from backend.server.app import HttpServer
+from backend.server.events import ChangeFeed
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+
+class SseClient:
+    """Reads one event stream on a background thread and records when each item id arrives."""
+
+    def __init__(self, url, receive_buffer=None):
+        host, port = url.split("//")[1].split(":")
+        self.sock = socket.create_connection((host, int(port)))
+        if receive_buffer:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        self.sock.sendall(f"GET /api/events HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        self.arrivals = {}
+        self.events = []
+        self.ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._read, daemon=True).start()
+        return self
+
+    def _read(self):
+        stream = self.sock.makefile("rb")
+        name = None
+        for line in stream:
+            line = line.decode().rstrip("\r\n")
+            if line.startswith(": connected"):
+                self.ready.set()
+            elif line.startswith("event: "):
+                name = line[7:]
+                self.events.append(name)
+            elif line.startswith("data: ") and name == "notifications":
+                now = time.perf_counter()
+                for item in json.loads(line[6:])["items"]:
+                    self.arrivals.setdefault(item["id"], now)
+
+    def close(self):
+        self.sock.close()
+
+
+def note(notification_id, padding=0):
+    return {"id": notification_id, "source": "slack", "priority": "urgent", "priority_score": 50,
+            "title": "Prod down", "content": "x" * padding, "timestamp": "2026-01-20T10:00:00"}
+
+
+def wait_for(clients, notification_id, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if all(notification_id in client.arrivals for client in clients):
+            return
+        time.sleep(0.0005)
+    raise TimeoutError(f"{notification_id} never arrived")
+
+
+def sse_latencies(repo, clients, writes, prefix):
+    latencies = []
+    for i in range(writes):
+        notification_id = f"{prefix}-{i}"
+        written = time.perf_counter()
+        repo.upsert_all([note(notification_id)], snapshot=False)
+        wait_for(clients, notification_id)
+        latencies.extend((client.arrivals[notification_id] - written) * 1000 for client in clients)
+    return latencies
+
+
+def poll_latencies(repo, url, writes, interval):
+    """A dashboard polling the delta API on its own clock while writes land at arbitrary moments."""
+    session = requests.Session()
+    state = {"cursor": session.get(url).json()["cursor"], "polls": 0, "empty": 0}
+    arrivals, stop = {}, threading.Event()
+
+    def poll():
+        while not stop.wait(interval):
+            payload = session.get(url, params={"since": state["cursor"]}).json()
+            state["cursor"] = payload["cursor"]
+            state["polls"] += 1
+            state["empty"] += not payload["items"]
+            for item in payload["items"]:
+                arrivals.setdefault(item["id"], time.perf_counter())
+
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+    rng = random.Random(3)
+    written = {}
+    for i in range(writes):
+        time.sleep(rng.uniform(0, 2 * interval))
+        written[f"poll-{i}"] = time.perf_counter()
+        repo.upsert_all([note(f"poll-{i}")], snapshot=False)
+    while len(arrivals) < writes:
+        time.sleep(interval / 10)
+    stop.set()
+    poller.join()
+    latencies = [(arrivals[key] - at) * 1000 for key, at in written.items()]
+    return latencies, state["empty"], state["polls"]
+
+
+def summary(label, values):
+    values = sorted(values)
+    p95 = values[max(0, int(len(values) * 0.95) - 1)]
+    print(f"  {label:<16} p50 {statistics.median(values):8.2f}ms  p95 {p95:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5)
+    parser.add_argument("--writes", type=int, default=30)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "notifications.db")
+        repo = NotificationRepository(os.path.join(tmp, "notifications.json"), backend=SQLiteBackend(db_path))
+        external = NotificationRepository(os.path.join(tmp, "external.json"), backend=SQLiteBackend(db_path))
+        feed = ChangeFeed(repo, interval=0.25, queue_size=8).start()
+        server = HttpServer({**NotificationApi(repo).routes(), **feed.routes()}).start()
+
+        try:
+            clients = [SseClient(server.url).start() for _ in range(args.clients)]
+            for client in clients:
+                client.ready.wait(5)
+
+            in_process = sse_latencies(repo, clients, args.writes, "push")
+            cross_process = sse_latencies(external, clients, args.writes, "external")
+            polled, empty, polls = poll_latencies(repo, server.url + "/api/notifications", args.writes,
+                                                  args.poll_interval)
+
+            # Backpressure: a client that stops reading must not hold up the writers
+            stalled = SseClient(server.url, receive_buffer=4096).start()
+            stalled.ready.wait(5)
+            stalled.sock.shutdown(socket.SHUT_RD)
+            write_times = []
+            for i in range(300):
+                start = time.perf_counter()
+                repo.upsert_all([note(f"flood-{i}", padding=20_000)], snapshot=False)
+                write_times.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.002)
+            wait_for(clients, "flood-299")
+            overflows = sum(subscription.overflows for subscription in feed.subscribers)
+            for client in clients + [stalled]:
+                client.close()
+        finally:
+            feed.close()
+            server.stop()
+            repo.backend.close()
+            external.backend.close()
+
+    print(f"{args.clients} live clients, {args.writes} writes per mode")
+    summary("sse, in-process", in_process)
+    summary("sse, external", cross_process)
+    summary(f"poll every {args.poll_interval:g}s", polled)
+    print(f"  polling: {empty} of {polls} requests came back empty")
+    print(f"  stalled client: {overflows} queue overflows turned into a resync; "
+          f"writes p50 {statistics.median(write_times):.2f}ms, max {max(write_times):.2f}ms meanwhile")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cost and accuracy of the pipeline instrumentation.
+
+Pushes --count synthetic notifications through ingestion -> normalize -> dedup -> score ->
+store (SQLite) with plain stages and with every stage wrapped by a StageTimer, alternating
+--repeat times, and reports the median wall-clock time of each and the overhead. Checks that
+the instrumented stage times add up to the pass (each stage is charged only for its own
+work) and that every stage counted the items it produced. Then runs the same pass with
+one stage under cProfile to show what the opt-in profiling costs.
+
+Usage: python -m benchmarks.bench_metrics [--count 50000] [--repeat 3] [--profile score]
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.processing.dedup import Deduplicator
+from backend.processing.metrics import PipelineMetrics
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.pipeline import ConcurrentIngestion, normalize_stage, score_stage
+from backend.processing.priority_engine import PriorityEngine
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+from benchmarks.bench_streaming_memory import paged_source
+
+
+def run_pass(tmp, count, metrics=None):
+    """One pipeline pass into a fresh store; returns (seconds, StageTimer or None)."""
+    repository = NotificationRepository(os.path.join(tmp, "n.json"), backend=SQLiteBackend(os.path.join(tmp, "n.db")))
+    normalizer, engine, dedup = NotificationNormalizer(), PriorityEngine(), Deduplicator()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        ingestion = ConcurrentIngestion(executor, {"bench": paged_source(count, 100, seed=5)}, timeouts={},
+                                        default_timeout=600, run_deadline=600, metrics=metrics)
+        raw = ((item["source"], item) for _, item in ingestion)
+        if metrics is None:
+            stages = None
+            repository.upsert_stream(score_stage(dedup.stage(normalize_stage(raw, normalizer)), engine))
+        else:
+            stages = metrics.stages()
+            normalized = stages.stage("normalize", normalize_stage, stages.source("fetch", raw), normalizer)
+            scored = stages.stage("score", score_stage, stages.stage("dedup", dedup.stage, normalized), engine)
+            stages.sink("store", repository.upsert_stream, scored)
+    elapsed = time.perf_counter() - started
+    repository.backend.close()
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    return elapsed, stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50_000, help="Notifications per pass")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes of each kind")
+    parser.add_argument("--profile", default="score", help="Stage to run under cProfile in the last pass")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics = PipelineMetrics()
+        plain, instrumented = [], []
+        for _ in range(args.repeat):
+            plain.append(run_pass(tmp, args.count)[0])
+            elapsed, stages = run_pass(tmp, args.count, metrics)
+            instrumented.append(elapsed)
+
+        base, timed = statistics.median(plain), statistics.median(instrumented)
+        print(f"Pipeline pass over {args.count} notifications, median of {args.repeat}")
+        print(f"  plain stages  : {base:.3f}s")
+        print(f"  instrumented  : {timed:.3f}s ({(timed - base) / base:+.1%})")
+
+        accounted = sum(stages.seconds.values())
+        print(f"  stage times (last pass): {stages.summary()}")
+        print(f"  sum of stages : {accounted:.3f}s of {elapsed:.3f}s ({accounted / elapsed:.0%})")
+        assert stages.items["fetch"] == stages.items["normalize"] == args.count, stages.items
+        assert stages.items["score"] == stages.items["store"] == stages.items["dedup"], stages.items
+
+        start = time.perf_counter()
+        text = metrics.prometheus()
+        print(f"  export        : {len(text.splitlines())} Prometheus lines in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+        with tempfile.TemporaryDirectory() as profiles:
+            metrics.profile([args.profile], "cpu", directory=profiles)
+            profiled, _ = run_pass(tmp, args.count, metrics)
+        print(f"  with {args.profile} under cProfile: {profiled:.3f}s ({(profiled - base) / base:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Notification model vs plain dicts: memory and JSON speed.
+
+Builds --count stored notifications (as the JSON rows the store keeps), then loads them all
+back twice, as plain dicts (json.loads, what every reader used to hold) and as Notification
+objects, and reports retained memory per item (tracemalloc) and decode/encode time. The
+texts are unique per item, as in real data; senders, channels, tags and the source/type/
+priority labels repeat, which is what the model shares.
+
+Usage: python -m benchmarks.bench_model_memory [--count 200000] [--senders 300]
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from backend.models import Notification, jsonable
+from backend.processing.normalizer import NotificationNormalizer
+
+SOURCES = ["slack", "gmail", "discord", "github", "jira"]
+
+
+def make_rows(count, senders, seed):
+    rng = random.Random(seed)
+    people = [(f"Person {i}", f"person{i}@company.com") for i in range(senders)]
+    channels = [f"#team-{i}" for i in range(40)]
+    normalizer = NotificationNormalizer()
+    rows = []
+    for i in range(count):
+        name, email = rng.choice(people)
+        raw = {
+            "id": f"item-{i}", "source": rng.choice(SOURCES), "type": rng.choice(["message", "dm", "mention"]),
+            "title": f"Update {i} on ticket {rng.randint(1, 10**6)}",
+            "content": " ".join(f"w{rng.randint(0, 50000)}" for _ in range(rng.randint(8, 30))),
+            "sender": {"name": name, "email": email}, "channel": rng.choice(channels),
+            "tags": rng.choice([[], [], ["dm"], ["mention"]]), "timestamp": f"2026-01-{1 + i % 28:02d}T10:00:00",
+            "priority": "normal", "priority_score": rng.randint(0, 100), "source_priority": "normal",
+            "priority_reasons": rng.choice([[], ["Direct Message"], ["VIP Sender", "Direct Mention"]]),
+        }
+        rows.append(normalizer.normalize(raw, raw["source"]).to_json())
+    return rows
+
+
+def retained(load, rows):
+    """(items, bytes still allocated once 'load' has turned every row into an item, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [load(row) for row in rows]
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return items, size, elapsed
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--senders", type=int, default=300, help="Distinct senders in the data")
+    args = parser.parse_args()
+
+    rows = make_rows(args.count, args.senders, seed=9)
+    dicts, dict_bytes, dict_load = retained(json.loads, rows)
+    models, model_bytes, model_load = retained(Notification.from_json, rows)
+    assert all(model == item for model, item in zip(models[:1000], dicts)), "model and dict differ"
+
+    # Timed without tracemalloc running
+    dict_load = timed(json.loads, rows)
+    model_load = timed(Notification.from_json, rows)
+    dict_dump = timed(json.dumps, dicts)
+    model_dump = timed(lambda note: json.dumps(note, default=jsonable), models)
+
+    print(f"{args.count} notifications, {args.senders} distinct senders")
+    print(f"  dicts        : {dict_bytes / args.count:6.0f} B/item retained ({dict_bytes / 2**20:6.1f} MiB), "
+          f"load {dict_load:5.2f}s, dump {dict_dump:5.2f}s")
+    print(f"  Notification : {model_bytes / args.count:6.0f} B/item retained ({model_bytes / 2**20:6.1f} MiB), "
+          f"load {model_load:5.2f}s, dump {model_dump:5.2f}s")
+    print(f"  saved        : {1 - model_bytes / dict_bytes:.0%} of the memory; "
+          f"a million items would hold {model_bytes / args.count * 1e6 / 2**20:,.0f} MiB "
+          f"instead of {dict_bytes / args.count * 1e6 / 2**20:,.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
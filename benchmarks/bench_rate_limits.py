@@ -0,0 +1,104 @@
+"""
+Rate-limit scheduler benchmark.
+
+Starts a local stub that enforces a fixed-window quota (LIMIT requests per WINDOW
+seconds) and answers 429 + Retry-After once it is exhausted, advertising the quota in
+X-RateLimit-* headers (GitHub style with an epoch reset, or Discord style with
+Reset-After). Several threads then hammer it through HttpTransport, first unpaced and
+then through the RateLimitScheduler, whose starting pace is deliberately set too fast
+so it has to learn the real limit from the headers.
+
+Usage: python -m benchmarks.bench_rate_limits [--requests 120] [--threads 4] [--limit 20] [--window 2]
+"""
+import argparse
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.integrations.http_transport import HttpTransport
+from backend.integrations.rate_limiter import RateLimitScheduler
+from benchmarks.stub_servers import StubServer
+
+
+class FixedWindowLimiter:
+    """Server-side quota: 'limit' requests per 'window' seconds."""
+
+    def __init__(self, limit, window, style):
+        self.limit = limit
+        self.window = window
+        self.style = style
+        self.window_start = time.time()
+        self.used = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def route(self, handler, body):
+        with self._lock:
+            now = time.time()
+            if now - self.window_start >= self.window:
+                self.window_start = now - (now - self.window_start) % self.window
+                self.used = 0
+            reset_at = self.window_start + self.window
+            allowed = self.used < self.limit
+            if allowed:
+                self.used += 1
+            else:
+                self.rejected += 1
+            remaining = self.limit - self.used
+
+        headers = {"X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": str(remaining)}
+        if self.style == "github":
+            headers["X-RateLimit-Reset"] = str(math.ceil(reset_at))
+        else:
+            headers["X-RateLimit-Reset-After"] = f"{reset_at - now:.3f}"
+        if not allowed:
+            headers["Retry-After"] = str(math.ceil(reset_at - now))
+            return 429, headers, {"message": "rate limited"}
+        return 200, headers, {"items": []}
+
+
+def hammer(url, transport, total, threads, rate_key=None):
+    def one(_):
+        return transport.get(url, rate_key=rate_key, timeout=30).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(one, range(total)))
+    return statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=20, help="Requests allowed per window")
+    parser.add_argument("--window", type=float, default=2.0, help="Quota window (s)")
+    parser.add_argument("--style", choices=["discord", "github"], default="discord")
+    args = parser.parse_args()
+
+    quota_rate = args.limit / args.window
+    print(f"Server quota: {args.limit} requests / {args.window:g}s ({quota_rate:g}/s), {args.style}-style headers")
+    print(f"Ideal time for {args.requests} requests: ~{max(0, args.requests - args.limit) / quota_rate:.1f}s")
+
+    for label, paced in (("unpaced", False), ("scheduler", True)):
+        limiter = FixedWindowLimiter(args.limit, args.window, args.style)
+        with StubServer({"/search/issues": limiter.route}) as stub:
+            # Starting pace 5x too fast: the scheduler has to learn the real quota from headers
+            scheduler = RateLimitScheduler(limits={"bench": (quota_rate * 5, args.limit)}, max_retries=5, max_wait=120)
+            transport = HttpTransport(scheduler=scheduler)
+            statuses, elapsed = hammer(stub.url + "/search/issues", transport, args.requests, args.threads,
+                                       rate_key=("bench", "search") if paced else None)
+            transport.close()
+
+        ok = statuses.count(200)
+        print(f"  {label:<10} {elapsed:6.2f}s  {ok:>4}/{args.requests} succeeded  "
+              f"{stub.request_count:>4} HTTP requests  {limiter.rejected:>4} rejected (429)")
+        if paced:
+            stats = scheduler.stats()["bench"]
+            print(f"             waiting {stats['wait_seconds']:.2f}s vs fetching {stats['fetch_seconds']:.2f}s "
+                  f"(summed over threads), {stats['retries']} retries")
+
+
+if __name__ == "__main__":
+    main()
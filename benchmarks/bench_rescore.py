@@ -0,0 +1,122 @@
+"""
+Scoring config reload benchmark: selective vs full re-score of a stored history.
+
+Fills a SQLite store with --count seeded items scored under the default config, then applies
+one config change at a time, each to its own copy of that store:
+  selective : rescore_changed(), which re-scores only what the change can affect
+              (found through the store's full-text, score and time indexes)
+  full      : every stored notification re-scored, as a restart with a backfill did
+Both write back only the notifications whose score, label or reasons changed, and the two
+stores must end up identical. The engine's clock is pinned, so only the config differs.
+
+Also times compiling a config (keyword matcher included), which a reload does off the scoring path.
+
+Usage: python -m benchmarks.bench_rescore [--count 100000] [--seed 1]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.suite import NOW, Workload
+from backend.config import URGENT_KEYWORDS, VIP_SENDERS
+from backend.processing.backfill import rescore_changed
+from backend.processing.pipeline import chunked
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.scoring_config import ScoringConfig
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+CHANGES = [
+    ("add keyword 'outage'", {"urgent_keywords": URGENT_KEYWORDS + ["outage"]}),
+    ("remove keyword 'alert'", {"urgent_keywords": [k for k in URGENT_KEYWORDS if k != "alert"]}),
+    ("add VIP 'user7'", {"vip_senders": VIP_SENDERS + ["user7"]}),
+    ("high threshold 60 -> 55", {"thresholds": {"high": 55}}),
+    ("vip_sender weight 25 -> 35", {"weights": {"vip_sender": 35}}),
+    ("recency bonus 10 -> 15", {"weights": {"recency_bonus": 15}}),
+]
+
+
+def engine(config):
+    scorer = PriorityEngine(config=config)
+    scorer.clock = NOW.timestamp
+    return scorer
+
+
+def open_store(path):
+    return NotificationRepository(path + ".json", backend=SQLiteBackend(path))
+
+
+def copy_store(source, path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(source + suffix):
+            shutil.copyfile(source + suffix, path + suffix)
+    return open_store(path)
+
+
+def full_rescore(repository, scorer, batch_size=1000):
+    rewritten = 0
+    for batch in chunked(repository.iter_all(batch_size=batch_size), batch_size):
+        before = [(n["priority"], n["priority_score"], list(n["priority_reasons"])) for n in batch]
+        changed = [n for n, old in zip(scorer.iter_process(batch), before)
+                   if (n["priority"], n["priority_score"], n["priority_reasons"]) != old]
+        if changed:
+            repository.upsert_all(changed, snapshot=False)
+            rewritten += len(changed)
+    repository.export_snapshot()
+    return rewritten
+
+
+def outcomes(repository):
+    return {n["id"]: (n["priority"], n["priority_score"], n["priority_reasons"]) for n in repository.iter_all()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    base = ScoringConfig()
+    with tempfile.TemporaryDirectory() as tmp:
+        load = Workload(args.count, args.seed, tmp)
+        base_path = os.path.join(tmp, "base.db")
+        repository = open_store(base_path)
+        repository.upsert_stream(engine(base).process(load.normalized()))
+        rescore_changed(repository, engine(base))  # Records the config the store was scored with
+        repository.backend.close()
+        print(f"{args.count:,} stored notifications, one config change at a time:")
+
+        for label, overrides in CHANGES:
+            config = base.with_overrides(**overrides)
+            selective = copy_store(base_path, os.path.join(tmp, "selective.db"))
+            start = time.perf_counter()
+            looked_at, rewritten = rescore_changed(selective, engine(config))
+            selective_seconds = time.perf_counter() - start
+
+            full = copy_store(base_path, os.path.join(tmp, "full.db"))
+            start = time.perf_counter()
+            full_rewritten = full_rescore(full, engine(config))
+            full_seconds = time.perf_counter() - start
+
+            same = outcomes(selective) == outcomes(full)
+            selective.backend.close()
+            full.backend.close()
+            print(f"  {label:<28} selective: {looked_at:>7,} looked at, {rewritten:>6,} rewritten in {selective_seconds:6.2f}s"
+                  f" | full: {full_rewritten:>6,} rewritten in {full_seconds:6.2f}s ({full_seconds / selective_seconds:5.1f}x)"
+                  f"  {'✅ same scores' if same else '❌ scores differ'}")
+            assert same, f"{label}: selective re-score differs from a full one"
+
+    scorer = PriorityEngine(config=base)
+    big = base.with_overrides(urgent_keywords=URGENT_KEYWORDS + [f"incident-{i}" for i in range(5000)])
+    start = time.perf_counter()
+    scorer.reload(big)
+    print(f"Compiling a config with {len(big.urgent_keywords):,} keywords (off the scoring path): "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Score cache benchmark.
+
+Scores a synthetic batch twice, the second time as a re-poll where most notifications are
+unchanged and --changed of them were edited, with and without a ScoreCache. Checks that
+cached results match fresh ones, reports hit rate and time per pass for the streaming
+(iter_process) and batch (process_batch) paths, then checks that the cache survives a
+save/load round trip and that a scoring config change invalidates every entry.
+
+Usage: python -m benchmarks.bench_score_cache [--count 50000] [--changed 0.1]
+"""
+import argparse
+import copy
+import os
+import random
+import tempfile
+import time
+
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.score_cache import ScoreCache
+
+SENDERS = [("Sarah Chen", "sarah.chen@company.com"), ("Bot", ""), ("Alex", "alex@company.com"), ("Jira System", "")]
+KEYWORDS = ["asap", "error", "deploy failed", "deadline", "service down", "alert"]
+
+
+def make_batch(count, seed):
+    rng = random.Random(seed)
+    vocabulary = [f"{rng.choice('bcdfgklmnprstvz')}{rng.choice('aeiou')}{rng.choice('lmnrst')}{i}"
+                  for i in range(5000)]
+    batch = []
+    for i in range(count):
+        words = rng.sample(vocabulary, rng.randint(15, 40))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+        name, email = rng.choice(SENDERS)
+        batch.append({
+            "id": str(i), "source": "slack", "type": rng.choice(["message", "message", "dm", "mention"]),
+            "title": " ".join(words[:5]).capitalize(), "content": " ".join(words) + ".",
+            "sender": {"name": name, "email": email}, "tags": [], "priority": "normal",
+        })
+    return batch
+
+
+def repoll(batch, changed, seed):
+    """The same batch again, with a 'changed' fraction of the notifications edited."""
+    rng = random.Random(seed)
+    again = copy.deepcopy(batch)
+    for note in rng.sample(again, int(len(again) * changed)):
+        note["content"] += " (edited)"
+    return again
+
+
+def timed(score, batch):
+    notes = copy.deepcopy(batch)
+    start = time.perf_counter()
+    result = list(score(notes))
+    return result, time.perf_counter() - start
+
+
+def check_parity(fresh, cached):
+    by_id = {note["id"]: note for note in fresh}
+    for note in cached:
+        for field in ("priority_score", "priority", "priority_reasons"):
+            assert note[field] == by_id[note["id"]][field], f"mismatch on {field} for {note['id']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument("--changed", type=float, default=0.1, help="Fraction of notifications edited between polls")
+    args = parser.parse_args()
+
+    first = make_batch(args.count, seed=5)
+    second = repoll(first, args.changed, seed=6)
+    plain = PriorityEngine()
+    print(f"{args.count} notifications, {args.changed:.0%} edited on the second poll")
+
+    for label, method in (("iter_process", "iter_process"), ("process_batch", "process_batch")):
+        _, uncached_time = timed(getattr(plain, method), second)
+        fresh, _ = timed(getattr(plain, method), second)
+        engine = PriorityEngine(cache=ScoreCache(max_entries=args.count * 2))
+        _, cold_time = timed(getattr(engine, method), first)
+        before = engine.cache.hits
+        cached, warm_time = timed(getattr(engine, method), second)
+        check_parity(fresh, cached)
+        hits = engine.cache.hits - before
+        print(f"  {label:<13}: no cache {uncached_time:5.2f}s | cold {cold_time:5.2f}s | "
+              f"re-poll {warm_time:5.2f}s, {hits / args.count:.0%} hits ({uncached_time / warm_time:.1f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "score_cache.json")
+        engine = PriorityEngine(cache=ScoreCache(max_entries=args.count * 2, path=path))
+        list(engine.iter_process(copy.deepcopy(first)))
+        start = time.perf_counter()
+        engine.cache.save()
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        reloaded = ScoreCache(max_entries=args.count * 2, path=path).load()
+        load_time = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+    restarted = PriorityEngine(cache=reloaded)
+    list(restarted.iter_process(copy.deepcopy(second)))
+    print(f"  persisted    : {size / 1024:.0f} KiB, save {save_time:.2f}s, load {load_time:.2f}s; "
+          f"after restart {reloaded.hit_rate:.0%} hits")
+
+    retuned = PriorityEngine(cache=ScoreCache(max_entries=args.count * 2))
+    list(retuned.iter_process(copy.deepcopy(first)))
+    config = retuned.scoring_config
+    retuned.reload(config.with_overrides(weights={"vip_sender": config.weights["vip_sender"] + 5}))
+    before = retuned.cache.hits
+    list(retuned.iter_process(copy.deepcopy(first)))
+    print(f"  config change: {retuned.cache.hits - before} stale hits after changing a weight")
+
+
+if __name__ == "__main__":
+    main()
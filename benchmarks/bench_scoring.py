@@ -0,0 +1,98 @@
+"""
+Scalar vs. vectorized scoring.
+
+Builds a synthetic batch covering every scoring feature (keywords, critical terms,
+VIP senders, DMs, mentions, upstream overrides, recency), with some titles in scripts
+whose lowercase form is longer than the original (e.g. Turkish 'İ'). Checks that
+PriorityEngine.process_batch() returns exactly what PriorityEngine.process() returns and
+that every keyword reason points at the keyword in the item's own text, then times both.
+
+Usage: python -m benchmarks.bench_scoring [--count 200000]
+"""
+import argparse
+import copy
+import gc
+import random
+import time
+
+from backend.processing.priority_engine import PriorityEngine
+
+NOW = 1_767_000_000.0
+
+TITLES = ["Weekly sync notes", "URGENT: deploy blocked", "Build failed on main", "Lunch?", "Terror movie night",
+          "Deadline moved", "Service down in eu-west", "Re: invoice", "Sev-1 incident review", "FYI",
+          "İSTANBUL ofisi: deploy blocked", "Straße gesperrt, bitte ASAP", "ÇALIŞMA İZNİ: urgent"]
+CONTENTS = ["No action needed.", "Please respond ASAP.", "Error rate above 5%.", "Thanks!", "Alert cleared.",
+            "Bug bash on Friday", "Nothing to see here", "crash loop in pod api-7", "", "critical path updated"]
+SENDERS = [("Sarah Chen", "sarah.chen@company.com"), ("Bot", ""), ("Boss <boss@company.com>", ""),
+           ("Alex", "alex@company.com"), ("Jira System", "")]
+
+
+def make_batch(count, seed):
+    rng = random.Random(seed)
+    batch = []
+    for i in range(count):
+        name, email = rng.choice(SENDERS)
+        batch.append({
+            "id": str(i),
+            "source": rng.choice(["slack", "gmail", "jira", "github", "discord"]),
+            "type": rng.choice(["message", "message", "dm", "mention", "email"]),
+            "title": rng.choice(TITLES),
+            "content": rng.choice(CONTENTS),
+            "sender": {"name": name, "email": email},
+            "tags": rng.choice([[], [], ["dm"], ["mention"], ["dm", "mention"]]),
+            "priority": rng.choice(["normal"] * 8 + ["high", "urgent"]),
+            # Two days either side of NOW, or no known time
+            "timestamp_epoch": rng.choice([None, NOW + rng.uniform(-48, 48) * 3600]),
+        })
+    return batch
+
+
+def check_offsets(scored):
+    """Every 'Keyword Match' reason names a keyword found at that offset of its own title + content."""
+    for note in scored:
+        text = note["title"] + " " + note["content"]
+        for reason in note["priority_reasons"]:
+            if reason.startswith("Keyword Match: "):
+                keyword, _, offset = reason[len("Keyword Match: '"):].rpartition("' at ")
+                found = text[int(offset):int(offset) + len(keyword)]
+                assert found.lower() == keyword, f"{note['id']}: {reason!r} but the text there is {found!r}"
+
+
+def check_parity(scalar, batch):
+    assert len(scalar) == len(batch), "different lengths"
+    for a, b in zip(scalar, batch):
+        for field in ("id", "priority_score", "priority", "priority_reasons"):
+            assert a[field] == b[field], f"mismatch on {field}: {a} != {b}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = PriorityEngine()
+    engine.clock = lambda: NOW
+    batch = make_batch(args.count, args.seed)
+    scalar_input, batch_input = copy.deepcopy(batch), copy.deepcopy(batch)
+
+    gc.collect()
+    start = time.perf_counter()
+    scalar = engine.process(scalar_input)
+    scalar_time = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    vectorized = engine.process_batch(batch_input)
+    batch_time = time.perf_counter() - start
+
+    check_parity(scalar, vectorized)
+    check_offsets(vectorized)
+    print(f"Parity and keyword offsets OK on {args.count} notifications")
+    print(f"Scalar     : {scalar_time:.2f}s ({args.count / scalar_time:,.0f} items/s)")
+    print(f"Vectorized : {batch_time:.2f}s ({args.count / batch_time:,.0f} items/s)")
+    print(f"Speed-up   : {scalar_time / batch_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold start: what the pipeline imports before it can fetch anything.
+
+Starts fresh interpreters that import the aggregator and then
+  eager : every integration client (what importing run_aggregator used to do),
+  single: only the client of --source (a one-source run),
+  demo  : no client at all (DEMO_MODE),
+and reports median wall-clock time per start plus the packages that cost the most to import
+(self time from python -X importtime, summed per top-level package).
+'python -m backend.run_aggregator --help' is timed as the CLI start.
+
+With --max-ms the exit status is 1 if the single-source start is slower than that,
+so the benchmark can guard against an SDK creeping back into the import path.
+
+Usage: python -m benchmarks.bench_startup [--source github] [--runs 7] [--max-ms 400]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from backend.integrations import INTEGRATIONS
+
+PRELUDE = "import backend.run_aggregator\nfrom backend import integrations\n"
+SCENARIOS = {
+    "eager": PRELUDE + "for name in integrations.INTEGRATIONS: integrations.load(name)",
+    "single": PRELUDE + "integrations.load({source!r})",
+    "demo": PRELUDE,
+}
+# Imported by every interpreter before our code runs
+STARTUP_MODULES = set(sys.builtin_module_names) | {"site", "encodings", "codecs", "io", "abc", "os", "stat",
+                                                   "posixpath", "genericpath", "_collections_abc",
+                                                   "_sitebuiltins", "_distutils_hack", "_frozen_importlib_external"}
+
+
+def wall_time(args, runs):
+    """Median seconds for a fresh interpreter to run 'args'."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def heaviest_imports(code, top=4):
+    """(total import ms, [(package, ms), ...]) for what 'code' imports, interpreter start-up aside."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            check=True, capture_output=True, text=True)
+    packages = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(own) / 1000
+    for package in STARTUP_MODULES:
+        packages.pop(package, None)
+    return sum(packages.values()), packages.most_common(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="github", choices=list(INTEGRATIONS), help="Source of the single-source run")
+    parser.add_argument("--runs", type=int, default=7, help="Interpreter starts per scenario")
+    parser.add_argument("--max-ms", type=float, help="Fail if the single-source start takes longer")
+    args = parser.parse_args()
+
+    baseline = wall_time(["-c", "pass"], args.runs)
+    print(f"Interpreter start (python -c pass): {baseline * 1000:.0f}ms, median of {args.runs}")
+    print(f"  {'scenario':<16} {'start':>8} {'imports':>9}   heaviest packages")
+    results = {}
+    for name, code in SCENARIOS.items():
+        code = code.format(source=args.source)
+        results[name] = wall_time(["-c", code], args.runs)
+        imports, heaviest = heaviest_imports(code)
+        label = f"single ({args.source})" if name == "single" else name
+        print(f"  {label:<16} {results[name] * 1000:6.0f}ms {imports:7.0f}ms   "
+              + ", ".join(f"{package} {ms:.0f}ms" for package, ms in heaviest))
+    cli = wall_time(["-m", "backend.run_aggregator", "--help"], args.runs)
+    print(f"  {'cli --help':<16} {cli * 1000:6.0f}ms")
+
+    saved = results["eager"] - results["single"]
+    print(f"Single-source start: {saved * 1000:.0f}ms faster than importing every integration "
+          f"({results['eager'] / results['single']:.1f}x)")
+    if args.max_ms is not None and results["single"] * 1000 > args.max_ms:
+        print(f"❌ Single-source start {results['single'] * 1000:.0f}ms exceeds --max-ms {args.max_ms:.0f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Streaming pipeline memory benchmark.
+
+Pushes synthetic pages through ingestion -> normalize -> score -> store twice:
+once the old way (every stage materialized as a list) and once through the
+generator stages of backend.processing.pipeline. Peak Python heap (tracemalloc)
+is reported at each batch size; the streaming peak should stay roughly flat
+(once the ingestion queue is full) while the materialized peak grows with the batch.
+Reporting only; tests/test_streaming_memory.py asserts the flat peak.
+
+Usage: python -m benchmarks.bench_streaming_memory [--counts 10000,100000] [--page-size 100]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.pipeline import ConcurrentIngestion, normalize_stage, score_stage, tally
+from backend.processing.priority_engine import PriorityEngine
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+from benchmarks.bench_scoring import make_batch
+
+
+def paged_source(count, page_size, seed):
+    """A fetcher that builds each page on demand, like a paginated API would."""
+    def fetch():
+        for start in range(0, count, page_size):
+            page = make_batch(min(page_size, count - start), seed=seed + start)
+            for offset, item in enumerate(page):
+                item["id"] = str(start + offset)
+            yield page
+        return "cursor"
+    return fetch
+
+
+def run_materialized(repo, count, page_size):
+    normalizer, engine = NotificationNormalizer(), PriorityEngine()
+    raw = [item for page in paged_source(count, page_size, seed=5)() for item in page]
+    notifications = [normalizer.normalize(item, item["source"]) for item in raw]
+    prioritized = engine.process(notifications)
+    repo.upsert_all(prioritized)
+    return len(prioritized)
+
+
+def run_streaming(repo, count, page_size, max_pages=32):
+    """'max_pages' bounds the ingestion queue; the peak grows until the queue is full, then stays flat."""
+    normalizer, engine = NotificationNormalizer(), PriorityEngine()
+    counts = Counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        ingestion = ConcurrentIngestion(executor, {"bench": paged_source(count, page_size, seed=5)},
+                                        timeouts={}, default_timeout=600, run_deadline=600, max_pages=max_pages)
+        raw = ((item["source"], item) for _, item in ingestion)
+        prioritized = tally(score_stage(normalize_stage(raw, normalizer), engine), counts)
+        repo.upsert_stream(prioritized)
+    return counts["total"]
+
+
+def measure(mode, count, page_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = NotificationRepository(os.path.join(tmp, "bench.json"),
+                                      backend=SQLiteBackend(os.path.join(tmp, "bench.db")))
+        tracemalloc.start()
+        start = time.perf_counter()
+        written = mode(repo, count, page_size)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        repo.backend.close()
+    return written, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", default="10000,100000")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    counts = [int(c) for c in args.counts.split(",")]
+
+    peaks = {}
+    for label, mode in (("materialized", run_materialized), ("streaming", run_streaming)):
+        for count in counts:
+            written, elapsed, peak = measure(mode, count, args.page_size)
+            peaks[label, count] = peak
+            print(f"  {label:<12} {count:>8,} items: {elapsed:6.2f}s  peak {peak / 2**20:8.1f} MiB  ({written:,} written)")
+
+    smallest, largest = counts[0], counts[-1]
+    for label in ("materialized", "streaming"):
+        growth = peaks[label, largest] / peaks[label, smallest]
+        print(f"{label:<12} peak growth {smallest:,} -> {largest:,}: {growth:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Multi-tenant aggregation benchmark.
+
+Serves GitHub and Jira from local stubs and gives --tenants users their own credentials
+(a tenant directory with a .env each, in a temporary TENANTS_DIR). Then:
+  per process : one live pass in a fresh `python` process, as running one process per user does;
+                its peak RSS times --tenants is what the fleet of processes needs
+  one process : a MultiTenantAggregator passing every tenant at once, on shared fetch workers,
+                HTTP pools and score cache (peak RSS, threads, connections opened)
+Each tenant calls the APIs under its own token, so rate-limit buckets are per tenant and the
+default RATE_LIMITS apply without throttling one user for another's traffic.
+
+Then fairness of the shared fetch pool: one heavy tenant queues --heavy-jobs slow jobs just
+before --light light tenants queue two each. With a plain FIFO pool the light tenants wait for the
+whole backlog; with FairExecutor they are served between the heavy tenant's jobs.
+
+Usage: python -m benchmarks.bench_tenants [--tenants 20] [--latency 0.05] [--workers 8] [--heavy-jobs 40] [--light 5]
+"""
+import argparse
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from benchmarks.bench_ingestion import GITHUB_SEARCH, JIRA_SEARCH
+from benchmarks.stub_servers import StubServer, json_route
+
+PER_PROCESS = """
+import os, resource
+from backend.run_aggregator import NotificationAggregator
+from backend.storage.cursor_store import SyncCursorStore
+from backend.storage.repository import NotificationRepository
+aggregator = NotificationAggregator()
+aggregator.repository = NotificationRepository(os.path.join(os.environ["BENCH_DIR"], "notifications.json"))
+aggregator.cursors = SyncCursorStore(os.path.join(os.environ["BENCH_DIR"], "cursors.json"))
+aggregator.run()
+aggregator.close()
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def tenant_env(i, github, jira):
+    return {
+        "GITHUB_TOKEN": f"ghp-tenant{i}", "GITHUB_API_URL": github.url,
+        "JIRA_DOMAIN": "bench", "JIRA_EMAIL": f"user{i}@example.com", "JIRA_API_TOKEN": f"jira-{i}", "JIRA_API_URL": jira.url,
+    }
+
+
+def fairness(executor_kind, workers, heavy_jobs, light, job_seconds=0.05):
+    """Seconds each light tenant waits for its last job, with the heavy tenant's backlog queued first."""
+    from backend.tenants import FairExecutor
+
+    if executor_kind == "fair":
+        pool = FairExecutor(workers)
+        submit = pool.submit
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda key, fn: pool.submit(fn)
+    started = time.perf_counter()
+    finished = {}
+
+    def job(key):
+        time.sleep(job_seconds)
+        finished[key] = time.perf_counter() - started
+
+    heavy = [submit("heavy", lambda: job("heavy")) for _ in range(heavy_jobs)]
+    light_jobs = [submit(f"light{t}", lambda t=t: job(f"light{t}")) for t in range(light) for _ in range(2)]
+    wait(heavy + light_jobs)
+    pool.shutdown(wait=True)
+    done = [finished[f"light{t}"] for t in range(light)]
+    return statistics.median(done), max(done), finished["heavy"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per request (s)")
+    parser.add_argument("--workers", type=int, default=8, help="Shared fetch workers")
+    parser.add_argument("--heavy-jobs", type=int, default=40)
+    parser.add_argument("--light", type=int, default=5, help="Light tenants in the fairness test")
+    args = parser.parse_args()
+
+    # Imported up front: it configures logging, which is then turned down for the benchmark
+    import backend.run_aggregator  # noqa: F401
+    github = StubServer({"/search/issues": json_route(GITHUB_SEARCH)}, latency=args.latency).start()
+    jira = StubServer({"/search": json_route(JIRA_SEARCH)}, latency=args.latency).start()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({"DEMO_MODE": "false", "ENABLED_SOURCES": "github,jira", "BENCH_DIR": tmp})
+        try:
+            # --- One process per tenant (a few samples; each process is the same size) ---
+            samples = []
+            for i in range(min(3, args.tenants)):
+                env = dict(os.environ, **tenant_env(i, github, jira))
+                start = time.perf_counter()
+                result = subprocess.run([sys.executable, "-c", PER_PROCESS], env=env, capture_output=True, text=True, check=True)
+                samples.append((time.perf_counter() - start, int(result.stdout.strip().splitlines()[-1])))
+            seconds = statistics.median(s for s, _ in samples)
+            rss_kib = statistics.median(r for _, r in samples)
+            print(f"{args.tenants} tenants, GitHub + Jira each, {args.latency * 1000:.0f}ms per request")
+            print(f"  per process : {seconds:.2f}s and {rss_kib / 1024:.0f} MiB each -> "
+                  f"{args.tenants * rss_kib / 1024:.0f} MiB for {args.tenants} processes")
+
+            # --- One process for everyone ---
+            tenants_dir = os.path.join(tmp, "tenants")
+            for i in range(args.tenants):
+                os.makedirs(os.path.join(tenants_dir, f"user{i}"))
+                with open(os.path.join(tenants_dir, f"user{i}", ".env"), "w") as f:
+                    f.writelines(f"{key}={value}\n" for key, value in tenant_env(i, github, jira).items())
+
+            import backend.config
+            backend.config.SCORE_CACHE_PATH = os.path.join(tmp, "score_cache.json")
+            from backend.integrations.rate_limiter import get_shared_scheduler
+            from backend.tenants import MultiTenantAggregator, load_tenants
+
+            requests_before = github.request_count + jira.request_count
+            aggregator = MultiTenantAggregator(load_tenants(tenants_dir), workers=args.workers)
+            start = time.perf_counter()
+            aggregator.run()
+            elapsed = time.perf_counter() - start
+            threads = threading.active_count()
+            http = next(iter(aggregator.aggregators.values())).transport.stats()
+            waited = sum(s["wait_seconds"] for s in get_shared_scheduler().stats().values())
+            aggregator.close()
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            stored = sum(1 for name in os.listdir(tenants_dir) if os.path.exists(os.path.join(tenants_dir, name, "notifications.db")))
+            print(f"  one process : {elapsed:.2f}s for all, {rss / 1024:.0f} MiB peak ({rss / (args.tenants * rss_kib):.0%}), "
+                  f"{threads} threads, {github.request_count + jira.request_count - requests_before} requests "
+                  f"over {http['connections_opened']} connections, {waited:.2f}s waiting on rate limits")
+            assert stored == args.tenants, f"only {stored} tenants stored their notifications"
+        finally:
+            github.stop()
+            jira.stop()
+
+    print(f"Fairness: {args.workers} workers, a heavy tenant queues {args.heavy_jobs} jobs, "
+          f"then {args.light} light tenants 2 each")
+    for kind in ("fifo", "fair"):
+        median, worst, heavy = fairness(kind, args.workers, args.heavy_jobs, args.light)
+        print(f"  {kind:<4}: light tenants done after {median:.2f}s (worst {worst:.2f}s), heavy tenant after {heavy:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
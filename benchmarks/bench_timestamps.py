@@ -0,0 +1,113 @@
+"""
+Timestamp parsing, ordering and time-bucket queries.
+
+1. Parses --count timestamps in each source's format one at a time (datetime.fromisoformat,
+   what a per-item parse costs) and as one batch with to_epochs(), and checks they agree.
+2. Sorts a mixed-format batch (calendar dates aside) by its timestamp strings (the old
+   ordering) and by epoch, and counts how many items each puts out of order.
+3. Fills a SQLite store with --store notifications spread over 30 days and times recency
+   queries on the epoch/hour-bucket indexes against loading everything and filtering in Python.
+
+Usage: python -m benchmarks.bench_timestamps [--count 100000] [--store 100000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.processing.timestamps import HOUR, to_epoch, to_epochs
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+FORMATS = {
+    "mock (naive)": lambda d: d.replace(tzinfo=None).isoformat(),
+    "github (Z)": lambda d: d.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    "jira (+0000)": lambda d: d.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+0000",
+    "discord (+00:00)": lambda d: d.astimezone(timezone.utc).isoformat(),
+    "calendar (date)": lambda d: d.strftime("%Y-%m-%d"),
+    "slack (ts)": lambda d: f"{d.timestamp():.6f}",
+}
+
+
+def moments(count, days, seed):
+    rng = random.Random(seed)
+    now = datetime.now().astimezone()
+    return [now - timedelta(seconds=rng.uniform(0, days * 86400)) for _ in range(count)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def parse_formats(count):
+    print(f"Parsing {count} timestamps per format (items/s)")
+    print(f"  {'format':<17} {'per item':>12} {'batch':>12}")
+    when = moments(count, 3, seed=1)
+    for name, fmt in FORMATS.items():
+        values = [fmt(d) for d in when]
+        single, single_time = timed(lambda: [to_epoch(v) for v in values])
+        batch, batch_time = timed(lambda: to_epochs(values))
+        assert np.allclose(batch, np.array(single, dtype=np.float64), atol=1e-5), f"{name}: batch != per item"
+        print(f"  {name:<17} {count / single_time:12,.0f} {count / batch_time:12,.0f}   ({single_time / batch_time:.1f}x)")
+
+
+def ordering(count):
+    when = moments(count, 3, seed=2)
+    # Calendar dates are left out: they only know the day, so their true order is unknowable
+    formats = [fmt for name, fmt in FORMATS.items() if not name.startswith("calendar")]
+    rng = random.Random(2)
+    values = [rng.choice(formats)(d) for d in when]
+    truth = [d.timestamp() for d in when]
+    by_string = sorted(range(count), key=lambda i: values[i])
+    epochs = to_epochs(values)
+    by_epoch = sorted(range(count), key=lambda i: epochs[i])
+    # Items more than 1% of the batch away from their true rank
+    rank = {i: r for r, i in enumerate(sorted(range(count), key=lambda i: truth[i]))}
+    misplaced = lambda order: sum(1 for r, i in enumerate(order) if abs(rank[i] - r) > count // 100)
+    print(f"Ordering {count} mixed-format timestamps: {misplaced(by_string)} far out of place sorted as "
+          f"strings, {misplaced(by_epoch)} sorted by epoch")
+
+
+def store_queries(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = NotificationRepository(os.path.join(tmp, "n.json"),
+                                            backend=SQLiteBackend(os.path.join(tmp, "n.db")))
+        when = moments(count, 30, seed=3)
+        items = [{"id": str(i), "source": "slack", "title": f"t{i}", "content": "", "priority": "normal",
+                  "priority_score": i % 100, "timestamp": d.isoformat(), "timestamp_epoch": d.timestamp()}
+                 for i, d in enumerate(when)]
+        repository.backend.upsert_many(items)
+
+        now = time.time()
+        recent, indexed = timed(lambda: repository.recent(6))
+        scanned, scan = timed(lambda: [n for n in repository.load_all()
+                                       if now - 6 * HOUR <= (n.get("timestamp_epoch") or 0) <= now])
+        assert len(recent) == len(scanned)
+        hours, bucket_time = timed(lambda: repository.buckets("hour", hours=48))
+        days, day_time = timed(lambda: repository.buckets("day"))
+        print(f"Store of {count} notifications over 30 days")
+        print(f"  last 6 hours  : {len(recent)} items, index {indexed * 1000:7.1f}ms vs full scan {scan * 1000:7.1f}ms")
+        print(f"  hour buckets  : {len(hours)} buckets (48h) in {bucket_time * 1000:.1f}ms; "
+              f"day buckets: {len(days)} in {day_time * 1000:.1f}ms")
+        repository.backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="Timestamps per format")
+    parser.add_argument("--store", type=int, default=100_000, help="Notifications in the store test")
+    args = parser.parse_args()
+
+    parse_formats(args.count)
+    ordering(min(args.count, 20_000))
+    store_queries(args.store)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Webhook push latency benchmark.
+
+Starts the webhook receiver on a temporary store and posts recorded Slack Events API,
+GitHub and Jira deliveries to it, signed the way each service signs them. Reports the
+end-to-end latency per delivery (HTTP round-trip including verify, normalize, score and
+upsert) and checks that tampered deliveries are rejected and that a pushed item and its
+polled copy end up on the same row.
+
+Usage: python -m benchmarks.bench_webhooks [--deliveries 300]
+"""
+import argparse
+import copy
+import hashlib
+import hmac
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import requests
+
+from backend.integrations.github_client import GitHubClient
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.priority_engine import PriorityEngine
+from backend.server.app import HttpServer
+from backend.server.webhooks import WebhookReceiver
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+SECRETS = {"slack": "slack-signing-secret", "github": "github-webhook-secret", "jira": "jira-webhook-secret"}
+
+# Trimmed recordings of real deliveries (only the fields the receiver reads, plus some noise)
+SLACK_EVENT = {
+    "token": "legacy", "team_id": "T061EG9R6", "api_app_id": "A0PNCHHK2", "type": "event_callback",
+    "event_id": "Ev0PV52K25", "event_time": 1700000000,
+    "event": {"type": "message", "channel": "C2147483705", "user": "U2147483697",
+              "text": "Prod checkout is down, need eyes ASAP", "ts": "1700000000.000200", "channel_type": "channel"},
+}
+GITHUB_REVIEW_REQUEST = {
+    "action": "review_requested", "number": 1347,
+    "pull_request": {"id": 1, "number": 1347, "title": "Fix login error on Safari", "user": {"login": "octocat"},
+                     "created_at": "2026-01-20T10:00:00Z", "updated_at": "2026-01-20T11:00:00Z",
+                     "html_url": "https://github.com/acme/clarity-hub/pull/1347", "state": "open"},
+    "requested_reviewer": {"login": "me"},
+    "repository": {"full_name": "acme/clarity-hub", "url": "https://api.github.com/repos/acme/clarity-hub"},
+}
+JIRA_ISSUE_UPDATED = {
+    "webhookEvent": "jira:issue_updated", "timestamp": 1700000000000,
+    "issue": {"id": "10002", "key": "OPS-7", "fields": {
+        "summary": "Payment webhook failing intermittently", "priority": {"name": "High"},
+        "status": {"name": "In Progress", "statusCategory": {"key": "indeterminate"}},
+        "created": "2026-01-20T10:00:00.000+0000", "updated": "2026-01-20T12:00:00.000+0000"}},
+}
+
+
+def sign_hub(secret, body):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def signed_request(source, payload, seq):
+    """Returns (path, headers, body) for one delivery, made unique by 'seq'."""
+    payload = copy.deepcopy(payload)
+    if source == "slack":
+        payload["event"]["ts"] = f"1700000000.{seq:06d}"
+    elif source == "github":
+        payload["pull_request"]["number"] = seq
+    else:
+        payload["issue"]["id"] = str(20000 + seq)
+    body = json.dumps(payload).encode()
+
+    headers = {"Content-Type": "application/json"}
+    if source == "slack":
+        timestamp = str(int(time.time()))
+        base = b"v0:" + timestamp.encode() + b":" + body
+        headers["X-Slack-Request-Timestamp"] = timestamp
+        headers["X-Slack-Signature"] = "v0=" + hmac.new(SECRETS["slack"].encode(), base, hashlib.sha256).hexdigest()
+    elif source == "github":
+        headers["X-GitHub-Event"] = "pull_request"
+        headers["X-Hub-Signature-256"] = sign_hub(SECRETS["github"], body)
+    else:
+        headers["X-Hub-Signature"] = sign_hub(SECRETS["jira"], body)
+    return f"/webhooks/{source}", headers, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deliveries", type=int, default=300)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    payloads = {"slack": SLACK_EVENT, "github": GITHUB_REVIEW_REQUEST, "jira": JIRA_ISSUE_UPDATED}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = NotificationRepository(os.path.join(tmp, "notifications.json"),
+                                      backend=SQLiteBackend(os.path.join(tmp, "notifications.db")),
+                                      export_snapshots=True)
+        receiver = WebhookReceiver(repo, NotificationNormalizer(), PriorityEngine(), secrets=SECRETS, snapshot_delay=0.5)
+        server = HttpServer(receiver.routes()).start()
+        session = requests.Session()
+
+        try:
+            latencies = {source: [] for source in payloads}
+            for seq in range(args.deliveries):
+                source = list(payloads)[seq % len(payloads)]
+                path, headers, body = signed_request(source, payloads[source], seq)
+                start = time.perf_counter()
+                response = session.post(server.url + path, data=body, headers=headers)
+                latencies[source].append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+
+            path, headers, body = signed_request("github", GITHUB_REVIEW_REQUEST, 1)
+            forged = session.post(server.url + path, data=body + b" ", headers=headers)
+            assert forged.status_code == 401, "tampered body was accepted"
+
+            # Reconciliation: the polled copy of PR #1 must land on the pushed row
+            polled = dict(GITHUB_REVIEW_REQUEST["pull_request"], number=1,
+                          repository_url=GITHUB_REVIEW_REQUEST["repository"]["url"])
+            polled_id = GitHubClient.to_notification(polled, "Review Required", "high")["id"]
+            assert repo.get(polled_id) is not None, f"pushed row {polled_id} not found"
+
+            time.sleep(0.7)  # Let the debounced snapshot export run
+            receiver.flush()
+            with open(os.path.join(tmp, "notifications.json")) as f:
+                snapshot_items = len(json.load(f))
+            stored = repo.count()
+        finally:
+            server.stop()
+            repo.backend.close()
+
+    print(f"{args.deliveries} signed deliveries, {stored} stored, snapshot holds {snapshot_items}")
+    for source, values in latencies.items():
+        values.sort()
+        p95 = values[int(len(values) * 0.95) - 1]
+        print(f"  {source:<7} p50 {statistics.median(values):6.2f}ms  p95 {p95:6.2f}ms  max {values[-1]:6.2f}ms")
+    print("  tampered delivery rejected (401); pushed and polled GitHub IDs match")
+
+
+if __name__ == "__main__":
+    main()
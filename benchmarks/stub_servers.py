@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+class StubServer:
+    """
+    Tiny local HTTP server that impersonates an upstream API for benchmarks.
+    Routes map a request path (or a prefix ending in '/*') to a handler returning (status, headers, body),
+    and every response is delayed by `latency` seconds to mimic a slow round-trip.
+    """
+
+    def __init__(self, routes, latency=0.0):
+        self.routes = routes
+        self.latency = latency
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _prefix_route(self, path):
+        for pattern, route in self.routes.items():
+            if pattern.endswith("/*") and path.startswith(pattern[:-1]):
+                return route
+        return None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, Nagle + delayed ACK
+            # adds ~40ms to every keep-alive response and hides the cost we want to measure.
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                path = urlsplit(self.path).path
+                route = stub.routes.get(path) or stub._prefix_route(path)
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if route is None:
+                    status, headers, payload = 404, {}, {"error": "not found"}
+                else:
+                    status, headers, payload = route(self, body)
+
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", headers.pop("Content-Type", "application/json"))
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.bytes_sent += len(data)
+
+            do_GET = _dispatch
+            do_POST = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def json_route(payload, status=200, headers=None):
+    """Route that always answers with the same JSON document."""
+    return lambda handler, body: (status, dict(headers or {}), payload)
@@ -0,0 +1,298 @@
+"""
+Reproducible benchmark suite: throughput and peak memory of the pipeline's main paths,
+stored per run so regressions show up against the previous one.
+
+Every case runs on the same seeded MockGenerator.stream() load (--count items, --seed,
+timestamps relative to a fixed moment so scores do not drift with the clock):
+
+  normalize   raw items -> notifications (normalize_stage, batched per source)
+  score       PriorityEngine.process over the normalized notifications
+  store_write upserting the scored notifications into a fresh SQLite store
+  store_read  streaming every notification back out (iter_all)
+  store_query top-100 queries per priority (queries/s)
+  end_to_end  NotificationAggregator.run in demo mode with the load as its workload
+
+Each case is timed --repeat times (median reported), then run once more under tracemalloc
+for its peak Python heap. Results go to benchmarks/results/<time>-<commit>.json (asv-style:
+commit, machine, parameters, samples) and are compared with the latest earlier result for the
+same --count and --seed, or with --compare FILE. A case more than --threshold slower (or
+bigger) is flagged; with --fail-on-regression the exit status is then 1.
+
+Usage: python -m benchmarks.suite [--count 100000] [--seed 1] [--repeat 3] [--cases normalize,score]
+                                  [--compare FILE] [--threshold 0.1] [--fail-on-regression] [--no-save]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from backend.integrations.mock_generator import MockGenerator
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.pipeline import normalize_stage
+from backend.processing.priority_engine import PriorityEngine
+from backend.run_aggregator import NotificationAggregator
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# Every timestamp in the load is relative to this, and the engine's clock is pinned to it
+NOW = datetime(2026, 1, 15, 12, 0)
+# Peak memory changes smaller than this are noise, whatever the ratio
+MEMORY_NOISE_MIB = 1.0
+
+
+class Workload:
+    """The seeded load and the intermediate results the cases start from, built once and untimed."""
+
+    def __init__(self, count, seed, tmp):
+        self.count = count
+        self.seed = seed
+        self.tmp = tmp
+        self._raw = self._normalized = self._scored = None
+
+    def stream(self):
+        return MockGenerator(seed=self.seed, now=NOW).stream(self.count)
+
+    def raw(self):
+        if self._raw is None:
+            self._raw = list(self.stream())
+        return self._raw
+
+    def normalized(self):
+        if self._normalized is None:
+            self._normalized = list(normalize_stage(self.tagged(), NotificationNormalizer()))
+        return self._normalized
+
+    def scored(self):
+        if self._scored is None:
+            self._scored = engine().process(self.normalized())
+        return self._scored
+
+    def tagged(self):
+        return ((item["source"], item) for item in self.raw())
+
+    def store(self, name):
+        """A fresh SQLite store in the temp directory."""
+        path = os.path.join(self.tmp, name)
+        for suffix in ("", "-wal", "-shm", ".json"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return NotificationRepository(path + ".json", backend=SQLiteBackend(path))
+
+
+def engine():
+    scorer = PriorityEngine()
+    scorer.clock = NOW.timestamp
+    return scorer
+
+
+# --- Cases ---
+# Each prepares its input untimed through the Workload, then returns (units done, seconds).
+
+def case_normalize(load):
+    load.raw()
+    normalizer = NotificationNormalizer()
+    return timed(lambda: sum(1 for _ in normalize_stage(load.tagged(), normalizer)))
+
+
+def case_score(load):
+    notifications = load.normalized()
+    scorer = engine()
+    return timed(lambda: len(scorer.process(notifications)))
+
+
+def case_store_write(load):
+    notifications = load.scored()
+    repository = load.store("write.db")
+    try:
+        return timed(lambda: repository.upsert_stream(notifications) and len(notifications))
+    finally:
+        repository.backend.close()
+
+
+def case_store_read(load):
+    repository = _filled_store(load)
+    try:
+        return timed(lambda: sum(len(batch) for batch in repository.iter_all()))
+    finally:
+        repository.backend.close()
+
+
+def case_store_query(load, queries=100):
+    repository = _filled_store(load)
+    priorities = ["urgent", "high", "normal", "low"]
+    try:
+        return timed(lambda: sum(1 for i in range(queries) if repository.query(priority=priorities[i % 4], limit=100) is not None))
+    finally:
+        repository.backend.close()
+
+
+def case_end_to_end(load):
+    os.environ["DEMO_MODE"] = "true"
+    aggregator = NotificationAggregator(workload=load.stream)
+    aggregator.repository.backend.close()
+    aggregator.repository = load.store("e2e.db")
+    aggregator.priority_engine.clock = NOW.timestamp
+    try:
+        _, seconds = timed(aggregator.run)
+    finally:
+        aggregator.close()
+    return load.count, seconds
+
+
+def _filled_store(load):
+    if not hasattr(load, "read_store"):
+        repository = load.store("read.db")
+        repository.upsert_stream(load.scored())
+        repository.backend.close()
+        load.read_store = os.path.join(load.tmp, "read.db")
+    return NotificationRepository(load.read_store + ".json", backend=SQLiteBackend(load.read_store))
+
+
+CASES = {
+    "normalize": (case_normalize, "items/s"),
+    "score": (case_score, "items/s"),
+    "store_write": (case_store_write, "items/s"),
+    "store_read": (case_store_read, "items/s"),
+    "store_query": (case_store_query, "queries/s"),
+    "end_to_end": (case_end_to_end, "items/s"),
+}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    done = fn()
+    return done, time.perf_counter() - start
+
+
+def run_case(case, load, repeat):
+    """(median throughput, samples, peak MiB) of one case."""
+    samples = []
+    for _ in range(repeat):
+        done, seconds = case(load)
+        samples.append(done / seconds)
+    # Inputs are already built (and cached on the Workload), so the peak is the case's own
+    tracemalloc.start()
+    try:
+        case(load)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), samples, peak / 2 ** 20
+
+
+# --- Results ---
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                    text=True, cwd=os.path.dirname(RESULTS_DIR)).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def save(result):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%dT%H%M%S}-{result['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def previous_result(params, exclude=None):
+    """The latest stored result measured with the same parameters."""
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        if path == exclude:
+            continue
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        if {key: result["params"].get(key) for key in ("count", "seed")} == {key: params[key] for key in ("count", "seed")}:
+            return path, result
+    return None, None
+
+
+def compare(results, baseline, threshold):
+    """Prints each case against the baseline; returns the names of the cases that regressed."""
+    regressed = []
+    for name, current in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        speed = current["value"] / before["value"] - 1
+        memory = current["peak_mib"] / before["peak_mib"] - 1 if before["peak_mib"] else 0.0
+        flag = ""
+        if speed < -threshold or (memory > threshold and current["peak_mib"] - before["peak_mib"] > MEMORY_NOISE_MIB):
+            regressed.append(name)
+            flag = "  ❌ regression"
+        print(f"  {name:<12} {speed:+7.1%} throughput   {memory:+7.1%} peak memory{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="Items in the generated load")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases to run")
+    parser.add_argument("--compare", help="Result file to compare with (default: the latest with the same parameters)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown/growth that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run's results")
+    args = parser.parse_args()
+    names = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)} (known: {', '.join(CASES)})")
+    logging.getLogger().setLevel(logging.WARNING)
+
+    commit, dirty = git_commit()
+    params = {"count": args.count, "seed": args.seed, "repeat": args.repeat}
+    print(f"Benchmark suite at {commit}{' (uncommitted changes)' if dirty else ''}: "
+          f"{args.count} items, seed {args.seed}, median of {args.repeat}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        load = Workload(args.count, args.seed, tmp)
+        for name in names:
+            case, unit = CASES[name]
+            value, samples, peak = run_case(case, load, args.repeat)
+            results[name] = {"value": value, "unit": unit, "samples": samples, "peak_mib": peak}
+            print(f"  {name:<12} {value:14,.0f} {unit:<10} peak {peak:8.1f} MiB")
+
+    result = {
+        "commit": commit, "dirty": dirty, "date": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "params": params, "results": results,
+    }
+    path = None if args.no_save else save(result)
+    if path:
+        print(f"Saved {os.path.relpath(path)}")
+
+    if args.compare:
+        baseline_path = args.compare
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        baseline_path, baseline = previous_result(params, exclude=path)
+    if baseline is None:
+        print("No earlier result with these parameters to compare with")
+        return
+    print(f"Compared with {os.path.relpath(baseline_path)} ({baseline['commit']}, {baseline['date']}):")
+    regressed = compare(results, baseline, args.threshold)
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,32 @@ let globalData = [];
 // State for the calendar
 let currentCalendarDate = new Date();
 
+// Dashboard API (python -m backend.server). Same origin when the page is served by it; from anywhere
+// else the server has to allow this page's origin (--allow-origin), or the snapshot is used instead.
+const API_BASE = window.location.port === '8787' ? '' : 'http://127.0.0.1:8787';
+const POLL_INTERVAL_MS = 10000;
+const STREAM_LIMIT = 200;
+
+// One server-filtered view per panel. Each keeps its items by id and the cursor it is synced to,
+// so a poll only transfers what changed (or a 304 when nothing did). 'matches' mirrors the
+// server-side filter, so pushed changes can be sorted into panels here.
+const views = {
+    urgent:   { path: '/api/urgent', items: new Map(), cursor: null, matches: n => n.priority === 'urgent' },
+    high:     { path: '/api/high', items: new Map(), cursor: null, matches: n => n.priority === 'high' },
+    calendar: { path: '/api/calendar', items: new Map(), cursor: null, matches: n => n.source === 'calendar' },
+    stream:   { path: `/api/notifications?limit=${STREAM_LIMIT}`, items: new Map(), cursor: null, matches: () => true, limit: STREAM_LIMIT },
+};
+
+// True while the live-update stream is connected; polling only runs when it is not
+let live = false;
+
 document.addEventListener('DOMContentLoaded', () => {
     console.log("🚀 Clarity Hub Frontend Loaded");
     updateClock();
     setInterval(updateClock, 1000);
     loadNotifications();
+    connectLiveUpdates();
+    setInterval(() => { if (!live) loadNotifications(); }, POLL_INTERVAL_MS);
 
     // Connect Listeners
     connectClick('box-calendar', window.toggleCalendar);
@@ -107,12 +128,12 @@ window.openListModal = function(type) {
     let icon = '';
 
     if (type === 'urgent') {
-        items = globalData.filter(n => n.priority === 'urgent');
+        items = viewItems('urgent');
         color = 'red';
         icon = '<i class="fa-solid fa-triangle-exclamation"></i>';
         titleEl.innerHTML = `${icon} <span class="text-red-400">URGENT ALERTS</span>`;
     } else if (type === 'important') {
-        items = globalData.filter(n => n.priority === 'high');
+        items = viewItems('high');
         color = 'blue';
         icon = '<i class="fa-solid fa-circle-exclamation"></i>';
         titleEl.innerHTML = `${icon} <span class="text-blue-400">IMPORTANT ITEMS</span>`;
@@ -140,24 +161,106 @@ window.openListModal = function(type) {
 
 async function loadNotifications() {
     try {
-        const response = await fetch(`../notifications.json?t=${new Date().getTime()}`);
-        globalData = await response.json(); 
+        const names = Object.keys(views);
+        const changed = await Promise.all(names.map(name => syncView(views[name])));
+        renderPanels(names.filter((name, i) => changed[i]));
+    } catch (error) {
+        // API not running: fall back to the exported snapshot
+        console.warn("API unavailable, reading notifications.json", error);
+        try { await loadSnapshot(); } catch (snapshotError) { console.error(snapshotError); }
+    }
+}
 
-        const urgentItems = globalData.filter(n => n.priority === 'urgent');
-        renderList('urgent-container', urgentItems, 'red');
+// Fetches the view's changes since its cursor; returns whether anything changed
+async function syncView(view) {
+    const separator = view.path.includes('?') ? '&' : '?';
+    const url = API_BASE + view.path + (view.cursor ? `${separator}since=${encodeURIComponent(view.cursor)}` : '');
+    // Default cache mode: the browser revalidates with If-None-Match and hands back its copy on a 304
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`${view.path}: HTTP ${response.status}`);
+    const payload = await response.json();
+    if (payload.cursor === view.cursor && !payload.full) return false;
+
+    if (payload.full) view.items.clear();
+    payload.removed.forEach(id => view.items.delete(id));
+    payload.items.forEach(item => view.items.set(item.id, item));
+    view.cursor = payload.cursor;
+    return true;
+}
 
-        const highItems = globalData.filter(n => n.priority === 'high');
-        renderList('important-container', highItems, 'blue');
+async function loadSnapshot() {
+    const response = await fetch(`../notifications.json?t=${new Date().getTime()}`);
+    const data = await response.json();
+    const fill = (view, items) => {
+        view.items = new Map(items.map(n => [n.id, n]));
+        view.cursor = null;
+    };
+    fill(views.urgent, data.filter(n => n.priority === 'urgent'));
+    fill(views.high, data.filter(n => n.priority === 'high'));
+    fill(views.calendar, data.filter(n => n.source === 'calendar'));
+    fill(views.stream, data.slice(0, STREAM_LIMIT));
+    renderPanels();
+}
 
-        const calendarItems = globalData.filter(n => n.source === 'calendar');
-        renderList('calendar-container', calendarItems, 'purple');
+// === LIVE UPDATES (Server-Sent Events) ===
+
+function connectLiveUpdates() {
+    if (!window.EventSource) return;
+    const source = new EventSource(`${API_BASE}/api/events`);
+    // (Re)connected: one delta fetch covers whatever happened while we were away
+    source.onopen = () => { live = true; loadNotifications(); };
+    // EventSource reconnects by itself; polling fills in meanwhile
+    source.onerror = () => { live = false; };
+    source.addEventListener('notifications', event => applyChanges(JSON.parse(event.data)));
+    // We fell behind (or the dataset was replaced): catch up through the API
+    source.addEventListener('resync', () => loadNotifications());
+    source.addEventListener('reset', () => {
+        Object.values(views).forEach(view => { view.cursor = null; });
+        loadNotifications();
+    });
+}
 
-        renderStream('all-stream-container', globalData);
+// Sorts pushed changes into the panels and re-renders only the ones they touched.
+// View cursors are left alone: the next API sync re-reads these items, which is harmless.
+function applyChanges(payload) {
+    const touched = new Set();
+    for (const [name, view] of Object.entries(views)) {
+        for (const id of payload.removed) {
+            if (view.items.delete(id)) touched.add(name);
+        }
+        for (const item of payload.items) {
+            if (view.matches(item)) {
+                view.items.set(item.id, item);
+                touched.add(name);
+            } else if (view.items.delete(item.id)) {
+                touched.add(name);
+            }
+        }
+        if (view.limit && view.items.size > view.limit) {
+            view.items = new Map(viewItems(name).slice(0, view.limit).map(n => [n.id, n]));
+        }
+    }
+    renderPanels([...touched]);
+}
 
-        const favItems = globalData.slice(0, 2); 
-        renderList('favourites-container', favItems, 'yellow');
+// A view's items, highest score first
+function viewItems(name) {
+    return [...views[name].items.values()].sort((a, b) => (b.priority_score || 0) - (a.priority_score || 0));
+}
 
-    } catch (error) { console.error(error); }
+const PANELS = {
+    urgent: () => renderList('urgent-container', viewItems('urgent'), 'red'),
+    high: () => renderList('important-container', viewItems('high'), 'blue'),
+    calendar: () => renderList('calendar-container', viewItems('calendar'), 'purple'),
+    stream: () => {
+        globalData = viewItems('stream');
+        renderStream('all-stream-container', globalData);
+        renderList('favourites-container', globalData.slice(0, 2), 'yellow');
+    },
+};
+
+function renderPanels(names = Object.keys(PANELS)) {
+    names.forEach(name => PANELS[name]());
 }
 
 function renderList(containerId, items, colorTheme) {
@@ -170,8 +273,8 @@ function renderList(containerId, items, colorTheme) {
     container.innerHTML = items.map(item => `
         <div class="bg-white/5 border border-white/5 p-3 rounded-xl mb-2 hover:bg-white/10 transition group">
             <div class="flex justify-between items-start mb-1">
-                <span class="text-${colorTheme}-400 text-[10px] font-bold uppercase tracking-wider">${item.source}</span>
-                <span class="text-gray-500 text-[10px]">${formatTime(item.timestamp)}</span>
+                <span class="text-${colorTheme}-400 text-[10px] font-bold uppercase tracking-wider">${(item.sources || [item.source]).join(' · ')}${getCountBadge(item)}</span>
+                <span class="text-gray-500 text-[10px]">${formatTime(item)}</span>
             </div>
             <h4 class="text-gray-200 text-sm font-medium leading-tight group-hover:text-${colorTheme}-300 transition">${item.title}</h4>
         </div>
@@ -188,8 +291,8 @@ function renderStream(containerId, items) {
             </div>
             <div class="flex-1 min-w-0">
                 <div class="flex justify-between">
-                    <h4 class="text-sm font-medium text-gray-200 truncate pr-4">${item.title}</h4>
-                    <span class="text-[10px] text-gray-500 whitespace-nowrap">${formatTime(item.timestamp)}</span>
+                    <h4 class="text-sm font-medium text-gray-200 truncate pr-4">${item.title}${getCountBadge(item)}</h4>
+                    <span class="text-[10px] text-gray-500 whitespace-nowrap">${formatTime(item)}</span>
                 </div>
                 <p class="text-[11px] text-gray-500 truncate mt-0.5">${item.content}</p>
             </div>
@@ -221,10 +324,10 @@ function toggleModal(modalId, contentId, renderCallback) {
     }
 }
 
-function formatTime(isoString) {
-    const date = new Date(isoString);
-    const now = new Date();
-    const diffInSeconds = Math.floor((now - date) / 1000);
+// Relative age from the backend's epoch seconds (no date-string parsing per render)
+function formatTime(item) {
+    const epochMs = item.timestamp_epoch != null ? item.timestamp_epoch * 1000 : Date.parse(item.timestamp);
+    const diffInSeconds = Math.floor((Date.now() - epochMs) / 1000);
     const diffInMinutes = Math.floor(diffInSeconds / 60);
     const diffInHours = Math.floor(diffInMinutes / 60);
     const diffInDays = Math.floor(diffInHours / 24);
@@ -239,6 +342,12 @@ function getSourceIcon(source) {
     return map[source] || '<i class="fa-solid fa-circle text-gray-500"></i>';
 }
 
+// Duplicates folded into this notification by the backend (same incident from several places)
+function getCountBadge(item) {
+    if (!item.count || item.count < 2) return '';
+    return ` <span class="ml-1 px-1.5 rounded bg-white/10 text-gray-400 text-[9px] font-bold normal-case">×${item.count}</span>`;
+}
+
 function getPriorityBadge(priority) {
     if (priority === 'urgent') return `<span class="w-2 h-2 rounded-full bg-red-500 shadow-[0_0_8px_rgba(239,68,68,0.6)]"></span>`;
     if (priority === 'high') return `<span class="w-2 h-2 rounded-full bg-blue-500"></span>`;
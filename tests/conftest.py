@@ -0,0 +1,49 @@
+import pytest
+
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.scoring_config import ScoringConfig
+from backend.storage.backends import SQLiteBackend
+from backend.storage.repository import NotificationRepository
+
+# The fixed "now" engines are clocked at, so recency bonuses do not depend on when tests run
+NOW = 1_767_000_000.0
+
+
+@pytest.fixture
+def now():
+    return NOW
+
+
+@pytest.fixture
+def make_engine():
+    """make_engine(config=None, now=NOW, matcher=None): a PriorityEngine on 'config' (default: the defaults), clocked at 'now'."""
+    def make(config=None, now=NOW, matcher=None):
+        engine = PriorityEngine(config=ScoringConfig() if config is None else config, matcher=matcher)
+        engine.clock = lambda: now
+        return engine
+    return make
+
+
+@pytest.fixture
+def make_note():
+    """make_note(id, title="", content="", **fields): a normalized Slack message from a non-VIP sender."""
+    def make(id, title="", content="", **fields):
+        return {"id": id, "source": "slack", "type": "message", "title": title, "content": content,
+                "sender": {"name": "Alex", "email": "alex@company.com"}, "tags": [], "priority": "normal", **fields}
+    return make
+
+
+@pytest.fixture
+def make_repository(tmp_path):
+    """make_repository(**kwargs): a repository on a SQLite store in tmp_path, closed after the test."""
+    repositories = []
+
+    def make(**kwargs):
+        repository = NotificationRepository(str(tmp_path / "notifications.json"),
+                                            backend=SQLiteBackend(str(tmp_path / "notifications.db")), **kwargs)
+        repositories.append(repository)
+        return repository
+
+    yield make
+    for repository in repositories:
+        repository.backend.close()
@@ -0,0 +1,39 @@
+import copy
+
+import pytest
+
+from backend.processing.backfill import rescore_history
+from backend.processing.priority_engine import PriorityEngine
+from backend.processing.scoring_config import ScoringConfig
+
+TITLES = ["İ" * 30, "urgent", "nothing to see", "ÇALIŞMA İZNİ: deploy failed", "Straße gesperrt, bitte ASAP",
+          "Weekly sync", "İSTANBUL: service down", "FYI"]
+
+
+def history(count=400):
+    senders = [{"name": "Alex", "email": "alex@company.com"}, {"name": "Boss <boss@company.com>", "email": ""}]
+    return [{
+        "id": str(i), "source": "slack", "type": ["message", "dm", "mention"][i % 3],
+        "title": TITLES[i % len(TITLES)], "content": TITLES[(i * 3) % len(TITLES)],
+        "sender": senders[i % 2], "tags": [], "priority": "normal", "timestamp_epoch": None,
+    } for i in range(count)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_backfill_matches_scoring_each_item(tmp_path, monkeypatch, make_repository, workers):
+    monkeypatch.delenv("SCORING_CONFIG", raising=False)
+    monkeypatch.setattr("backend.processing.scoring_config.SCORING_CONFIG_PATH", str(tmp_path / "scoring.json"))
+    notes = history()
+    repository = make_repository()
+    repository.upsert_all(copy.deepcopy(notes), snapshot=False)
+
+    assert rescore_history(repository, workers=workers, chunk_size=50, progress=lambda *a: None) == len(notes)
+
+    engine = PriorityEngine(config=ScoringConfig())
+    expected = {}
+    for note in notes:
+        scored = engine.process([copy.deepcopy(note)])[0]
+        expected[scored["id"]] = (scored["priority_score"], scored["priority"], scored["priority_reasons"])
+    stored = {n["id"]: (n["priority_score"], n["priority"], list(n["priority_reasons"])) for n in repository.iter_all()}
+    assert stored == expected
+    assert stored["1"][2][0] == "Keyword Match: 'urgent' at 0"
@@ -0,0 +1,13 @@
+import pytest
+
+from backend.daemon import AggregatorDaemon
+
+
+class IdleAggregator:
+    demo_mode = False
+    fetchers = {}
+
+
+def test_no_sources_configured_is_a_clear_error():
+    with pytest.raises(ValueError, match="No sources configured"):
+        AggregatorDaemon(IdleAggregator())
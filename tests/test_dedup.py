@@ -0,0 +1,74 @@
+import pytest
+
+from backend.processing.dedup import DedupIndex, Deduplicator
+from backend.processing.scoring_config import ScoringConfig
+
+INCIDENT = "Production database is down and checkout is failing for every customer"
+
+
+@pytest.fixture
+def note(make_note, now):
+    def make(id, title, content="", sender=("Alert Bot", "bot@company.com"), channel="#ops", tags=(), at=now, **fields):
+        return make_note(id, title, content, sender={"name": sender[0], "email": sender[1]}, channel=channel,
+                         tags=list(tags), timestamp=str(at), timestamp_epoch=at, **fields)
+    return make
+
+
+def dedup(tmp_path=None, engine=None):
+    index = DedupIndex(str(tmp_path / "index.db")) if tmp_path else None
+    return Deduplicator(index, is_vip=engine.is_vip if engine else None)
+
+
+def ids(stage, items):
+    return sorted(item["id"] for item in stage.stage(items))
+
+
+def test_the_same_short_question_from_different_people_is_not_merged(note):
+    items = [note("slack:C1:1", "can you look at this?", sender=("Bot", "bot@company.com"), channel="#random"),
+             note("slack:D1:2", "can you look at this?", type="dm", sender=("Boss", "boss@company.com"), channel="DM")]
+    assert ids(dedup(), items) == ["slack:C1:1", "slack:D1:2"]
+
+
+def test_repeats_from_the_same_sender_and_channel_are_folded(note, now):
+    stage = dedup()
+    folded = list(stage.stage([note(f"slack:C1:{i}", "can you look at this?", at=now + i) for i in range(3)]))
+    assert [(n["id"], n["count"]) for n in folded] == [("slack:C1:0", 3)]
+
+
+def test_different_tickets_with_the_same_title_are_not_merged(tmp_path, note):
+    items = [note(f"acme/api#{n}", "Update dependencies", "Repo: api", source="github", type="pr",
+                  sender=("Dependabot", ""), channel="acme/api") for n in (1, 2)]
+    # Long enough for the near-duplicate path too
+    items += [note(f"acme/web#{n}", f"Update dependencies to the latest minor versions across the {n} web packages",
+                   source="github", type="pr", sender=("Dependabot", ""), channel="acme/web") for n in (3, 4)]
+    stage = dedup(tmp_path)
+    assert ids(stage, items) == ["acme/api#1", "acme/api#2", "acme/web#3", "acme/web#4"]
+    # ... also against clusters spilled to disk by an earlier run
+    stage.close()
+    again = dedup(tmp_path)
+    assert ids(again, [note("acme/api#5", "Update dependencies", "Repo: api", source="github", type="pr",
+                            sender=("Dependabot", ""), channel="acme/api")]) == ["acme/api#5"]
+    again.close()
+
+
+def test_the_same_incident_from_two_sources_is_still_folded(note):
+    items = [note("slack:C1:1", INCIDENT), note("OPS-7", INCIDENT, source="jira", type="ticket",
+                                                sender=("Jira", "jira@company.com"), channel="OPS")]
+    folded = list(dedup().stage(items))
+    assert [(n["id"], n["count"], n["sources"]) for n in folded] == [("slack:C1:1", 2, ["slack", "jira"])]
+
+
+def test_the_kept_item_takes_the_strongest_features_of_its_duplicates(make_engine, note, now):
+    engine = make_engine(ScoringConfig(vip_senders=["boss@company.com"]))
+    stage = dedup(engine=engine)
+    items = [note("slack:C1:1", INCIDENT),
+             note("slack:D1:2", INCIDENT, type="dm", sender=("Boss", "boss@company.com"), channel="DM"),
+             note("discord:3", INCIDENT, source="discord", tags=["mention"], sender=("Pat", ""), channel="ops")]
+    (kept,) = stage.stage(items)
+    assert kept["id"] == "slack:C1:1" and kept["count"] == 3
+    reasons = engine.process([kept])[0]["priority_reasons"]
+    assert {"VIP Sender", "Direct Message", "Direct Mention"} <= set(reasons)
+
+    # The canonical polled again, as it was first seen, keeps what it took
+    (repolled,) = stage.stage([note("slack:C1:1", INCIDENT, at=now + 60)])
+    assert set(engine.process([repolled])[0]["priority_reasons"]) >= {"VIP Sender", "Direct Message", "Direct Mention"}
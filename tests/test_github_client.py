@@ -0,0 +1,88 @@
+from urllib.parse import parse_qs, urlsplit
+
+from backend.integrations.github_client import GitHubClient
+from backend.run_aggregator import NotificationAggregator
+from backend.tenants import Tenant
+
+
+class FakeResponse:
+    def __init__(self, items, next_url=None):
+        self.status_code = 200
+        self.text = ""
+        self._items = items
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def json(self):
+        return {"items": self._items}
+
+
+class FakeSearch:
+    """The search API over a fixed set of issues: 'state:open' and 'updated:>=' filters, oldest-first, paged."""
+
+    def __init__(self, reviews, assigned):
+        self.issues = {"review-requested": reviews, "assignee": assigned}
+
+    def get(self, url, params=None, **kwargs):
+        if params is None:
+            params = {k: v[0] for k, v in parse_qs(urlsplit(url).query).items()}
+        query = params["q"]
+        found = self.issues["review-requested" if "review-requested" in query else "assignee"]
+        if "state:open" in query:
+            found = [issue for issue in found if issue["state"] == "open"]
+        if "updated:>=" in query:
+            since = query.split("updated:>=")[1]
+            found = [issue for issue in found if issue["updated_at"] >= since]
+        found = sorted(found, key=lambda issue: issue["updated_at"], reverse=params.get("order") != "asc")
+        page, size = int(params.get("page", 1)), int(params["per_page"])
+        rest = f"http://stub/search/issues?q={query}&order={params.get('order', 'desc')}&per_page={size}&page={page + 1}"
+        return FakeResponse(found[(page - 1) * size:page * size], rest if page * size < len(found) else None)
+
+
+def issues(prefix, count):
+    return [{"number": i, "title": f"{prefix} {i}", "state": "open", "repository_url": f"https://api.github.com/repos/acme/{prefix}",
+             "updated_at": f"2026-01-{1 + i // 24:02d}T{i % 24:02d}:00:00Z"} for i in range(count)]
+
+
+def sync(client, since, max_items):
+    delivered = {item["title"] for page in client.iter_pages(since=since, page_size=10, max_items=max_items)
+                 for item in page}
+    return delivered, client.sync_cursor
+
+
+def test_budget_cut_keeps_what_was_skipped_for_the_next_run():
+    reviews, assigned = issues("review", 70), issues("assigned", 25)
+    client = GitHubClient(transport=FakeSearch(reviews, assigned), env={"GITHUB_TOKEN": "t"})
+    seen, cursor = set(), None
+    for _ in range(10):
+        delivered, cursor = sync(client, cursor, max_items=40)
+        seen |= delivered
+    assert seen == {issue["title"] for issue in reviews + assigned}
+
+
+def test_cursor_moves_to_the_newest_item_when_nothing_was_cut():
+    reviews, assigned = issues("review", 5), issues("assigned", 8)
+    client = GitHubClient(transport=FakeSearch(reviews, assigned), env={"GITHUB_TOKEN": "t"})
+    delivered, cursor = sync(client, None, max_items=100)
+    assert len(delivered) == 13
+    assert cursor == assigned[-1]["updated_at"]
+
+
+def test_an_item_closed_between_syncs_leaves_the_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEMO_MODE", "false")
+    monkeypatch.setattr("backend.run_aggregator.METRICS_PATH", str(tmp_path / "metrics.prom"))
+    monkeypatch.setattr("backend.run_aggregator.get_shared_score_cache", lambda: None)
+    reviews, assigned = issues("review", 3), issues("assigned", 2)
+    tenant = Tenant("t", str(tmp_path), env={"GITHUB_TOKEN": "t", "ENABLED_SOURCES": "github"})
+    aggregator = NotificationAggregator(tenant=tenant)
+    aggregator._clients["github"] = GitHubClient(transport=FakeSearch(reviews, assigned), env=tenant.env)
+
+    aggregator.run()
+    assert aggregator.repository.get("acme/review#1")["title"] == "Review Required: review 1"
+    assert aggregator.repository.count() == 5
+
+    # Merged after the first sync: the open-only search would never return it again
+    reviews[1].update(state="closed", updated_at="2026-02-01T00:00:00Z")
+    aggregator.run()
+    assert aggregator.repository.get("acme/review#1") is None
+    assert aggregator.repository.count() == 4
+    aggregator.close()
@@ -0,0 +1,158 @@
+import httplib2
+from googleapiclient.errors import HttpError
+
+from backend.integrations.gmail_integration import GmailIntegration
+from backend.integrations.rate_limiter import RateLimitScheduler
+
+
+class FakeRequest:
+    def __init__(self, answer, **params):
+        self.answer = answer
+        self.params = params
+
+    def execute(self):
+        return self.answer(**self.params)
+
+
+class FakeBatch:
+    def __init__(self, gmail, callback):
+        self.gmail = gmail
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        self.gmail.batches.append([request_id for _, request_id in self.requests])
+        for request, request_id in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class FakeGmail:
+    """
+    The parts of the Gmail API client the integration uses, over an in-memory mailbox whose
+    History API lists one record per delivered email. 'failures' maps a message ID to the
+    HTTP statuses its next messages.get calls fail with.
+    """
+
+    def __init__(self, count=0):
+        self.ids = []
+        self.records = []
+        self.batches = []
+        self.failures = {}
+        self.deliver(count)
+
+    def deliver(self, count):
+        for _ in range(count):
+            message_id = f"{len(self.ids) + 1:016x}"
+            self.ids.append(message_id)
+            self.records.append({"id": str(1000 + len(self.records)), "messagesAdded": [
+                {"message": {"id": message_id, "labelIds": ["INBOX", "UNREAD"]}}]})
+
+    def users(self):
+        return self
+
+    def history(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def getProfile(self, userId):
+        return FakeRequest(lambda: {"historyId": self.records[-1]["id"] if self.records else "999"})
+
+    def list(self, **params):
+        if "startHistoryId" in params:
+            return FakeRequest(self._history, **params)
+        return FakeRequest(self._unread, **params)
+
+    def get(self, **params):
+        return FakeRequest(self._message, **params)
+
+    def _history(self, startHistoryId, pageToken="0", **params):
+        records = [r for r in self.records if int(r["id"]) > int(startHistoryId)]
+        start = int(pageToken)
+        page = {"history": records[start:start + 100]}
+        if start + 100 < len(records):
+            page["nextPageToken"] = str(start + 100)
+        return page
+
+    def _unread(self, maxResults, pageToken="0", **params):
+        newest_first = list(reversed(self.ids))
+        start = int(pageToken)
+        page = {"messages": [{"id": i} for i in newest_first[start:start + maxResults]]}
+        if start + maxResults < len(newest_first):
+            page["nextPageToken"] = str(start + maxResults)
+        return page
+
+    def _message(self, id, **params):
+        if self.failures.get(id):
+            status = self.failures[id].pop(0)
+            raise HttpError(httplib2.Response({"status": status, "retry-after": "0"}), b"{}")
+        return {"id": id, "snippet": f"Body of {id}", "payload": {"headers": [
+            {"name": "Subject", "value": f"Email {id}"}, {"name": "From", "value": "Pat <pat@example.com>"}]}}
+
+
+def client(gmail):
+    return GmailIntegration(service=gmail, scheduler=RateLimitScheduler(limits={"gmail": (1000, 1000)}))
+
+
+def sync(integration, history_id, max_items):
+    delivered = {email["id"] for page in integration.iter_pages(history_id=history_id, page_size=10, max_items=max_items)
+                 for email in page}
+    return delivered, integration.sync_cursor
+
+
+def test_budget_cut_keeps_what_was_skipped_for_the_next_run():
+    gmail = FakeGmail(5)
+    integration = client(gmail)
+    seen, cursor = sync(integration, None, max_items=40)
+    assert len(seen) == 5 and cursor == gmail.records[-1]["id"]
+
+    # A burst bigger than the budget, and more arriving while it is worked through
+    gmail.deliver(95)
+    for _ in range(5):
+        delivered, cursor = sync(integration, cursor, max_items=40)
+        seen |= delivered
+        gmail.deliver(3)
+    assert seen == set(gmail.ids[:-3])
+    assert cursor == gmail.records[-4]["id"]
+
+
+def test_details_are_fetched_in_batches_of_batch_size():
+    gmail = FakeGmail(120)
+    emails = client(gmail)._fetch_details([{"id": i} for i in gmail.ids])
+    assert [len(batch) for batch in gmail.batches] == [50, 50, 20]
+    assert [e["id"] for e in emails] == gmail.ids
+    assert emails[0] == {"id": gmail.ids[0], "subject": f"Email {gmail.ids[0]}", "from": "Pat <pat@example.com>",
+                         "snippet": f"Body of {gmail.ids[0]}"}
+
+
+def test_a_partly_throttled_batch_resends_only_the_throttled_calls():
+    gmail = FakeGmail(60)
+    throttled = [gmail.ids[3], gmail.ids[52]]
+    for message_id in throttled:
+        gmail.failures[message_id] = [429]
+    emails = client(gmail)._fetch_details([{"id": i} for i in gmail.ids])
+    assert [e["id"] for e in emails] == gmail.ids
+    assert gmail.batches == [gmail.ids[:50], [gmail.ids[3]], gmail.ids[50:], [gmail.ids[52]]]
+
+
+def test_a_failed_call_drops_the_page_and_keeps_the_cursor():
+    gmail = FakeGmail(5)
+    integration = client(gmail)
+    _, cursor = sync(integration, None, max_items=40)
+
+    gmail.deliver(10)
+    gmail.failures[gmail.ids[7]] = [500]
+    assert sync(integration, cursor, max_items=40) == (set(), cursor)
+    # Nothing was lost: the next run fetches the same emails
+    delivered, _ = sync(integration, cursor, max_items=40)
+    assert delivered == set(gmail.ids[5:])
@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_the_aggregator_does_not_import_the_provider_sdks():
+    # In a fresh interpreter: other tests import the SDKs into this one
+    check = ("import sys, backend.run_aggregator; "
+             "print(sorted(m for m in ('slack_sdk', 'googleapiclient') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
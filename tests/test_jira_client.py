@@ -0,0 +1,46 @@
+from backend.integrations.jira_client import JiraClient
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeJira:
+    """The search endpoint over a fixed set of issues; understands the 'statusCategory != Done' clause."""
+
+    def __init__(self, issues):
+        self.issues = issues
+        self.queries = []
+
+    def get(self, url, params=None, **kwargs):
+        self.queries.append(params["jql"])
+        found = [issue for issue in self.issues if "statusCategory != Done" not in params["jql"]
+                 or not JiraClient.is_resolved(issue)]
+        start, size = params["startAt"], params["maxResults"]
+        return FakeResponse({"issues": found[start:start + size], "total": len(found)})
+
+
+def issue(number, category="indeterminate", updated="2026-01-20T10:00:00.000+0000"):
+    return {"id": str(10000 + number), "key": f"OPS-{number}", "fields": {
+        "summary": f"Ticket {number}", "updated": updated,
+        "status": {"name": "Done" if category == "done" else "In Progress", "statusCategory": {"key": category}}}}
+
+
+def test_a_ticket_resolved_between_syncs_is_reported_resolved():
+    jira = FakeJira([issue(1), issue(2)])
+    client = JiraClient(transport=jira, env={"JIRA_DOMAIN": "acme", "JIRA_EMAIL": "me@acme.com", "JIRA_API_TOKEN": "t"})
+    first = [i["key"] for page in client.iter_pages() for i in page]
+    assert first == ["OPS-1", "OPS-2"] and client.resolved == []
+
+    jira.issues[1] = issue(2, "done", updated="2026-01-21T10:00:00.000+0000")
+    second = [i["key"] for page in client.iter_pages(since=client.sync_cursor) for i in page]
+    assert second == ["OPS-1"]
+    assert [i["key"] for i in client.resolved] == ["OPS-2"]
+    assert "statusCategory" not in jira.queries[-1]
+    assert client.sync_cursor == "2026-01-21T10:00:00.000+0000"
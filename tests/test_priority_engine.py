@@ -0,0 +1,84 @@
+import copy
+
+import pytest
+
+from backend.processing.keyword_matcher import KeywordMatcher
+from backend.processing.scoring_config import ScoringConfig
+
+
+def outcome(scored):
+    return {n["id"]: (n["priority_score"], n["priority"], n["priority_reasons"]) for n in scored}
+
+
+def test_mixed_script_batch_scores_like_each_item_alone(make_engine, make_note):
+    note = make_note
+    # 'İ' lowercases to two characters; nothing after it may shift onto another notification
+    batch = [note("1", "İ" * 30), note("2", "urgent"), note("3", "nothing to see"),
+             note("4", "ÇALIŞMA İZNİ: deploy failed", "Straße gesperrt, bitte ASAP"), note("5", "Weekly sync")]
+    together = outcome(make_engine().process(copy.deepcopy(batch)))
+    alone = {}
+    for item in batch:
+        alone.update(outcome(make_engine().process([copy.deepcopy(item)])))
+    assert together == alone
+    assert together["2"][2][0] == "Keyword Match: 'urgent' at 0"
+    assert not any(reason.startswith("Keyword Match") for reason in together["3"][2])
+
+
+def test_keyword_offsets_point_into_the_original_text():
+    matcher = KeywordMatcher(["urgent", "deploy failed"])
+    text = "ÇALIŞMA İZNİ: deploy failed, urgent"
+    matches = matcher.find_all(text)
+    assert [m.keyword for m in matches] == ["deploy failed", "urgent"]
+    for m in matches:
+        assert text[m.start:m.end].lower() == m.keyword
+    assert matcher.search("İİ urgent").start == 3
+
+
+@pytest.fixture
+def reasons(make_engine, make_note):
+    def score(config, text, matcher=None):
+        return make_engine(config, matcher=matcher).process([make_note("1", text)])[0]["priority_reasons"]
+    return score
+
+
+def test_overlapping_keyword_lists_are_matched_independently(reasons):
+    # 'failure' is an urgent keyword, 'fail' only a critical term: the longer match must not hide the shorter
+    config = ScoringConfig(urgent_keywords=["failure"], critical_terms=["fail"])
+    assert reasons(config, "Disk failure") == ["Keyword Match: 'failure' at 5", "Critical Terminology"]
+    # ... and the other way round
+    config = ScoringConfig(urgent_keywords=["fail"], critical_terms=["failure"])
+    assert reasons(config, "Disk failure") == ["Keyword Match: 'fail' at 5", "Critical Terminology"]
+    # A term inside a longer phrase of the other list
+    config = ScoringConfig(urgent_keywords=["deploy failed"], critical_terms=["fail"])
+    assert reasons(config, "deploy failed") == ["Keyword Match: 'deploy failed' at 0", "Critical Terminology"]
+
+
+def test_a_shared_matcher_scores_like_the_tenants_own(reasons):
+    config = ScoringConfig(urgent_keywords=["fail"], critical_terms=["crash"])
+    # Another tenant's longer keywords overlap ours
+    shared = KeywordMatcher(["fail", "crash", "failure", "crash loop"])
+    for text in ("failure", "crash loop detected", "no match here"):
+        assert reasons(config, text, matcher=shared) == reasons(config, text)
+
+
+def test_find_every_reports_each_keyword_at_each_start():
+    matcher = KeywordMatcher(["fail", "failure", "deploy failed"])
+    assert [(m.keyword, m.start) for m in matcher.find_every("deploy failed: failure")] == \
+        [("deploy failed", 0), ("fail", 7), ("failure", 15), ("fail", 15)]
+    assert [m.keyword for m in matcher.find_all("deploy failed: failure")] == ["deploy failed", "failure"]
+
+
+def test_the_batch_path_scores_like_the_scalar_one(make_engine, make_note, now):
+    note = make_note
+    config = ScoringConfig(urgent_keywords=["fail", "urgent"], critical_terms=["failure", "crash"],
+                           vip_senders=["boss@company.com"])
+    batch = [note("1", "İ" * 30 + " urgent"), note("2", "Disk failure"), note("3", "ÇALIŞMA İZNİ: crash, URGENT"),
+             note("4", "nothing to see"), dict(note("5", "fail", "hi"), tags=["dm", "mention"]),
+             dict(note("6", "Lunch?"), priority="urgent"), dict(note("7", "ok"), timestamp_epoch=now - 600),
+             dict(note("8", "urgent"), sender={"name": "Boss <boss@company.com>", "email": ""})]
+    for shared in (None, KeywordMatcher(["fail", "failure", "crash", "crash loop", "urgent", "urgently"])):
+        scalar, vectorized = make_engine(config, matcher=shared), make_engine(config, matcher=shared)
+        expected = scalar.process(copy.deepcopy(batch))
+        assert [n["id"] for n in vectorized.process_batch(copy.deepcopy(batch))] == [n["id"] for n in expected]
+        assert outcome(vectorized.process_batch(copy.deepcopy(batch))) == outcome(expected)
+    assert outcome(expected)["3"][2][:2] == ["Keyword Match: 'urgent' at 21", "Critical Terminology"]
@@ -0,0 +1,93 @@
+import pytest
+
+from backend.integrations import rate_limiter
+from backend.integrations.rate_limiter import RateLimitExceeded, RateLimitScheduler
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep: sleeping only moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    # No jitter, so waits are exact
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: 0.0)
+    return clock
+
+
+def responses(*answers):
+    """A send() that plays back (status, headers) answers, then keeps repeating the last one."""
+    answers = list(answers)
+    calls = []
+
+    def send():
+        calls.append(len(calls))
+        status, headers = answers.pop(0) if len(answers) > 1 else answers[0]
+        return f"response {len(calls)}", status, headers
+
+    send.calls = calls
+    return send
+
+
+def scheduler(**kwargs):
+    return RateLimitScheduler(limits={"github": (10, 10)}, **kwargs)
+
+
+def test_a_throttled_call_waits_out_retry_after(clock):
+    limiter = scheduler()
+    send = responses((429, {"Retry-After": "2"}), (200, {}))
+    assert limiter.call("github", "search", send) == "response 2"
+    assert clock.sleeps == [2.0]
+    stats = limiter.stats()["github"]
+    assert (stats["requests"], stats["throttled"], stats["retries"]) == (2, 1, 1)
+
+
+def test_rate_limit_headers_pace_the_next_calls(clock):
+    limiter = scheduler()
+    # Quota spent until the window resets in 5s: the next call waits for it
+    limiter.call("github", "search", responses((200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "5"})))
+    limiter.call("github", "search", responses((200, {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "2"})))
+    assert clock.sleeps == [5.0]
+    # 4 calls left over 2s: the bucket now refills at 2 calls a second and has 4 banked
+    assert limiter.buckets[("github", "search")].rate == 2.0
+    for _ in range(5):
+        limiter.acquire("github", "search")
+    assert clock.sleeps == [5.0, 0.5]
+    # GitHub's 403 with no calls left is throttling too, and X-RateLimit-Reset is an epoch
+    send = responses((403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(rate_limiter.time.time() + 30)}),
+                     (200, {}))
+    assert limiter.call("github", "core", send) == "response 2"
+    assert 29 <= clock.sleeps[-1] <= 30
+
+
+def test_gives_up_after_max_retries(clock):
+    limiter = scheduler(max_retries=2)
+    send = responses((429, {"Retry-After": "1"}))
+    # The last throttled answer is handed back for the caller to raise
+    assert limiter.call("github", "search", send) == "response 3"
+    assert len(send.calls) == 3
+    assert limiter.stats()["github"]["throttled"] == 3
+
+
+def test_fails_fast_rather_than_wait_past_max_wait(clock):
+    limiter = scheduler(max_wait=10)
+    send = responses((429, {"Retry-After": "60"}), (200, {}))
+    with pytest.raises(RateLimitExceeded):
+        limiter.call("github", "search", send)
+    assert len(send.calls) == 1 and clock.sleeps == []
+    # The slot it did not use is handed back
+    assert limiter.buckets[("github", "search")].tokens == 9
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.processing.backfill import refresh_recency
+from backend.processing.scoring_config import ScoringConfig
+from backend.processing.timestamps import HOUR
+
+
+@pytest.fixture
+def engine(make_engine):
+    # A DM with a keyword scores 60: 'high' only while it has most of the recency bonus
+    return lambda now: make_engine(ScoringConfig(thresholds={"high": 65}), now=now)
+
+
+@pytest.fixture
+def note(make_note):
+    return lambda id, epoch: make_note(id, "deadline", type="dm", timestamp_epoch=epoch,
+                                       sender={"name": "Pat", "email": "pat@example.com"})
+
+
+@pytest.fixture
+def store(make_repository, engine):
+    def scored(items, now):
+        repo = make_repository()
+        repo.upsert_all(engine(now).process(items))
+        return repo
+    return scored
+
+
+def test_recency_bonus_fades_from_stored_scores(engine, note, store, now):
+    items = [note("fresh", now - 600), note("old", now - 30 * HOUR), note("upcoming", now + 30 * HOUR)]
+    repo = store(items, now)
+    assert (repo.get("fresh")["priority"], repo.get("fresh")["priority_score"]) == ("high", 70)
+    refresh_recency(repo, engine(now))
+
+    # Two days later the fresh item has lost its bonus, and the upcoming event is close enough to gain one
+    looked_at, rewritten = refresh_recency(repo, engine(now + 48 * HOUR))
+    fresh, upcoming = repo.get("fresh"), repo.get("upcoming")
+    assert (fresh["priority"], fresh["priority_score"], fresh["priority_reasons"]) == \
+        ("normal", 60, ["Keyword Match: 'deadline' at 0", "Direct Message"])
+    assert upcoming["priority_score"] > 60 and "Recent Activity" in upcoming["priority_reasons"]
+    assert rewritten == 2  # 'old' never had a bonus
+    assert repo.count(priority="high") == 0  # The urgent/high views no longer list it
+
+    # Nothing moved since: nothing to rewrite
+    assert refresh_recency(repo, engine(now + 48 * HOUR))[1] == 0
+
+
+def test_first_refresh_finds_bonuses_given_long_ago(engine, note, store, now):
+    # A store scored before refreshes existed, with no refresh time recorded
+    repo = store([note("stale", now - 600), note("plain", now - 40 * HOUR)], now)
+    looked_at, rewritten = refresh_recency(repo, engine(now + 30 * 24 * HOUR))
+    assert (looked_at, rewritten) == (1, 1)
+    assert (repo.get("stale")["priority"], repo.get("stale")["priority_score"]) == ("normal", 60)
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def note(make_note):
+    return lambda id: make_note(id, f"item {id}", priority_score=10)
+
+
+def test_writes_do_not_export_a_snapshot_by_default(make_repository, note):
+    repo = make_repository()
+    repo.upsert_all([note("1")])
+    repo.upsert_stream([note("2")])
+    repo.save_all([note("3")])
+    assert not os.path.exists(repo.filepath)
+
+
+def test_snapshot_is_exported_only_when_the_store_changed(make_repository, note):
+    repo = make_repository(export_snapshots=True)
+    repo.upsert_all([note("1"), note("2")])
+    with open(repo.filepath) as f:
+        assert {n["id"] for n in json.load(f)} == {"1", "2"}
+
+    os.utime(repo.filepath, ns=(0, 0))
+    repo.export_snapshot()
+    assert os.stat(repo.filepath).st_mtime_ns == 0
+
+    repo.upsert_all([note("3")])
+    with open(repo.filepath) as f:
+        assert len(json.load(f)) == 3
+
+
+def test_remove_deletes_rows_and_their_index_entries(make_repository, note):
+    repo = make_repository()
+    repo.upsert_all([note("1"), note("2")])
+    epoch, _ = repo.version()
+    assert repo.remove(["2", "missing"]) == 1
+    assert repo.get("2") is None and repo.count() == 1
+    assert repo.backend.match_ids(keywords=["item"]) == {"1"}
+    # Delta readers holding the old cursor get the full view
+    assert repo.version()[0] != epoch
+    assert repo.remove(["2"]) == 0
@@ -0,0 +1,26 @@
+import json
+import threading
+import time
+
+from backend.processing.priority_engine import PriorityEngine
+from backend.server.__main__ import watch_scoring
+
+
+def test_the_receiver_picks_up_scoring_config_edits(tmp_path, monkeypatch):
+    path = tmp_path / "scoring.json"
+    path.write_text(json.dumps({"urgent_keywords": ["urgent"]}))
+    monkeypatch.setenv("SCORING_CONFIG", str(path))
+    engine = PriorityEngine()
+    stop = threading.Event()
+    watcher = threading.Thread(target=watch_scoring, args=(engine, stop, 0.01))
+    watcher.start()
+    try:
+        time.sleep(0.05)
+        path.write_text(json.dumps({"urgent_keywords": ["outage", "sev-1"]}))
+        deadline = time.monotonic() + 5
+        while engine.rules.urgent_keywords != {"outage", "sev-1"} and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert engine.rules.urgent_keywords == {"outage", "sev-1"}
+    finally:
+        stop.set()
+        watcher.join()
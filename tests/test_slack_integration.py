@@ -0,0 +1,74 @@
+from slack_sdk.errors import SlackApiError
+
+from backend.integrations.rate_limiter import RateLimitScheduler
+from backend.integrations.slack_integration import SlackIntegration
+
+
+class FakeResponse(dict):
+    status_code = 200
+    headers = {}
+
+
+class FakeSlack:
+    """conversations.history over a fixed channel: newest first, 'oldest' exclusive, cursor-paged."""
+
+    def __init__(self, count):
+        self.messages = []
+        self.post(count)
+
+    def post(self, count):
+        start = len(self.messages)
+        self.messages += [{"ts": f"{1_767_000_000 + i}.000100", "text": f"message {i}"} for i in range(start, start + count)]
+
+    def api_call(self, method, http_verb="GET", params=None):
+        found = [m for m in reversed(self.messages) if "oldest" not in params or float(m["ts"]) > float(params["oldest"])]
+        start, size = int(params.get("cursor", 0)), params["limit"]
+        more = start + size < len(found)
+        return FakeResponse(messages=[dict(m) for m in found[start:start + size]], has_more=more,
+                            response_metadata={"next_cursor": str(start + size) if more else ""})
+
+
+def client(slack):
+    integration = SlackIntegration(scheduler=RateLimitScheduler(limits={"slack": (1000, 1000)}),
+                                   env={"SLACK_BOT_TOKEN": "t", "SLACK_CHANNEL_ID": "C1"})
+    integration.client = slack
+    return integration
+
+
+def sync(integration, oldest, max_items):
+    delivered = {msg["text"] for page in integration.iter_pages(oldest=oldest, page_size=10, max_items=max_items)
+                 for msg in page}
+    return delivered, integration.sync_cursor
+
+
+def test_budget_cut_keeps_what_was_skipped_for_the_next_run():
+    slack = FakeSlack(5)
+    integration = client(slack)
+    seen, cursor = sync(integration, None, max_items=40)
+    assert len(seen) == 5
+
+    # A burst bigger than the budget, and more arriving while it is worked through
+    slack.post(95)
+    for _ in range(5):
+        delivered, cursor = sync(integration, cursor, max_items=40)
+        seen |= delivered
+        slack.post(3)
+    assert seen == {m["text"] for m in slack.messages[:-3]}
+    assert cursor == slack.messages[-4]["ts"]
+
+
+def test_a_failed_sync_keeps_its_cursor():
+    slack = FakeSlack(30)
+    integration = client(slack)
+
+    def failing(method, http_verb="GET", params=None):
+        # The second page fails
+        if params.get("cursor"):
+            error = FakeResponse(ok=False, error="internal_error")
+            error.status_code = 500
+            raise SlackApiError("internal_error", error)
+        return FakeSlack.api_call(slack, method, http_verb, params)
+
+    slack.api_call = failing
+    cursor = slack.messages[4]["ts"]
+    assert sync(integration, cursor, max_items=100) == (set(), cursor)
@@ -0,0 +1,18 @@
+from functools import partial
+
+from benchmarks.bench_streaming_memory import measure, run_materialized, run_streaming
+
+# Two pages of ingestion queue, so both runs below are past the point where it fills up
+streaming = partial(run_streaming, max_pages=2)
+
+
+def test_streaming_peak_memory_stays_flat():
+    small = measure(streaming, 1000, 100)
+    large = measure(streaming, 10000, 100)
+    assert (small[0], large[0]) == (1000, 10000)
+    assert large[2] < small[2] * 2, f"peak grew from {small[2]:,} to {large[2]:,} bytes for 10x the items"
+
+
+def test_materialized_peak_grows_with_the_batch():
+    # The same measurement does tell the two apart
+    assert measure(run_materialized, 2000, 100)[2] > measure(run_materialized, 200, 100)[2] * 4
@@ -0,0 +1,101 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+from backend.processing.normalizer import NotificationNormalizer
+from backend.processing.priority_engine import PriorityEngine
+from backend.server.app import Request
+from backend.server.webhooks import SLACK_MAX_AGE, WebhookReceiver, verify_hub_signature, verify_slack
+
+SECRETS = {"slack": "slack-secret", "github": "github-secret", "jira": "jira-secret"}
+
+
+def slack_headers(body, secret=SECRETS["slack"], timestamp=None):
+    timestamp = str(int(time.time() if timestamp is None else timestamp))
+    base = b"v0:" + timestamp.encode() + b":" + body
+    return {"X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": "v0=" + hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()}
+
+
+def hub_signature(body, secret=SECRETS["github"]):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def post(handler, payload, headers):
+    body = json.dumps(payload).encode()
+    return handler(Request("POST", "/webhooks", {}, headers(body), body))
+
+
+@pytest.fixture
+def receiver(make_repository):
+    return WebhookReceiver(make_repository(), NotificationNormalizer(), PriorityEngine(), secrets=SECRETS)
+
+
+def test_slack_signatures():
+    body = b'{"type": "event_callback"}'
+    assert verify_slack("slack-secret", slack_headers(body), body)
+    assert not verify_slack("slack-secret", slack_headers(body, secret="other"), body)
+    assert not verify_slack("slack-secret", slack_headers(body), body + b" ")
+    assert not verify_slack("slack-secret", {}, body)
+    assert not verify_slack(None, slack_headers(body), body)
+
+
+def test_a_stale_slack_request_is_refused_as_a_replay():
+    body = b'{"type": "event_callback"}'
+    now = time.time()
+    assert verify_slack("slack-secret", slack_headers(body, timestamp=now - SLACK_MAX_AGE + 5), body, now=now)
+    assert not verify_slack("slack-secret", slack_headers(body, timestamp=now - SLACK_MAX_AGE - 5), body, now=now)
+    assert not verify_slack("slack-secret", dict(slack_headers(body), **{"X-Slack-Request-Timestamp": "soon"}), body)
+
+
+def test_hub_signatures():
+    body = b'{"action": "assigned"}'
+    assert verify_hub_signature("github-secret", hub_signature(body), body)
+    assert not verify_hub_signature("github-secret", hub_signature(body, secret="other"), body)
+    assert not verify_hub_signature("github-secret", hub_signature(body)[len("sha256="):], body)
+    assert not verify_hub_signature("github-secret", None, body)
+    assert not verify_hub_signature(None, hub_signature(body), body)
+
+
+def test_slack_url_verification_answers_the_challenge(receiver):
+    status, _, answer = post(receiver.slack, {"type": "url_verification", "challenge": "abc123"}, slack_headers)
+    assert (status, answer) == (200, {"challenge": "abc123"})
+    # Only once the request is signed
+    status, _, _ = post(receiver.slack, {"type": "url_verification", "challenge": "abc123"},
+                        lambda body: slack_headers(body, secret="other"))
+    assert status == 401 and receiver.counts["slack_rejected"] == 1
+
+
+def test_badly_signed_deliveries_are_rejected(receiver):
+    payload = {"action": "assigned", "issue": {"number": 1}, "repository": {"url": "https://api.github.com/repos/acme/api"}}
+    status, _, _ = post(receiver.github, payload, lambda body: {"X-GitHub-Event": "issues",
+                                                                "X-Hub-Signature-256": hub_signature(body, "other")})
+    assert status == 401
+    status, _, _ = post(receiver.jira_event, {"webhookEvent": "jira:issue_created"}, lambda body: {})
+    assert status == 401
+    assert receiver.repository.count() == 0
+
+
+def test_other_event_types_are_ignored(receiver):
+    # A message edit (subtype), a reaction, a GitHub star and a Jira comment are not notifications
+    for event in ({"type": "message", "subtype": "message_changed"}, {"type": "reaction_added"}):
+        status, _, answer = post(receiver.slack, {"type": "event_callback", "event": event}, slack_headers)
+        assert (status, answer) == (200, {"ok": True, "ignored": True})
+    status, _, answer = post(receiver.github, {"action": "created", "repository": {}},
+                             lambda body: {"X-GitHub-Event": "star", "X-Hub-Signature-256": hub_signature(body)})
+    assert answer == {"ok": True, "ignored": True}
+    status, _, answer = post(receiver.jira_event, {"webhookEvent": "comment_created"},
+                             lambda body: {"X-Hub-Signature": hub_signature(body, SECRETS["jira"])})
+    assert answer == {"ok": True, "ignored": True}
+    assert (receiver.counts["slack_ignored"], receiver.counts["github_ignored"], receiver.counts["jira_ignored"]) == (2, 1, 1)
+    assert receiver.repository.count() == 0
+
+
+def test_a_signed_slack_message_is_stored(receiver):
+    event = {"type": "message", "ts": "1767000000.000100", "user": "U1", "text": "deploy failed, urgent", "channel": "C1"}
+    status, _, answer = post(receiver.slack, {"type": "event_callback", "event": event}, slack_headers)
+    assert status == 200 and answer["ok"]
+    assert receiver.repository.get(answer["id"])["content"] == "deploy failed, urgent"